@@ -9,32 +9,379 @@ with text overlays.
 
 Modules used:
     Flask: Web framework for creating the web application.
-    requests: For fetching images from URLs.
-    tempfile: For creating temporary file paths for storing images.
+    base64: For embedding in-memory memes in the page.
     os: For interacting with the file system.
+    tempfile: For locating the cache directory of fetched images.
+    threading: For loading the corpus in the background.
+    time: For measuring the time until the app is ready and request times.
     random: For generating random selections.
     quoteengine: Handles parsing of quotes from various file formats.
-    memeengine: Handles meme generation with images and text.
+    memeengine: Handles meme generation with images and text, fetching
+                of remote images, and the render queue.
+    telemetry: Times the render and ingestion stages for `/metrics`; the
+               engines report to it once installed as their recorder.
+
+Memes are rendered in memory and embedded in the page by default; set the
+MEME_PERSIST=1 environment variable to write them to ./static instead.
+
+Memes are encoded as JPEG at quality 75 unless the MEME_FORMAT (jpeg, png
+or webp) and MEME_QUALITY environment variables say otherwise. Clients can
+ask for another format with the `format` and `quality` query parameters, or
+for `/meme` through the Accept header.
+
+The app is built by the create_app factory. The quote corpus is loaded in a
+background thread, and the image and HTTP libraries are imported on first
+use, so a worker can answer `/ready` right after import. Routes that need
+the corpus wait briefly for it and answer 503 while it is still loading.
+Set MEME_EAGER_LOAD=1 to load everything before the app is returned.
+
+Renders for `/`, `/meme` and `/create` run on a bounded render queue
+(MEME_WORKERS threads, default 4, with at most MEME_QUEUE_SIZE jobs waiting,
+default 64). Random memes are rendered before custom ones, a full queue
+answers 503, and a job not done within MEME_DEADLINE seconds (default 10)
+answers 504. With `async=1` (or `Prefer: respond-async`), `/` and `/create`
+answer 202 with a job id at once; the meme is then collected from
+`/jobs/<id>`.
+
+Random memes for `/` are rendered ahead of time into a reservoir of
+MEME_RESERVOIR_SIZE memes per output format (default 32, 0 disables it),
+refilled by MEME_RESERVOIR_WORKERS background threads (default 1). Requests
+without quote filters take a meme from it and only render when it is empty.
+
+Set MEME_METRICS=1 to record request times, the time spent in each render
+and ingestion stage, and cache and queue counters, served in the Prometheus
+text format by `/metrics`. Set MEME_SERVER_TIMING=1 to add a Server-Timing
+header with the stage times of each request to its response.
 
 Routes:
     - `/`: Displays a random meme generated from random images and quotes.
+           The quote can be narrowed with the `author`, `q` (keywords),
+           `min_len` and `max_len` query parameters.
+    - `/meme`: Streams a random meme image directly, without a page,
+               in the format negotiated from the Accept header.
+    - `/corpus`: Reports the reload generation and size of the corpus.
+    - `/reservoir`: Reports the fill level and hit rate of the reservoirs.
+    - `/ready`: Reports whether the corpus is loaded (503 until it is).
+    - `/metrics`: Reports stage timings and counters for Prometheus
+                  (404 unless MEME_METRICS=1).
     - `/create` (GET): Displays a form for user input to create a custom meme.
     - `/create` (POST): Accepts user input, generates a meme,
                         and returns the result.
+    - `/jobs/<id>`: Reports a queued render and its result; `wait=N`
+                    waits up to N seconds for it to finish.
 """
 
+import base64
 import os
 import random
-import requests
 import tempfile
-from itertools import chain
-from flask import Flask, render_template, request
-from quoteengine import QuoteModel, Ingestor
-from memeengine import MemeGenerator
+import threading
+import time
+from flask import (Flask, Response, abort, after_this_request, g, jsonify,
+                   render_template, request, send_file, url_for)
+import memeengine
+import quoteengine
+from quoteengine import QuoteModel, QuoteCache, Corpus
+from telemetry import telemetry
 
-app = Flask(__name__)
+_import_started = time.perf_counter()
 
-meme = MemeGenerator("./static")
+# Stats of the caches, queue and reservoirs that only grow
+COUNTER_STATS = frozenset({
+    "hits", "misses", "evictions", "revalidations", "coalesced",
+    "done", "failed", "rejected", "expired", "produced", "errors",
+})
+
+
+class Resources:
+    """
+    Process-wide resources of the web application, built on first use.
+
+    The meme generator and the remote image cache import PIL and requests
+    when they are first needed. The quote corpus is loaded by start_loading
+    in a background thread.
+
+    Attributes:
+        corpus (Corpus): The loaded corpus, or None while loading.
+        ready (threading.Event): Set once the corpus is loaded.
+        ready_seconds (float): Seconds from import until the corpus was
+                               loaded.
+        load_error (Exception): The error that stopped loading, if any.
+    """
+
+    def __init__(self):
+        """Initialize the resources without loading anything."""
+        self.corpus = None
+        self.ready = threading.Event()
+        self.ready_seconds = None
+        self.load_error = None
+        self._meme = None
+        self._pool = None
+        self._remote_images = None
+        self._render_queue = None
+        self._reservoirs = {}
+        self._loader = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._preload_lock = threading.Lock()
+
+    def _build_meme(self):
+        """Create the meme generator and its image pool."""
+        from memeengine import Encoder, MemeGenerator, ImagePool, RenderCache
+
+        with self._lock:
+            if self._meme is None:
+                self._pool = ImagePool(max_bytes=256 * 1024 * 1024)
+                cache = RenderCache("./static", max_bytes=256 * 1024 * 1024)
+                encoder = Encoder(
+                    format=os.environ.get("MEME_FORMAT", "jpeg"),
+                    quality=int(os.environ.get("MEME_QUALITY", 75)))
+                self._meme = MemeGenerator(
+                    "./static", cache=cache, pool=self._pool,
+                    persist=os.environ.get("MEME_PERSIST") == "1",
+                    encoder=encoder)
+
+    @property
+    def meme(self):
+        """Return the MemeGenerator shared by every request thread."""
+        if self._meme is None:
+            self._build_meme()
+        return self._meme
+
+    @property
+    def pool(self):
+        """Return the image pool of the shared MemeGenerator."""
+        if self._meme is None:
+            self._build_meme()
+        return self._pool
+
+    @property
+    def remote_images(self):
+        """Return the shared RemoteImageCache."""
+        if self._remote_images is None:
+            from memeengine import ImageFetcher, RemoteImageCache
+
+            with self._lock:
+                if self._remote_images is None:
+                    fetcher = ImageFetcher(connect_timeout=3.05,
+                                           read_timeout=10,
+                                           max_bytes=10 * 1024 * 1024)
+                    self._remote_images = RemoteImageCache(
+                        os.path.join(tempfile.gettempdir(),
+                                     "meme-generator-images"),
+                        fetcher, ttl=300, max_bytes=256 * 1024 * 1024)
+        return self._remote_images
+
+    @property
+    def render_queue(self):
+        """Return the RenderQueue that runs renders for the routes."""
+        if self._render_queue is None:
+            from memeengine import RenderQueue
+
+            with self._lock:
+                if self._render_queue is None:
+                    self._render_queue = RenderQueue(
+                        workers=int(os.environ.get("MEME_WORKERS", 4)),
+                        max_pending=int(
+                            os.environ.get("MEME_QUEUE_SIZE", 64)))
+        return self._render_queue
+
+    def reservoir(self, encoder):
+        """
+        Return the reservoir of random memes in an output format.
+
+        Reservoirs are created, and start filling, on first use.
+
+        Parameters:
+            encoder (Encoder): The output format of the memes.
+
+        Returns:
+            MemeReservoir: The reservoir, or None if reservoirs are
+                           disabled.
+        """
+        size = int(os.environ.get("MEME_RESERVOIR_SIZE", 32))
+        if size <= 0:
+            return None
+        key = tuple(encoder.params().items())
+        reservoir = self._reservoirs.get(key)
+        if reservoir is None:
+            from memeengine import MemeReservoir
+
+            with self._lock:
+                reservoir = self._reservoirs.get(key)
+                if reservoir is None:
+                    reservoir = MemeReservoir(
+                        lambda: render_any(encoder), size=size,
+                        workers=int(
+                            os.environ.get("MEME_RESERVOIR_WORKERS", 1)),
+                        name=f"meme-reservoir-{encoder.format}")
+                    reservoir.start()
+                    self._reservoirs[key] = reservoir
+        return reservoir
+
+    def reservoirs(self):
+        """Return the reservoirs created so far, by output format."""
+        with self._lock:
+            return list(self._reservoirs.items())
+
+    def preload(self, pool):
+        """
+        Decode the photos of an image pool, one preload at a time.
+
+        Parameters:
+            pool (ImagePool): The pool to preload.
+        """
+        with self._preload_lock:
+            pool.preload()
+
+    def clear_reservoirs(self):
+        """Drop every pre-rendered meme, e.g. after a corpus reload."""
+        for _, reservoir in self.reservoirs():
+            reservoir.clear()
+
+    def counters(self):
+        """
+        Report the counters of the resources built so far, for `/metrics`.
+
+        Returns:
+            list: (name, labels, value) samples of the values that only
+                  grow, e.g. the image pool hits as
+                  ("image_pool_hits_total", {}, 42).
+        """
+        return [(f"{name}_total", labels, value)
+                for name, labels, value, counter in self.samples()
+                if counter]
+
+    def gauges(self):
+        """
+        Report the levels of the resources built so far, for `/metrics`.
+
+        Returns:
+            list: (name, labels, value) samples of values that go up and
+                  down, e.g. the frames in the image pool as
+                  ("image_pool_frames", {}, 12).
+        """
+        return [(name, labels, value)
+                for name, labels, value, counter in self.samples()
+                if not counter]
+
+    def samples(self):
+        """
+        Collect the numeric stats of the resources built so far.
+
+        Returns:
+            list: (name, labels, value, counter) tuples; counter is True
+                  for the stats named in COUNTER_STATS.
+        """
+        sources = []
+        if self._meme is not None:
+            from memeengine.text_layer import text_layers
+
+            sources.append(("image_pool", {}, self._pool.stats()))
+            sources.append(("text_layer_cache", {}, text_layers.stats()))
+            if self._meme.cache is not None:
+                sources.append(("render_cache", {},
+                                self._meme.cache.stats()))
+        if self._remote_images is not None:
+            sources.append(("remote_image_cache", {},
+                            self._remote_images.stats()))
+        if self._render_queue is not None:
+            sources.append(("render_queue", {}, self._render_queue.stats()))
+        for key, reservoir in self.reservoirs():
+            sources.append(("meme_reservoir", dict(key[:2]),
+                            reservoir.stats()))
+        return [(f"{prefix}_{name}", labels, value, name in COUNTER_STATS)
+                for prefix, labels, stats in sources
+                for name, value in stats.items()
+                if isinstance(value, (int, float))]
+
+    def load(self):
+        """
+        Load the corpus and mark the resources as ready.
+
+        Concurrent calls, e.g. an eager create_app while the background
+        loader runs, wait for the load in progress instead of repeating it.
+        """
+        with self._load_lock:
+            if self.ready.is_set():
+                return
+            try:
+                self.corpus = setup()
+            except Exception as error:
+                self.load_error = error
+                raise
+            self.ready_seconds = time.perf_counter() - _import_started
+            self.ready.set()
+        # Start rendering memes for the default format right away
+        self.reservoir(self.meme.encoder)
+
+    def start_loading(self):
+        """Start loading the corpus in a background thread, once."""
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(
+                    target=self.load, name="corpus-loader", daemon=True)
+                self._loader.start()
+
+    def snapshot(self, timeout=5.0):
+        """
+        Return the current corpus snapshot, waiting for the first load.
+
+        Parameters:
+            timeout (float): Seconds to wait for the corpus to load.
+
+        Raises:
+            ServiceUnavailable: If the corpus is not loaded in time.
+        """
+        if not self.ready.wait(timeout):
+            abort(503, description="The quote corpus is still loading.")
+        return self.corpus.snapshot
+
+
+resources = Resources()
+telemetry.collect(resources.counters, kind="counter")
+telemetry.collect(resources.gauges)
+memeengine.set_recorder(telemetry)
+quoteengine.set_recorder(telemetry)
+
+
+def preload_images(snapshot):
+    """
+    Serve the corpus images from the image pool and decode them.
+
+    Images removed from the corpus are dropped from the pool at once. The
+    others are decoded on a background thread, so neither readiness nor
+    a reload waits for them; an image that cannot be decoded is logged
+    and skipped (see ImagePool.preload), and requests that pick it fail
+    as they would without the pool.
+
+    Parameters:
+        snapshot (CorpusSnapshot): The newly published corpus.
+
+    Returns:
+        threading.Thread: The thread decoding the images.
+    """
+    pool = resources.pool
+    pool.sync(snapshot.imgs)
+    thread = threading.Thread(target=resources.preload, args=(pool,),
+                              name="image-preloader", daemon=True)
+    thread.start()
+    return thread
+
+
+def corpus_reloaded(snapshot):
+    """
+    Prepare for a newly published corpus.
+
+    Memes rendered from the old corpus are dropped from the reservoirs
+    first, so a failed preload cannot keep them, and then the images are
+    preloaded.
+
+    Parameters:
+        snapshot (CorpusSnapshot): The newly published corpus.
+    """
+    resources.clear_reservoirs()
+    preload_images(snapshot)
 
 
 def setup():
@@ -43,50 +390,461 @@ def setup():
 
     This function loads quotes from various file formats
     (TXT, DOCX, PDF, CSV) and images from a specified directory.
-    It prepares the resources needed for meme generation.
+    It prepares the resources needed for meme generation. Quote files
+    that have not changed are loaded from the persistent quote cache and
+    the others are parsed in parallel on threads; setup runs on the
+    background loader thread of a threaded server, where forking a
+    process pool is unsafe. The quotes are packed into a
+    QuoteStore file and memory-mapped, so worker processes share it.
+
+    PDF text is extracted by the backend named by MEME_PDF_BACKEND, or
+    the fastest one available (see quoteengine.pdf_text).
+
+    The quote and image directories are then polled in the background
+    (every MEME_RELOAD_INTERVAL seconds, default 2) and changed files are
+    re-ingested without a restart.
+
+    Returns:
+        Corpus: The loaded corpus; its snapshot holds the quotes,
+                the quote index and the image file paths.
+    """
+    from quoteengine.ingestor import IngestorPDF
+    from quoteengine.pdf_text import default_backend
+
+    IngestorPDF.backend = default_backend(os.environ.get("MEME_PDF_BACKEND"))
+    corpus = Corpus(
+        quote_dirs=["./_data/DogQuotes/"],
+        image_dirs=["./_data/photos/dog/"],
+        cache=QuoteCache("./_data/DogQuotes/.quotes-cache.sqlite3"),
+        store_path="./_data/DogQuotes/.quotes.store",
+        on_reload=corpus_reloaded,
+    )
+    corpus.reload(processes=0)
+    corpus.start(float(os.environ.get("MEME_RELOAD_INTERVAL", 2)))
+    return corpus
+
+
+def meme_src(result, mimetype):
+    """
+    Return the image source for a generated meme.
+
+    Parameters:
+        result (str or BytesIO): The path of a saved meme, or the
+                                 encoded meme when not persisting.
+        mimetype (str): The MIME type the meme was encoded as.
+
+    Returns:
+        str: The path, or a data URI embedding the encoded meme.
+    """
+    if isinstance(result, str):
+        return result
+    encoded = base64.b64encode(result.getvalue()).decode("ascii")
+    return f"data:{mimetype};base64,{encoded}"
+
+
+def vary_on_accept(response):
+    """
+    Mark a response as depending on the request's Accept header.
+
+    Parameters:
+        response (Response): The response to mark.
+
+    Returns:
+        Response: The same response.
+    """
+    response.vary.add("Accept")
+    return response
+
+
+def choose_encoder():
+    """
+    Choose the encoder for the request's meme.
+
+    The `format` query parameter wins; otherwise the format is negotiated
+    from the Accept header among the formats this server can write, and
+    the server's default is used when the client accepts none of them.
+    A negotiated response gets `Vary: Accept`, so shared caches do not
+    serve it to clients that accept other formats. The `quality` query
+    parameter overrides the default quality.
+
+    Returns:
+        Encoder: The encoder to render the meme with.
+
+    Raises:
+        BadRequest: If the format or quality is not supported.
+    """
+    from memeengine.encoder import FORMATS, available_formats
+
+    default = resources.meme.encoder
+    changes = {}
+    name = request.args.get("format")
+    if name is None:
+        after_this_request(vary_on_accept)
+        formats = [default.format] + [fmt for fmt in available_formats()
+                                      if fmt != default.format]
+        mimetypes = [FORMATS[fmt][1] for fmt in formats]
+        best = request.accept_mimetypes.best_match(mimetypes)
+        if best is not None:
+            changes["format"] = formats[mimetypes.index(best)]
+    else:
+        changes["format"] = name
+    quality = request.args.get("quality", type=int)
+    if quality is not None:
+        changes["quality"] = quality
+    if not changes:
+        return default
+    try:
+        return default.replace(**changes)
+    except ValueError as error:
+        abort(400, description=str(error))
+
+
+def render_random(img, quote, encoder):
+    """
+    Render a meme from a corpus image; runs on the render queue.
+
+    Parameters:
+        img (str): Path of the source image.
+        quote (QuoteModel): The quote to draw.
+        encoder (Encoder): The output format.
+
+    Returns:
+        str: The image source of the meme, as returned by meme_src.
+    """
+    result = resources.meme.make_meme(img, quote.body, quote.author,
+                                      encoder=encoder)
+    return meme_src(result, encoder.mimetype)
+
+
+def render_image(img, quote, encoder):
+    """
+    Render a meme in memory for `/meme`; runs on the render queue.
+
+    Parameters:
+        img (str): Path of the source image.
+        quote (QuoteModel): The quote to draw.
+        encoder (Encoder): The output format.
+
+    Returns:
+        BytesIO: The encoded meme.
+    """
+    return resources.meme.make_meme(img, quote.body, quote.author,
+                                    persist=False, encoder=encoder)
+
+
+def render_any(encoder):
+    """
+    Render a meme from a random image and quote; fills the reservoirs.
+
+    Parameters:
+        encoder (Encoder): The output format.
+
+    Returns:
+        str: The image source of the meme, as returned by meme_src.
+    """
+    snapshot = resources.corpus.snapshot
+    return render_random(random.choice(snapshot.imgs),
+                         random.choice(snapshot.quotes), encoder)
+
+
+def render_custom(image_url, quote, encoder):
+    """
+    Fetch a remote image and render a meme; runs on the render queue.
+
+    Parameters:
+        image_url (str): URL of the source image.
+        quote (QuoteModel): The quote to draw.
+        encoder (Encoder): The output format.
 
     Returns:
-        tuple: A tuple containing two elements:
-            - List of QuoteModel instances (quotes).
-            - List of image file paths (imgs).
+        str: The image source of the meme, as returned by meme_src.
     """
-    quote_files = [
-        "./_data/DogQuotes/DogQuotesTXT.txt",
-        "./_data/DogQuotes/DogQuotesDOCX.docx",
-        "./_data/DogQuotes/DogQuotesPDF.pdf",
-        "./_data/DogQuotes/DogQuotesCSV.csv",
-    ]
+    image = resources.remote_images.fetch(image_url)
+    result = resources.meme.make_meme(image, quote.body, quote.author,
+                                      encoder=encoder)
+    return meme_src(result, encoder.mimetype)
 
-    quotes = list(chain(*[Ingestor.parse(f) for f in quote_files]))
-    images_path = "./_data/photos/dog/"
-    imgs = [os.path.join(images_path, name)
-            for name in os.listdir(images_path)]
 
-    return quotes, imgs
+def job_status(job):
+    """
+    Describe a render job for JSON responses.
 
+    Parameters:
+        job (RenderJob): The job.
 
-quotes, imgs = setup()
+    Returns:
+        dict: The job id, status and URL, plus the meme's image source
+              once done or the error once failed.
+    """
+    status = {"id": job.id, "status": job.status,
+              "url": url_for("job", job_id=job.id)}
+    if job.status == "done":
+        status["src"] = job.result
+    elif job.status == "failed":
+        status["error"] = f"{type(job.error).__name__}: {job.error}"
+    return status
+
+
+def wants_async():
+    """Return True if the request asks for a job id instead of a meme."""
+    return request.values.get("async") == "1" or \
+        "respond-async" in request.headers.get("Prefer", "")
+
+
+def run_render(func, *args, priority, allow_async=True):
+    """
+    Run a render on the render queue for the current request.
+
+    Asynchronous requests (`async=1` or `Prefer: respond-async`) get the
+    queued job back at once. Others wait for the meme until the deadline.
+
+    Parameters:
+        func (callable): The render function, e.g. render_random.
+        args: Arguments for func.
+        priority (int): Queue priority; lower numbers run first.
+        allow_async (bool): Whether the request may ask for the job
+                            instead of the meme; routes answering with
+                            the image itself always wait.
+
+    Returns:
+        object or Response: What func returned, e.g. the meme's image
+                            source, or a 202 response describing the job
+                            for asynchronous requests.
+
+    Raises:
+        ServiceUnavailable: If the queue is full.
+        GatewayTimeout: If the meme is not rendered by the deadline.
+    """
+    from memeengine import DeadlineExceeded, QueueFull
+
+    deadline = float(os.environ.get("MEME_DEADLINE", 10))
+    # Only asynchronous jobs are looked up later, by /jobs/<id>
+    asynchronous = allow_async and wants_async()
+    try:
+        job = resources.render_queue.submit(func, *args, priority=priority,
+                                            timeout=deadline,
+                                            keep=asynchronous)
+    except QueueFull as error:
+        abort(Response(str(error), 503, {"Retry-After": "1"}))
+
+    if asynchronous:
+        response = jsonify(job_status(job))
+        response.status_code = 202
+        response.headers["Location"] = url_for("job", job_id=job.id)
+        return response
+
+    if not job.wait(deadline) or isinstance(job.error, DeadlineExceeded):
+        abort(504, description="The meme was not rendered in time.")
+    if job.error is not None:
+        raise job.error
+    return job.result
+
+
+def quote_filters():
+    """
+    Return the quote filters given in the request's query parameters.
+
+    Returns:
+        dict: Keyword arguments for QuoteIndex.choice; empty if the
+              request does not narrow the choice of quote.
+    """
+    filters = {
+        "author": request.args.get("author") or None,
+        "keyword": request.args.get("q") or None,
+        "min_length": request.args.get("min_len", type=int),
+        "max_length": request.args.get("max_len", type=int),
+    }
+    return {name: value for name, value in filters.items()
+            if value is not None}
+
+
+def choose_quote(snapshot):
+    """
+    Choose a random quote matching the request's query parameters.
+
+    The `author`, `q`, `min_len` and `max_len` parameters are resolved
+    through the quote index; without them any quote may be chosen.
+
+    Parameters:
+        snapshot (CorpusSnapshot): The corpus to choose from.
+
+    Returns:
+        QuoteModel: The chosen quote.
+
+    Raises:
+        NotFound: If no quote matches the parameters.
+    """
+    filters = quote_filters()
+    if not filters:
+        return random.choice(snapshot.quotes)
+    quote = snapshot.index.choice(**filters)
+    if quote is None:
+        abort(404, description="No quote matches the given filters.")
+    return quote
 
 
-@app.route("/")
 def meme_rand():
     """
     Generate a random meme with a random image and quote.
 
     This function selects a random image and a random quote,
     creates a meme with them, and renders the meme on a webpage.
+    Query parameters narrow the choice of quote (see choose_quote).
+    Without them the meme is taken from the reservoir of pre-rendered
+    memes; otherwise, or when the reservoir is empty, it is rendered on
+    the render queue ahead of custom memes.
 
     Returns:
         render_template: Renders the meme.html template
                         with the generated meme's path.
     """
-    img = random.choice(imgs)
-    quote = random.choice(quotes)
-    path = meme.make_meme(img, quote.body, quote.author)
-    return render_template("meme.html", path=path)
+    from memeengine.render_queue import PRIORITY_HIGH
+
+    snapshot = resources.snapshot()
+    encoder = choose_encoder()
+    if not quote_filters() and "quality" not in request.args \
+            and not wants_async():
+        reservoir = resources.reservoir(encoder)
+        src = reservoir.take() if reservoir is not None else None
+        if src is not None:
+            return render_template("meme.html", path=src)
+
+    img = random.choice(snapshot.imgs)
+    quote = choose_quote(snapshot)
+    result = run_render(render_random, img, quote, encoder,
+                        priority=PRIORITY_HIGH)
+    if not isinstance(result, str):
+        return result
+    return render_template("meme.html", path=result)
+
+
+def meme_image():
+    """
+    Stream a random meme image directly.
+
+    The meme is rendered in memory and sent as the response body, so
+    clients get a meme in a single request and nothing is written to disk.
+    Every response is a new random meme, so it must not be cached.
+    Accepts the same quote filters and format parameters as the `/`
+    route, and otherwise picks the format from the Accept header. Like
+    `/`, the meme is rendered on the render queue, so a full queue
+    answers 503 and a missed deadline 504.
+
+    Returns:
+        Response: The encoded meme image.
+    """
+    from memeengine.render_queue import PRIORITY_HIGH
+
+    snapshot = resources.snapshot()
+    img = random.choice(snapshot.imgs)
+    quote = choose_quote(snapshot)
+    encoder = choose_encoder()
+    image = run_render(render_image, img, quote, encoder,
+                       priority=PRIORITY_HIGH, allow_async=False)
+    response = send_file(image, mimetype=encoder.mimetype)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def corpus_stats():
+    """
+    Report the state of the hot-reloaded corpus.
+
+    Returns:
+        Response: JSON with the reload generation, the duration of the
+                  last reload, the corpus size and any parse errors.
+    """
+    snapshot = resources.snapshot()
+    corpus = resources.corpus
+    return jsonify(
+        generation=snapshot.generation,
+        reload_seconds=snapshot.reload_seconds,
+        loaded_at=snapshot.loaded_at,
+        quotes=len(snapshot.quotes),
+        images=len(snapshot.imgs),
+        errors=snapshot.errors,
+        watcher_error=(None if corpus.last_error is None
+                       else str(corpus.last_error)),
+    )
+
+
+def reservoir_stats():
+    """
+    Report the reservoirs of pre-rendered random memes.
+
+    Returns:
+        Response: JSON with the fill level, hits, misses and hit rate of
+                  each reservoir, by output format.
+    """
+    return jsonify({
+        "-".join(f"{value}" for _, value in key[:2]): reservoir.stats()
+        for key, reservoir in resources.reservoirs()
+    })
+
+
+def ready():
+    """
+    Report whether the app is ready to serve memes.
+
+    Returns:
+        Response: JSON with the readiness state and the seconds from
+                  import until the corpus was loaded; status 503 while
+                  the corpus is still loading or failed to load.
+    """
+    if not resources.ready.is_set():
+        error = resources.load_error
+        return jsonify(ready=False,
+                       error=None if error is None else str(error)), 503
+    return jsonify(ready=True, ready_seconds=resources.ready_seconds,
+                   generation=resources.corpus.snapshot.generation)
+
+
+def metrics():
+    """
+    Report the recorded timings and counters for Prometheus.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+
+    Raises:
+        NotFound: If metrics are disabled.
+    """
+    if not telemetry.enabled:
+        abort(404, description="Metrics are disabled; set MEME_METRICS=1.")
+    return Response(telemetry.render(),
+                    mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+def start_timing():
+    """Note the start of a request and start tracing its stages."""
+    g.request_started = time.perf_counter()
+    if os.environ.get("MEME_SERVER_TIMING") == "1":
+        g.trace = telemetry.trace()
+        g.trace.start()
+
+
+def finish_timing(response):
+    """
+    Record the duration of a request and add its Server-Timing header.
+
+    Parameters:
+        response (Response): The response to the request.
+
+    Returns:
+        Response: The same response.
+    """
+    elapsed = time.perf_counter() - g.request_started
+    rule = request.url_rule
+    telemetry.observe("http_request_seconds", elapsed,
+                      route=rule.rule if rule is not None else "unmatched",
+                      method=request.method, status=response.status_code)
+    trace = g.pop("trace", None)
+    if trace is not None:
+        trace.stop()
+        response.headers["Server-Timing"] = trace.header(total=elapsed)
+    return response
 
 
-@app.route("/create", methods=["GET"])
 def meme_form():
     """
     Render the form for creating a custom meme.
@@ -100,33 +858,105 @@ def meme_form():
     return render_template("meme_form.html")
 
 
-@app.route("/create", methods=["POST"])
 def meme_post():
     """
     Generate a custom meme based on user input.
 
     This function accepts user input via a POST request, downloads
-    the image from the provided URL, and generates a meme
+    the image from the provided URL into memory, and generates a meme
     with the given quote. The generated meme is then displayed.
+    Downloads are bounded by the fetcher's timeouts and size limit, and
+    images fetched before are served from the remote image cache. The
+    download and render run on the render queue behind random memes.
 
     Returns:
         render_template: Renders the meme.html template
                          with the generated meme's path.
     """
-    req_img = requests.get(request.form["image_url"])
+    from memeengine import FetchError
+    from memeengine.render_queue import PRIORITY_LOW
+
     quote = QuoteModel(body=request.form["body"],
                        author=request.form["author"])
 
-    temp_dir = tempfile.gettempdir()
-    temp_path = os.path.join(temp_dir, f"{random.randint(0, 100000)}.png")
+    try:
+        result = run_render(render_custom, request.form["image_url"],
+                            quote, choose_encoder(), priority=PRIORITY_LOW)
+    except FetchError as error:
+        abort(400, description=str(error))
+    if not isinstance(result, str):
+        return result
+
+    return render_template("meme.html", path=result)
+
+
+def job(job_id):
+    """
+    Report a render job queued by `/` or `/create`.
 
-    with open(temp_path, "wb") as temp_file:
-        temp_file.write(req_img.content)
+    With the `wait` query parameter the request waits up to that many
+    seconds (at most 30) for the job to finish before answering.
 
-    path = meme.make_meme(temp_path, quote.body, quote.author)
-    os.remove(temp_path)
+    Parameters:
+        job_id (str): The id returned when the job was queued.
 
-    return render_template("meme.html", path=path)
+    Returns:
+        Response: JSON describing the job (see job_status).
+
+    Raises:
+        NotFound: If the job is unknown or its result has expired.
+    """
+    render_job = resources.render_queue.get(job_id)
+    if render_job is None:
+        abort(404, description="Unknown or expired render job.")
+    wait = request.args.get("wait", type=float)
+    if wait:
+        render_job.wait(min(max(wait, 0), 30))
+    response = jsonify(job_status(render_job))
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def create_app(eager=None):
+    """
+    Create the Flask application.
+
+    Parameters:
+        eager (bool, optional): Load the corpus before returning instead of
+                                in the background. Defaults to the
+                                MEME_EAGER_LOAD environment variable.
+
+    Returns:
+        Flask: The configured application.
+    """
+    if eager is None:
+        eager = os.environ.get("MEME_EAGER_LOAD") == "1"
+    if os.environ.get("MEME_METRICS") == "1":
+        telemetry.enable()
+
+    flask_app = Flask(__name__)
+    if telemetry.enabled or os.environ.get("MEME_SERVER_TIMING") == "1":
+        flask_app.before_request(start_timing)
+        flask_app.after_request(finish_timing)
+    flask_app.add_url_rule("/", view_func=meme_rand)
+    flask_app.add_url_rule("/meme", view_func=meme_image)
+    flask_app.add_url_rule("/corpus", view_func=corpus_stats)
+    flask_app.add_url_rule("/reservoir", view_func=reservoir_stats)
+    flask_app.add_url_rule("/ready", view_func=ready)
+    flask_app.add_url_rule("/metrics", view_func=metrics)
+    flask_app.add_url_rule("/create", view_func=meme_form, methods=["GET"])
+    flask_app.add_url_rule("/create", view_func=meme_post, methods=["POST"])
+    flask_app.add_url_rule("/jobs/<job_id>", view_func=job)
+
+    if eager:
+        if not resources.ready.is_set():
+            resources.load()
+    else:
+        resources.start_loading()
+    return flask_app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
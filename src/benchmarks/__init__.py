@@ -0,0 +1,15 @@
+"""
+Benchmarks for the meme and quote engines.
+
+Each module is a script run from the src directory, for example:
+
+    python -m benchmarks.composite
+
+Modules:
+    composite: Looping over make_meme versus make_meme_variants.
+    concurrency: Threads sharing one MemeGenerator never mix renders.
+    docx_reader: The streaming DOCX reader matches python-docx, and its speed.
+    pdf_backends: Files per second of each PDF text extraction backend.
+    suite: Ingestion, render stage and route timings saved as JSON.
+    synthetic: Large synthetic quote files and photos for the benchmarks.
+"""
@@ -0,0 +1,82 @@
+"""
+Benchmark of vectorized compositing for many quotes on one image.
+
+Renders the same N quotes onto one photo three ways and reports the time
+per meme:
+
+- loop: MemeGenerator.make_meme for every quote,
+- pooled loop: the same with the photo in an ImagePool,
+- variants: MemeGenerator.make_meme_variants.
+
+Memes are encoded in memory, so disk speed does not skew the results.
+
+Usage:
+    python -m benchmarks.composite [--count N] [--width W] [--image PATH]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from memeengine import ImagePool, MemeGenerator
+
+PHOTOS = "./_data/photos/dog/"
+
+
+def make_quotes(count):
+    """Return count distinct (text, author) pairs of varying length."""
+    rng = random.Random(0)
+    words = ("dog bone walk ball good loyal friend bark sleep run treat "
+             "tail paw happy home love").split()
+    return [
+        (" ".join(rng.choice(words) for _ in range(rng.randint(4, 18))),
+         f"Author {index % 7}")
+        for index in range(count)
+    ]
+
+
+def timed(label, count, render):
+    """Run render once and print the time per meme."""
+    started = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {elapsed:8.3f}s {1000 * elapsed / count:8.2f}ms/meme")
+    return elapsed
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--width", type=int, default=500)
+    parser.add_argument("--image", default=None)
+    args = parser.parse_args()
+
+    image = args.image or os.path.join(PHOTOS, sorted(os.listdir(PHOTOS))[0])
+    quotes = make_quotes(args.count)
+    plain = MemeGenerator("./tmp", persist=False)
+    pooled = MemeGenerator("./tmp", persist=False, pool=ImagePool([image]))
+
+    # Rasterize the text once so every run measures compositing only
+    list(plain.make_meme_variants(image, quotes[:1], args.width))
+    for text, author in quotes:
+        plain.make_meme(image, text, author, args.width)
+
+    print(f"{args.count} quotes on {image} at width {args.width}")
+    loop = timed("loop", args.count, lambda: [
+        plain.make_meme(image, text, author, args.width)
+        for text, author in quotes
+    ])
+    timed("pooled loop", args.count, lambda: [
+        pooled.make_meme(image, text, author, args.width)
+        for text, author in quotes
+    ])
+    variants = timed("variants", args.count, lambda: list(
+        plain.make_meme_variants(image, quotes, args.width)
+    ))
+    print(f"speedup      {loop / variants:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Concurrency stress check for a shared MemeGenerator.
+
+Many threads render memes through one MemeGenerator at the same time, each
+with its own photo, quote and output format. Every result is compared with
+the same meme rendered alone on a single thread; any difference means two
+renders shared state, and the script exits with status 1.
+
+Text positions are fixed per quote for the check, so renders can be
+compared byte for byte. The run also reports the throughput of the single
+threaded reference and of the threaded run. tests/test_concurrency.py runs
+the same check with small parameters.
+
+Usage:
+    python -m benchmarks.concurrency [--threads N] [--rounds R]
+"""
+
+import argparse
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from memeengine import Encoder, ImagePool, MemeGenerator
+
+PHOTOS = "./_data/photos/dog/"
+FORMATS = ("jpeg", "png", "webp")
+
+
+class FixedLayoutGenerator(MemeGenerator):
+    """A MemeGenerator that places text at positions derived from it."""
+
+    def layout_text(self, body, author, size):
+        """Return positions that depend only on the text and the image."""
+        width, height = size
+        x = zlib.crc32(repr((body, author)).encode()) % max(1, width // 2)
+        return (x, 10), (10, max(0, height - author[1] - 10))
+
+
+def make_jobs(count, photos):
+    """Return count jobs cycling through photos, quotes and formats."""
+    return [
+        (photos[index % len(photos)],
+         f"Quote {index} from thread land, rendered concurrently",
+         f"Author {index}", 300 + 20 * (index % 5),
+         FORMATS[index % len(FORMATS)])
+        for index in range(count)
+    ]
+
+
+def render(meme, job):
+    """Render one job in memory and return the encoded bytes."""
+    img_path, text, author, width, fmt = job
+    return meme.make_meme(img_path, text, author, width, persist=False,
+                          encoder=Encoder(fmt)).getvalue()
+
+
+def check(threads, rounds):
+    """
+    Render threads * rounds memes serially and then concurrently.
+
+    :param threads: Number of threads rendering at once.
+    :param rounds: Number of memes per thread.
+    :return: The number of memes, the serial and threaded seconds, and the
+             indexes of the memes whose renders differ.
+    """
+    photos = sorted(os.path.join(PHOTOS, name)
+                    for name in os.listdir(PHOTOS))
+    jobs = make_jobs(threads * rounds, photos)
+    meme = FixedLayoutGenerator("./tmp", pool=ImagePool(photos))
+
+    started = time.perf_counter()
+    expected = [render(meme, job) for job in jobs]
+    serial = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        actual = list(executor.map(lambda job: render(meme, job), jobs))
+    threaded = time.perf_counter() - started
+
+    mixed = [index for index, (want, got) in enumerate(zip(expected, actual))
+             if want != got]
+    return len(jobs), serial, threaded, mixed
+
+
+def main():
+    """Parse arguments, run the check and report the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    count, serial, threaded, mixed = check(args.threads, args.rounds)
+    print(f"{count} memes: {count / serial:.1f}/s on 1 thread, "
+          f"{count / threaded:.1f}/s on {args.threads} threads")
+    if mixed:
+        print(f"FAILED: {len(mixed)} memes differ from their serial render, "
+              f"first at job {mixed[0]}")
+        sys.exit(1)
+    print("OK: every concurrent meme matches its serial render")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Parity check and benchmark of the streaming DOCX reader.
+
+Reads DOCX files with quoteengine.docx_text.iter_paragraphs and with
+python-docx, and compares the paragraph texts. The files are the bundled
+DogQuotes and SimpleLines documents, a large synthetic quote document, and
+small documents exercising the markup the reader has to translate or skip:
+tabs, breaks, hyperlinks, tables, content controls, tracked changes and a
+main document part with a non-standard name. Any difference exits with
+status 1; tests/test_docx_text.py runs the same comparison.
+
+The time to read each file both ways is reported as well.
+
+Usage:
+    python -m benchmarks.docx_reader [--quotes N]
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+import docx
+
+from benchmarks.synthetic import DOCX_RELS, W_NS, write_quote_files
+from quoteengine.docx_text import iter_paragraphs
+
+DATA = "./_data/"
+
+MARKUP = """
+<w:p><w:pPr><w:pStyle w:val="Title"/></w:pPr>
+  <w:r><w:t xml:space="preserve">Tabs</w:t><w:tab/><w:t>and</w:t>
+       <w:ptab w:relativeTo="margin" w:alignment="right" w:leader="none"/>
+       <w:t>breaks</w:t><w:br/><w:t>line</w:t>
+       <w:br w:type="textWrapping"/><w:t>wrap</w:t><w:br w:type="page"/>
+       <w:br w:type="column"/><w:cr/><w:t>non</w:t><w:noBreakHyphen/>
+       <w:t>breaking - Markup Dog</w:t></w:r></w:p>
+<w:p><w:r><w:t>Visit </w:t></w:r>
+  <w:hyperlink r:id="rId9"><w:r><w:t>the park</w:t></w:r></w:hyperlink>
+  <w:r><w:t> - Link Dog</w:t></w:r></w:p>
+<w:p><w:r><w:t>Tracked</w:t></w:r>
+  <w:ins w:id="1" w:author="x"><w:r><w:t> insert</w:t></w:r></w:ins>
+  <w:del w:id="2" w:author="x"><w:r><w:delText> gone</w:delText></w:r></w:del>
+  <w:bookmarkStart w:id="3" w:name="b"/><w:r><w:t> - Edit Dog</w:t></w:r>
+  <w:bookmarkEnd w:id="3"/>
+  <w:fldSimple w:instr="PAGE"><w:r><w:t>1</w:t></w:r></w:fldSimple></w:p>
+<w:tbl><w:tr><w:tc><w:p><w:r><w:t>In a table - Cell Dog</w:t></w:r></w:p>
+  </w:tc></w:tr></w:tbl>
+<w:sdt><w:sdtContent><w:p><w:r><w:t>In a control - Sdt Dog</w:t></w:r>
+  </w:p></w:sdtContent></w:sdt>
+<w:p/>
+<w:p><w:r><w:t/></w:r><w:r><w:t>Escaped &amp; &lt;fine&gt; - Amp Dog</w:t>
+  </w:r></w:p>
+<w:sectPr/>
+"""
+
+
+def write_markup_docx(path, part="word/document.xml"):
+    """Write a small DOCX with unusual markup to a given main part."""
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'<Override PartName="/{part}" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.document.main'
+        '+xml"/></Types>'
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W_NS}" xmlns:r="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships">'
+        f'<w:body>{MARKUP}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("_rels/.rels",
+                         DOCX_RELS.replace("word/document.xml", part))
+        archive.writestr(part, document)
+
+
+def timed(read, path):
+    """Return the paragraphs read from a file and the seconds it took."""
+    started = time.perf_counter()
+    paragraphs = read(path)
+    return paragraphs, time.perf_counter() - started
+
+
+def main():
+    """Parse arguments, compare both readers and report the times."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quotes", type=int, default=20000,
+                        help="quotes in the synthetic document")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="docx-bench-")
+    try:
+        paths = sorted(glob.glob(os.path.join(DATA, "*", "*.docx")))
+        paths.append(write_quote_files(directory, args.quotes,
+                                       ("docx",))["docx"])
+        for part in ("word/document.xml", "word/main.xml"):
+            paths.append(os.path.join(
+                directory, f"markup-{os.path.basename(part)}.docx"))
+            write_markup_docx(paths[-1], part)
+
+        failed = 0
+        for path in paths:
+            expected, slow = timed(
+                lambda path: [para.text
+                              for para in docx.Document(path).paragraphs],
+                path)
+            actual, fast = timed(lambda path: list(iter_paragraphs(path)),
+                                 path)
+            same = actual == expected
+            failed += not same
+            print(f"{os.path.basename(path):<28} {len(expected):7} paras "
+                  f"python-docx {1000 * slow:9.2f}ms "
+                  f"streaming {1000 * fast:9.2f}ms "
+                  f"{'OK' if same else 'DIFFERENT'}")
+            if not same:
+                for want, got in zip(expected, actual):
+                    if want != got:
+                        print(f"  expected {want!r}\n  got      {got!r}")
+                        break
+                else:
+                    print(f"  expected {len(expected)} paragraphs, "
+                          f"got {len(actual)}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    if failed:
+        print(f"FAILED: {failed} documents read differently")
+        sys.exit(1)
+    print("OK: the streaming reader matches python-docx on every document")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of the PDF text extraction backends.
+
+Writes many small synthetic quote PDFs and parses every one of them with
+Ingestor.parse through each available backend, reporting files per second:
+
+- pdftotext: the original path, a `pdftotext` process forked per file,
+- pypdf and pdfminer: in-process extraction, when installed.
+
+Every backend must produce the same quotes as the first one measured. With
+--ballast, the benchmark first allocates that many MiB, like a web worker
+holding image pools, to show how forking cost grows with the caller.
+
+Usage:
+    python -m benchmarks.pdf_backends [--files N] [--quotes Q]
+                                      [--ballast MB]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_quotes, write_pdf
+from quoteengine import Ingestor
+from quoteengine.ingestor import IngestorPDF
+from quoteengine.pdf_text import BACKENDS
+
+
+def main():
+    """Parse arguments, run every available backend and compare them."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--quotes", type=int, default=20,
+                        help="quotes per file")
+    parser.add_argument("--ballast", type=int, default=0,
+                        help="MiB to allocate before measuring")
+    args = parser.parse_args()
+
+    ballast = bytearray(args.ballast * 1024 * 1024)
+    ballast[::4096] = b"\1" * len(ballast[::4096])
+
+    directory = tempfile.mkdtemp(prefix="pdf-bench-")
+    try:
+        paths = []
+        for index in range(args.files):
+            paths.append(os.path.join(directory, f"quotes-{index}.pdf"))
+            write_pdf(paths[-1], make_quotes(args.quotes, seed=index))
+
+        expected = None
+        for name, backend_class in BACKENDS.items():
+            if not backend_class.available():
+                print(f"{name:<16} not available")
+                continue
+            IngestorPDF.backend = backend_class()
+            try:
+                # Warm up imports and the page cache
+                Ingestor.parse(paths[0])
+                started = time.perf_counter()
+                quotes = [Ingestor.parse(path) for path in paths]
+                elapsed = time.perf_counter() - started
+            finally:
+                IngestorPDF.backend.close()
+            print(f"{name:<16} {elapsed:8.3f}s "
+                  f"{args.files / elapsed:8.1f} files/s "
+                  f"{1000 * elapsed / args.files:8.2f}ms/file")
+            quotes = [[(quote.body, quote.author) for quote in file_quotes]
+                      for file_quotes in quotes]
+            if expected is None:
+                expected = quotes
+            elif quotes != expected:
+                print(f"FAILED: {name} parsed different quotes")
+                sys.exit(1)
+    finally:
+        IngestorPDF.backend = None
+        shutil.rmtree(directory, ignore_errors=True)
+    del ballast
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Benchmark suite for the ingestion and rendering hot paths.
+
+Runs three groups of measurements and writes them as JSON, so runs on
+different commits can be compared:
+
+- ingest: Ingestor.parse throughput for synthetic TXT, CSV, DOCX and PDF
+  files holding the same quotes,
+- render: latency of each render stage (decode, resize, wrap, draw and
+  encode) for synthetic JPEG, PNG and WebP photos of several sizes,
+- routes: latency of the Flask routes through the test client, against
+  the bundled corpus in ./_data, including /create fetching a photo from
+  a local HTTP server.
+
+Timings are reported as count, mean, min, max, p50, p90 and p99 in
+milliseconds. With --compare, p50 values are checked against an earlier
+result file and changes beyond --threshold percent are listed; the script
+exits with status 1 if any of them is a slowdown.
+
+Usage:
+    python -m benchmarks.suite [--quick] [--output FILE] [--compare FILE]
+                               [--only GROUP ...] [--keep]
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import (make_quotes, write_images,
+                                  write_quote_files)
+
+GROUPS = ("ingest", "render", "routes")
+SIZES = ((640, 480), (1920, 1080), (4000, 3000))
+QUICK_SIZES = ((640, 480), (1920, 1080))
+IMAGE_FORMATS = ("jpeg", "png", "webp")
+
+
+def summarize(samples):
+    """Return count, mean, extremes and percentiles of seconds, in ms."""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def percentile(q):
+        # Nearest rank, so every reported value was actually measured
+        return 1000 * ordered[min(count - 1, max(0, -(-q * count // 100)
+                                                 - 1))]
+
+    return {
+        "count": count,
+        "mean_ms": 1000 * sum(ordered) / count,
+        "min_ms": 1000 * ordered[0],
+        "max_ms": 1000 * ordered[-1],
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+    }
+
+
+def bench_ingest(directory, count, repeat):
+    """Time Ingestor.parse on the same quotes in every file format."""
+    from quoteengine import Ingestor
+
+    results = {}
+    for fmt, path in write_quote_files(directory, count).items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            quotes = Ingestor.parse(path)
+            samples.append(time.perf_counter() - started)
+        summary = summarize(samples)
+        size = os.path.getsize(path)
+        results[fmt] = {
+            **summary,
+            "quotes": len(quotes),
+            "bytes": size,
+            "quotes_per_s": len(quotes) / (summary["p50_ms"] / 1000),
+            "mb_per_s": size / 1e6 / (summary["p50_ms"] / 1000),
+        }
+        if len(quotes) != count:
+            print(f"warning: {fmt} parsed {len(quotes)} of {count} quotes",
+                  file=sys.stderr)
+    return results
+
+
+def bench_render(directory, sizes, rounds, width):
+    """Time every render stage on photos of each size and format."""
+    from memeengine import Encoder, MemeGenerator
+    from memeengine.encoder import available_formats
+    from memeengine.text_layer import text_layers
+
+    meme = MemeGenerator(directory, persist=False)
+    encoders = {fmt: Encoder(fmt) for fmt in available_formats()}
+    formats = [fmt for fmt in IMAGE_FORMATS if fmt in available_formats()]
+    quotes = make_quotes(rounds, seed=1)
+    results = {}
+    for name, path in write_images(directory, sizes, formats).items():
+        # Every round draws a quote not rasterized before
+        text_layers.clear()
+        stages = {stage: [] for stage in ("decode", "resize", "wrap",
+                                          "draw")}
+        stages.update({f"encode_{fmt}": [] for fmt in encoders})
+        for body, author in quotes:
+            started = time.perf_counter()
+            image = meme.load_image(path, width)
+            image.load()
+            decoded = time.perf_counter()
+            frame = meme.resize_image(image, width)
+            resized = time.perf_counter()
+            text = meme.wrap_text(body)
+            wrapped = time.perf_counter()
+            meme.add_text_to_image(frame, text, author)
+            drawn = time.perf_counter()
+            stages["decode"].append(decoded - started)
+            stages["resize"].append(resized - decoded)
+            stages["wrap"].append(wrapped - resized)
+            stages["draw"].append(drawn - wrapped)
+            for fmt, encoder in encoders.items():
+                started = time.perf_counter()
+                encoder.save(frame, io.BytesIO())
+                stages[f"encode_{fmt}"].append(time.perf_counter() - started)
+        results[name] = {stage: summarize(samples)
+                         for stage, samples in stages.items()}
+    return results
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Serve files without logging every request."""
+
+    def log_message(self, format, *args):
+        """Discard the request log line."""
+
+
+def serve_directory(directory):
+    """Serve a directory over HTTP on a free local port."""
+    handler = partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_routes(directory, rounds, warmup):
+    """Time the Flask routes through the test client."""
+    os.environ.setdefault("MEME_RELOAD_INTERVAL", "3600")
+    from app import create_app
+
+    client = create_app(eager=True).test_client()
+    write_images(directory, ((1024, 768),), ("jpeg",))
+    server = serve_directory(directory)
+    image_url = (f"http://127.0.0.1:{server.server_address[1]}"
+                 f"/photo-1024x768.jpeg")
+    form = {"image_url": image_url, "body": "Benchmarks are good dogs",
+            "author": "Suite"}
+    routes = {
+        "GET /": lambda: client.get("/"),
+        "GET /?min_len=1": lambda: client.get("/?min_len=1"),
+        "GET /meme": lambda: client.get("/meme"),
+        "GET /meme?format=png": lambda: client.get("/meme?format=png"),
+        "GET /meme?format=webp": lambda: client.get("/meme?format=webp"),
+        "GET /corpus": lambda: client.get("/corpus"),
+        "POST /create": lambda: client.post("/create", data=form),
+    }
+    results = {}
+    try:
+        for route, call in routes.items():
+            samples = []
+            for number in range(warmup + rounds):
+                started = time.perf_counter()
+                response = call()
+                elapsed = time.perf_counter() - started
+                if response.status_code != 200:
+                    raise RuntimeError(
+                        f"{route} answered {response.status_code}")
+                if number >= warmup:
+                    samples.append(elapsed)
+            results[route] = summarize(samples)
+    finally:
+        server.shutdown()
+    return results
+
+
+def environment():
+    """Describe the machine, versions and commit the suite ran on."""
+    import PIL
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def flatten_p50(results, prefix=""):
+    """Return the p50 of every summary in a result tree by its path."""
+    values = {}
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        if "p50_ms" in value:
+            values[prefix + key] = value["p50_ms"]
+        else:
+            values.update(flatten_p50(value, f"{prefix}{key}/"))
+    return values
+
+
+def compare(baseline, current, threshold):
+    """Print p50 changes beyond threshold percent; return the slowdowns."""
+    before = flatten_p50({group: baseline.get(group, {})
+                          for group in GROUPS})
+    after = flatten_p50({group: current.get(group, {}) for group in GROUPS})
+    slower = []
+    for path in sorted(before.keys() & after.keys()):
+        if not before[path]:
+            continue
+        change = 100 * (after[path] - before[path]) / before[path]
+        if abs(change) >= threshold:
+            print(f"{'SLOWER' if change > 0 else 'faster':<7} {path}: "
+                  f"{before[path]:.2f}ms -> {after[path]:.2f}ms "
+                  f"({change:+.0f}%)")
+            if change > 0:
+                slower.append(path)
+    print(f"{len(slower)} of {len(before.keys() & after.keys())} "
+          f"timings slower by {threshold:g}% or more")
+    return slower
+
+
+def report(results):
+    """Print the p50 and p99 of every timing."""
+    for path, p50 in flatten_p50({group: results[group]
+                                  for group in GROUPS
+                                  if group in results}).items():
+        print(f"{path:<48} p50 {p50:9.2f}ms")
+    for fmt, result in results.get("ingest", {}).items():
+        print(f"ingest {fmt}: {result['quotes_per_s']:,.0f} quotes/s, "
+              f"{result['mb_per_s']:.1f} MB/s")
+
+
+def main():
+    """Parse arguments, run the selected groups and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true",
+                        help="fewer quotes, rounds and image sizes")
+    parser.add_argument("--quotes", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--width", type=int, default=500)
+    parser.add_argument("--only", nargs="+", choices=GROUPS,
+                        default=GROUPS)
+    parser.add_argument("--output", default=None,
+                        help="result file (default: bench-<time>.json)")
+    parser.add_argument("--compare", default=None,
+                        help="earlier result file to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    parser.add_argument("--keep", action="store_true",
+                        help="keep the synthetic files")
+    args = parser.parse_args()
+
+    quotes = args.quotes or (2000 if args.quick else 20000)
+    repeat = args.repeat or (3 if args.quick else 5)
+    rounds = args.rounds or (10 if args.quick else 50)
+    sizes = QUICK_SIZES if args.quick else SIZES
+
+    directory = tempfile.mkdtemp(prefix="meme-bench-")
+    results = {"environment": environment(),
+               "settings": {"quotes": quotes, "repeat": repeat,
+                            "rounds": rounds, "width": args.width,
+                            "sizes": sizes}}
+    try:
+        if "ingest" in args.only:
+            results["ingest"] = bench_ingest(directory, quotes, repeat)
+        if "render" in args.only:
+            results["render"] = bench_render(directory, sizes, rounds,
+                                             args.width)
+        if "routes" in args.only:
+            results["routes"] = bench_routes(directory, rounds,
+                                             warmup=max(1, rounds // 10))
+    finally:
+        if args.keep:
+            print(f"synthetic files kept in {directory}")
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    report(results)
+    output = args.output or time.strftime("bench-%Y%m%d-%H%M%S.json")
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(json.load(file), results, args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
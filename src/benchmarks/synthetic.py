@@ -0,0 +1,220 @@
+"""
+Synthetic corpora for the benchmarks.
+
+Writes quote files in every format the Ingestor reads, and source photos in
+several sizes and formats, so benchmarks do not depend on the small bundled
+data set. Nothing here needs tools beyond the project's own dependencies:
+DOCX files are assembled with zipfile and PDF files are written by hand.
+
+Functions:
+    make_quotes: Deterministic (body, author) pairs.
+    write_txt: Write quotes as "body - author" lines.
+    write_csv: Write quotes as a body,author CSV file.
+    write_docx: Write quotes as DOCX paragraphs.
+    write_pdf: Write quotes as lines of a text PDF.
+    write_quote_files: Write the same quotes in every format.
+    write_images: Write test photos in several sizes and formats.
+"""
+
+import csv
+import os
+import random
+import zipfile
+from typing import Dict, Iterable, List, Tuple
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "dog bone walk ball good loyal friend bark sleep run treat tail paw "
+    "happy home love squirrel mailman couch fetch stick puppy nap bath "
+    "leash park sniff wag howl chew shoe cat dinner"
+).split()
+AUTHORS = ("Bork", "Skittle", "Mr. Paws", "Stinky", "Rex", "Fido", "Luna",
+           "Biscuit", "Sir Wagsalot", "Pepper")
+
+
+def make_quotes(count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Return deterministic quotes of 3 to 20 words.
+
+    :param count: Number of quotes.
+    :param seed: Seed of the random generator.
+    :return: (body, author) pairs.
+    """
+    rng = random.Random(seed)
+    quotes = []
+    for _ in range(count):
+        body = " ".join(rng.choice(WORDS)
+                        for _ in range(rng.randint(3, 20)))
+        quotes.append((body.capitalize(), rng.choice(AUTHORS)))
+    return quotes
+
+
+def write_txt(path: str, quotes: Iterable[Tuple[str, str]]) -> None:
+    """Write quotes as "body - author" lines."""
+    with open(path, "w", encoding="utf-8") as file:
+        for body, author in quotes:
+            file.write(f"{body} - {author}\n")
+
+
+def write_csv(path: str, quotes: Iterable[Tuple[str, str]]) -> None:
+    """Write quotes as a CSV file with body and author columns."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(("body", "author"))
+        writer.writerows(quotes)
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def write_docx(path: str, quotes: Iterable[Tuple[str, str]]) -> None:
+    """Write quotes as one "body - author" paragraph each."""
+    paragraphs = "".join(
+        f"<w:p><w:r><w:t>{escape(f'{body} - {author}')}</w:t></w:r></w:p>"
+        for body, author in quotes
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W_NS}"><w:body>{paragraphs}</w:body>'
+        '</w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+
+
+def _pdf_string(text: str) -> str:
+    """Return text as a PDF literal string."""
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(") \
+        .replace(")", "\\)") + ")"
+
+
+def write_pdf(path: str, quotes: Iterable[Tuple[str, str]],
+              lines_per_page: int = 60) -> None:
+    """
+    Write quotes as a PDF with one "body - author" line each.
+
+    The PDF uses the built-in Helvetica font and uncompressed content
+    streams, which every PDF text extractor can read.
+    """
+    lines = [f"{body} - {author}" for body, author in quotes]
+    pages = [lines[start:start + lines_per_page]
+             for start in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objects 1-3 are the catalog, page tree and font; each page adds a
+    # page object and its content stream.
+    objects: Dict[int, bytes] = {}
+    kids = []
+    for number, page in enumerate(pages):
+        page_id, content_id = 4 + 2 * number, 5 + 2 * number
+        kids.append(f"{page_id} 0 R")
+        text = " T* ".join(f"{_pdf_string(line)} Tj" for line in page)
+        stream = f"BT /F1 9 Tf 11 TL 36 806 Td {text} ET".encode("latin-1")
+        objects[content_id] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode()
+            + stream + b"\nendstream"
+        )
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ).encode()
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = (f"<< /Type /Pages /Kids [{' '.join(kids)}] "
+                  f"/Count {len(kids)} >>").encode()
+    objects[3] = (b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                  b"/Encoding /WinAnsiEncoding >>")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += f"{object_id} 0 obj\n".encode() + objects[object_id] \
+            + b"\nendobj\n"
+    xref = len(output)
+    size = max(objects) + 1
+    output += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for object_id in range(1, size):
+        output += f"{offsets[object_id]:010d} 00000 n \n".encode()
+    output += (f"trailer\n<< /Size {size} /Root 1 0 R >>\n"
+               f"startxref\n{xref}\n%%EOF\n").encode()
+    with open(path, "wb") as file:
+        file.write(output)
+
+
+WRITERS = {"txt": write_txt, "csv": write_csv, "docx": write_docx,
+           "pdf": write_pdf}
+
+
+def write_quote_files(directory: str, count: int,
+                      formats: Iterable[str] = tuple(WRITERS)
+                      ) -> Dict[str, str]:
+    """
+    Write the same quotes in every format.
+
+    :param directory: Directory to write the files to.
+    :param count: Number of quotes per file.
+    :param formats: File formats to write.
+    :return: The path of each written file, by format.
+    """
+    quotes = make_quotes(count)
+    paths = {}
+    for fmt in formats:
+        paths[fmt] = os.path.join(directory, f"quotes-{count}.{fmt}")
+        WRITERS[fmt](paths[fmt], quotes)
+    return paths
+
+
+def write_images(directory: str,
+                 sizes: Iterable[Tuple[int, int]] = ((640, 480),
+                                                     (1920, 1080),
+                                                     (4000, 3000)),
+                 formats: Iterable[str] = ("jpeg", "png", "webp")
+                 ) -> Dict[str, str]:
+    """
+    Write photo-like test images: smooth gradients with grain.
+
+    :param directory: Directory to write the images to.
+    :param sizes: (width, height) of the images.
+    :param formats: Image formats to write.
+    :return: The path of each image, by "<width>x<height>.<format>".
+    """
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    paths = {}
+    for width, height in sizes:
+        y, x = np.mgrid[0:height, 0:width]
+        pixels = np.stack([255 * x / width, 255 * y / height,
+                           128 + 64 * np.sin(x / 37.0) * np.cos(y / 23.0)],
+                          axis=-1)
+        pixels += rng.normal(0, 12, pixels.shape)
+        image = Image.fromarray(pixels.clip(0, 255).astype(np.uint8))
+        for fmt in formats:
+            name = f"{width}x{height}.{fmt}"
+            paths[name] = os.path.join(directory, f"photo-{name}")
+            image.save(paths[name], format=fmt.upper())
+    return paths
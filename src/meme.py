@@ -6,26 +6,73 @@ quotes to images. The script can either take a random image
 and quote or use a user-supplied image and quote. The
 generated meme is saved to a temporary directory.
 
+With --batch, the script instead renders every row of a CSV manifest
+(columns: path, body, author and optionally width) across a pool of worker
+processes. Empty path or body cells are filled with a random image or quote.
+
 Modules used:
     - os: For interacting with the file system.
+    - sys: For reporting batch throughput on stderr.
+    - csv: For reading batch manifests.
     - random: For randomly selecting images and quotes.
     - argparse: For parsing command-line arguments.
     - quoteengine: For ingesting quotes from different file formats.
     - memeengine: For generating memes by overlaying text on images.
 
 Functions:
+    - load_images: Lists the bundled dog images.
+    - load_quotes: Parses the bundled quote files.
     - generate_meme: Generates a meme using a
                      random or user-provided image and quote.
+    - read_manifest: Reads batch jobs from a CSV manifest.
+    - generate_batch: Renders every job of a manifest in parallel.
     - parse_args: Parses command-line arguments
                   to get image path, quote body, and author.
 """
 
 import os
+import sys
+import csv
 import random
 import argparse
-from quoteengine import Ingestor
+from quoteengine import QuoteCache
 from quoteengine.quote_model import QuoteModel
-from memeengine import MemeGenerator
+from memeengine import MemeGenerator, MemeJob
+
+
+def load_images():
+    """
+    List the bundled dog images.
+
+    Returns:
+        list: Paths of every file under ./_data/photos/dog/.
+    """
+    images = "./_data/photos/dog/"
+    return [
+        os.path.join(root, name)
+        for root, _, files in os.walk(images)
+        for name in files
+    ]
+
+
+def load_quotes():
+    """
+    Parse the bundled quote files.
+
+    Parsed quotes are cached next to the sources, so files that have not
+    changed since the last run are not parsed again.
+
+    Returns:
+        list: QuoteModel instances from every file in ./_data/DogQuotes/.
+    """
+    quote_files = [
+        "./_data/DogQuotes/DogQuotesTXT.txt",
+        "./_data/DogQuotes/DogQuotesDOCX.docx",
+        "./_data/DogQuotes/DogQuotesPDF.pdf",
+        "./_data/DogQuotes/DogQuotesCSV.csv",
+    ]
+    cache = QuoteCache("./_data/DogQuotes/.quotes-cache.sqlite3")
+    return cache.parse_many(quote_files).quotes
 
 
 def generate_meme(path=None, body=None, author=None):
@@ -53,25 +100,12 @@ def generate_meme(path=None, body=None, author=None):
         str: The path to the generated meme image.
     """
     if path is None:
-        images = "./_data/photos/dog/"
-        imgs = [
-            os.path.join(root, name)
-            for root, _, files in os.walk(images)
-            for name in files
-        ]
-        img = random.choice(imgs)
+        img = random.choice(load_images())
     else:
         img = path
 
     if body is None:
-        quote_files = [
-            "./_data/DogQuotes/DogQuotesTXT.txt",
-            "./_data/DogQuotes/DogQuotesDOCX.docx",
-            "./_data/DogQuotes/DogQuotesPDF.pdf",
-            "./_data/DogQuotes/DogQuotesCSV.csv",
-        ]
-        quotes = [quote for f in quote_files for quote in Ingestor.parse(f)]
-        quote = random.choice(quotes)
+        quote = random.choice(load_quotes())
     else:
         if author is None:
             raise ValueError("Author required if body is provided")
@@ -81,6 +115,73 @@ def generate_meme(path=None, body=None, author=None):
     return meme.make_meme(img, quote.body, quote.author)
 
 
+def read_manifest(manifest):
+    """
+    Read batch jobs from a CSV manifest.
+
+    Each row has the columns path, body, author and optionally width.
+    A row with an empty path gets a random image and a row with an empty
+    body gets a random quote; images and quotes are loaded at most once.
+
+    Parameters:
+        manifest (str): Path to the CSV manifest.
+
+    Raises:
+        ValueError: If a row has a body but no author.
+
+    Returns:
+        list: MemeJob instances, one per row.
+    """
+    imgs = quotes = None
+    jobs = []
+    with open(manifest, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            path = row.get("path") or None
+            body = row.get("body") or None
+            author = row.get("author") or None
+            if path is None:
+                imgs = imgs if imgs is not None else load_images()
+                path = random.choice(imgs)
+            if body is None:
+                quotes = quotes if quotes is not None else load_quotes()
+                quote = random.choice(quotes)
+                body, author = quote.body, quote.author
+            elif author is None:
+                raise ValueError("Author required if body is provided")
+            width = int(row.get("width") or 500)
+            jobs.append(MemeJob(path, body, author, width))
+    return jobs
+
+
+def generate_batch(manifest, workers=None):
+    """
+    Render every job of a CSV manifest in parallel.
+
+    Paths of the generated memes are printed as they finish; failures and
+    the overall throughput are reported on stderr.
+
+    Parameters:
+        manifest (str): Path to the CSV manifest.
+        workers (int, optional): Number of worker processes.
+                                 Defaults to the number of CPUs.
+
+    Returns:
+        MemeBatch: The finished batch with its counters.
+    """
+    meme = MemeGenerator("./tmp")
+    batch = meme.make_memes(read_manifest(manifest), processes=workers)
+    for result in batch:
+        if result.error is None:
+            print(result.path, flush=True)
+        else:
+            print(f"job {result.index} failed: {result.error}",
+                  file=sys.stderr)
+    print(f"{batch.completed} memes, {batch.failed} failed "
+          f"in {batch.elapsed:.2f}s ({batch.throughput:.1f} memes/s, "
+          f"{batch.processes} workers)", file=sys.stderr)
+    return batch
+
+
 def parse_args():
     """
     Parse command-line arguments.
@@ -95,6 +196,8 @@ def parse_args():
             - path: The path to the image file (str).
             - body: The body of the quote (str).
             - author: The author of the quote (str).
+            - batch: The path to a batch manifest (str).
+            - workers: The number of batch worker processes (int).
     """
     parser = argparse.ArgumentParser(description="Generate a meme")
     parser.add_argument("--path", type=str, default=None,
@@ -105,9 +208,18 @@ def parse_args():
     parser.add_argument(
         "--author", type=str, default=None,
         help="Quote author to add to the image")
+    parser.add_argument(
+        "--batch", type=str, default=None,
+        help="CSV manifest (path, body, author, width) to render in bulk")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes for --batch (default: number of CPUs)")
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
-    print(generate_meme(args.path, args.body, args.author))
+    if args.batch is not None:
+        generate_batch(args.batch, args.workers)
+    else:
+        print(generate_meme(args.path, args.body, args.author))
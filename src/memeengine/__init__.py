@@ -3,7 +3,61 @@ This module imports the MemeGenerator class for generating memes.
 
 The MemeGenerator class is responsible for creating memes by overlaying text
 on images, with functionality to load an image, generate memes with specified
-text and author, and save the resulting meme.
+text and author, and save the resulting meme. The RenderCache class lets a
+generator reuse memes it has already rendered, and the ImagePool class keeps
+decoded source photos in memory between renders. Fonts are loaded once per
+process through the FontRegistry instance `memeengine.fonts.fonts`; the
+registry itself is not re-exported, because `memeengine.fonts` names its
+submodule once that is imported. MemeJob describes one meme of a batch
+rendered by MemeGenerator.make_memes, and ImageFetcher downloads remote
+source images into memory with timeouts and a size limit. RemoteImageCache
+keeps fetched images on disk and revalidates them by URL.
+
+TextLayerCache, exposed process-wide as `text_layers`, keeps quotes
+rasterized into RGBA layers that are composited onto each meme, and Encoder
+writes finished memes as JPEG, PNG or WebP with configurable settings.
+RenderQueue runs renders on a bounded, prioritized pool of workers and
+raises QueueFull when it has no room; jobs past their deadline fail with
+DeadlineExceeded. MemeReservoir keeps a stock of memes rendered ahead of
+time by background threads. Render stages are timed through a recorder that
+does nothing until an application installs one with set_recorder.
+
+The classes are imported from their submodules on first access, so importing
+this package does not pull in PIL or requests until they are needed.
 """
 
-from .meme_generator import MemeGenerator
+import importlib
+
+_exports = {
+    "MemeGenerator": ".meme_generator",
+    "BatchResult": ".batch",
+    "MemeBatch": ".batch",
+    "MemeJob": ".batch",
+    "Encoder": ".encoder",
+    "FetchError": ".fetcher",
+    "ImageFetcher": ".fetcher",
+    "FontRegistry": ".fonts",
+    "ImagePool": ".image_pool",
+    "RemoteImageCache": ".remote_cache",
+    "MemeReservoir": ".reservoir",
+    "RenderCache": ".render_cache",
+    "DeadlineExceeded": ".render_queue",
+    "QueueFull": ".render_queue",
+    "RenderJob": ".render_queue",
+    "RenderQueue": ".render_queue",
+    "TextLayer": ".text_layer",
+    "TextLayerCache": ".text_layer",
+    "text_layers": ".text_layer",
+    "set_recorder": ".recorder",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    """Import an exported name from its submodule on first access."""
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_exports[name], __name__), name)
+    globals()[name] = value
+    return value
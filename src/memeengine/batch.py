@@ -0,0 +1,182 @@
+"""
+Batch Rendering Module.
+
+This module renders many memes at once by spreading the jobs over a pool of
+worker processes. Every worker keeps its own MemeGenerator with an image
+pool, so source photos are decoded once per worker and fonts are loaded once
+per worker, no matter how many jobs reuse them.
+
+Results are streamed back in completion order while the batch runs, and the
+batch keeps count of finished jobs and throughput.
+
+Classes:
+    MemeJob: The description of one meme to render.
+    BatchResult: The outcome of one rendered job.
+    MemeBatch: An iterator over the results of a running batch.
+
+Functions:
+    None.
+"""
+
+import os
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                wait)
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from .encoder import Encoder
+from .fonts import DEFAULT_FONT
+from .image_pool import ImagePool
+
+
+class MemeJob(NamedTuple):
+    """A single meme to render: source image, quote and output width."""
+
+    img_path: str
+    text: str
+    author: str
+    width: int = 500
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of one job in a batch.
+
+    Attributes:
+        index (int): Position of the job in the submitted sequence.
+        job (MemeJob): The job that was rendered.
+        path (str): Path of the generated meme, or None on failure.
+        error (str): Error message if the render failed, otherwise None.
+    """
+
+    index: int
+    job: MemeJob
+    path: Optional[str]
+    error: Optional[str]
+
+
+_worker_generator = None
+
+
+def _init_worker(output_dir: str, font: str, resample: str, style: str,
+                 encoder: Optional[Encoder], pool_bytes: int) -> None:
+    """Create the MemeGenerator reused by every job in this worker."""
+    from .meme_generator import MemeGenerator
+
+    global _worker_generator
+    _worker_generator = MemeGenerator(
+        output_dir, pool=ImagePool(max_bytes=pool_bytes), font=font,
+        resample=resample, style=style, encoder=encoder
+    )
+
+
+def _render_job(index: int, job: MemeJob) -> tuple:
+    """Render one job in a worker and report the path or the error."""
+    try:
+        _worker_generator.pool.register([job.img_path])
+        path = _worker_generator.make_meme(job.img_path, job.text,
+                                           job.author, job.width)
+        return index, path, None
+    except Exception as error:
+        return index, None, f"{type(error).__name__}: {error}"
+
+
+class MemeBatch:
+    """
+    MemeBatch renders a sequence of jobs and yields results as they finish.
+
+    At most a few jobs per worker are in flight at a time, so arbitrarily
+    long job sequences are consumed lazily. A job that fails produces a
+    BatchResult with an error instead of stopping the batch.
+
+    Attributes:
+        processes (int): Number of worker processes.
+        completed (int): Number of jobs rendered successfully so far.
+        failed (int): Number of jobs that failed so far.
+        elapsed (float): Seconds since the batch started.
+    """
+
+    def __init__(self, output_dir: str, jobs: Iterable[MemeJob],
+                 processes: Optional[int] = None, font: str = DEFAULT_FONT,
+                 resample: str = "nearest", style: str = "plain",
+                 encoder: Optional[Encoder] = None,
+                 pool_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the batch.
+
+        :param output_dir: Output directory for the generated memes.
+        :param jobs: The jobs to render.
+        :param processes: Number of worker processes (default: CPU count).
+        :param font: Name of the registered font used to draw text.
+        :param resample: Resampling filter used to resize images.
+        :param style: Text style used to draw the quotes.
+        :param encoder: Output format and encoding settings.
+        :param pool_bytes: Memory cap of each worker's image pool.
+        """
+        self.output_dir = str(output_dir)
+        self.jobs = jobs
+        self.processes = processes or os.cpu_count() or 1
+        self.font = font
+        self.resample = resample
+        self.style = style
+        self.encoder = encoder
+        self.pool_bytes = pool_bytes
+        self.completed = 0
+        self.failed = 0
+        self._started = None
+        self._finished = None
+
+    @property
+    def elapsed(self) -> float:
+        """Return the seconds spent on the batch so far."""
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    @property
+    def throughput(self) -> float:
+        """Return the number of finished jobs per second."""
+        elapsed = self.elapsed
+        done = self.completed + self.failed
+        return done / elapsed if elapsed > 0 else 0.0
+
+    def __iter__(self) -> Iterator[BatchResult]:
+        """Run the batch and yield each result as soon as it is ready."""
+        self._started = time.perf_counter()
+        self._finished = None
+        try:
+            yield from self._run()
+        finally:
+            self._finished = time.perf_counter()
+
+    def _run(self) -> Iterator[BatchResult]:
+        """Feed jobs to the process pool and collect finished ones."""
+        jobs = enumerate(self.jobs)
+        window = self.processes * 4
+        with ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_init_worker,
+            initargs=(self.output_dir, self.font, self.resample,
+                      self.style, self.encoder, self.pool_bytes)
+        ) as executor:
+            pending = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < window:
+                    item = next(jobs, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    index, job = item[0], MemeJob(*item[1])
+                    future = executor.submit(_render_job, index, job)
+                    pending[future] = job
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    index, path, error = future.result()
+                    if error is None:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    yield BatchResult(index, job, path, error)
@@ -0,0 +1,184 @@
+"""
+Encoder Module.
+
+This module defines the Encoder class, the last stage of the render
+pipeline, which turns a finished meme into JPEG, PNG or WebP bytes. The
+encoder owns every setting that trades image quality for size: quality,
+progressive and optimized JPEG encoding, chroma subsampling, and whether
+EXIF and ICC metadata of the source photo are carried over.
+
+Images with transparency keep it in PNG and WebP; for JPEG, which has no
+alpha channel, they are flattened onto a white background first.
+
+WebP support depends on how Pillow was built; formats the running Pillow
+cannot write are left out of available_formats, so callers negotiating a
+format with clients fall back to JPEG or PNG.
+
+Classes:
+    Encoder: Encoding settings and the code that applies them.
+
+Functions:
+    available_formats: The output formats the running Pillow can write.
+    flatten: Composite an image with transparency onto a background.
+"""
+
+from typing import IO, List, Optional, Tuple, Union
+
+from PIL import Image, features
+
+from .image_pool import normalize_mode
+
+# name: (PIL format, mimetype, file suffix)
+FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "png": ("PNG", "image/png", ".png"),
+    "webp": ("WEBP", "image/webp", ".webp"),
+}
+SUBSAMPLING = {"4:4:4": 0, "4:2:2": 1, "4:2:0": 2}
+
+
+def available_formats() -> List[str]:
+    """Return the names of the output formats Pillow can write here."""
+    return [name for name in FORMATS
+            if name != "webp" or features.check("webp")]
+
+
+def flatten(image: Image.Image,
+            background: Tuple[int, int, int] = (255, 255, 255)
+            ) -> Image.Image:
+    """
+    Return an RGB version of an image, compositing any transparency.
+
+    :param image: The image to flatten.
+    :param background: Colour shown through transparent pixels.
+    :return: The image itself if it is RGB already, otherwise a new image.
+    """
+    if image.mode == "RGB":
+        return image
+    if image.mode == "P" and "transparency" in image.info:
+        image = image.convert("RGBA")
+    if image.mode in ("RGBA", "LA", "PA"):
+        image = image.convert("RGBA")
+        flat = Image.new("RGB", image.size, background)
+        flat.paste(image, mask=image.getchannel("A"))
+        return flat
+    return image.convert("RGB")
+
+
+class Encoder:
+    """
+    Encoder writes finished memes in a configurable format.
+
+    An encoder is shared by every render of a generator, so treat it as
+    read-only and use replace to derive one with other settings.
+
+    Attributes:
+        format (str): Output format: "jpeg", "png" or "webp".
+        quality (int): JPEG and WebP quality from 1 to 100.
+        progressive (bool): Write progressive JPEGs.
+        optimize (bool): Spend extra time for smaller JPEG and PNG files.
+        subsampling (str): JPEG chroma subsampling: "4:4:4", "4:2:2" or
+                           "4:2:0"; None uses Pillow's default.
+        strip_metadata (bool): Drop EXIF and ICC data of the source photo.
+    """
+
+    __slots__ = ("format", "quality", "progressive", "optimize",
+                 "subsampling", "strip_metadata")
+
+    def __init__(self, format: str = "jpeg", quality: int = 75,
+                 progressive: bool = False, optimize: bool = False,
+                 subsampling: Optional[str] = None,
+                 strip_metadata: bool = True):
+        """
+        Initialize and validate the encoding settings.
+
+        The defaults match Pillow's own JPEG defaults.
+
+        :param format: Output format: "jpeg", "png" or "webp".
+        :param quality: JPEG and WebP quality from 1 to 100 (default: 75).
+        :param progressive: Write progressive JPEGs (default: False).
+        :param optimize: Optimize JPEG Huffman tables and PNG compression
+                         at some CPU cost (default: False).
+        :param subsampling: JPEG chroma subsampling (default: Pillow's).
+        :param strip_metadata: Drop EXIF and ICC data (default: True).
+        :raises ValueError: If a setting is not supported.
+        """
+        format = format.lower()
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported output format: {format}")
+        if format not in available_formats():
+            raise ValueError(f"Pillow cannot write {format} here")
+        if not 1 <= int(quality) <= 100:
+            raise ValueError(f"Quality must be from 1 to 100: {quality}")
+        if subsampling is not None and subsampling not in SUBSAMPLING:
+            raise ValueError(f"Unsupported subsampling: {subsampling}")
+        self.format = format
+        self.quality = int(quality)
+        self.progressive = bool(progressive)
+        self.optimize = bool(optimize)
+        self.subsampling = subsampling
+        self.strip_metadata = bool(strip_metadata)
+
+    def __repr__(self) -> str:
+        """Return the settings as a constructor call."""
+        settings = ", ".join(f"{name}={value!r}"
+                             for name, value in self.params().items())
+        return f"Encoder({settings})"
+
+    def params(self) -> dict:
+        """Return the settings, e.g. to make render cache keys."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes) -> "Encoder":
+        """
+        Return a new encoder with some settings changed.
+
+        :param changes: The settings to change, by name.
+        :return: The new encoder.
+        """
+        return Encoder(**{**self.params(), **changes})
+
+    @property
+    def mimetype(self) -> str:
+        """Return the MIME type of the encoded images."""
+        return FORMATS[self.format][1]
+
+    @property
+    def suffix(self) -> str:
+        """Return the file suffix of the encoded images."""
+        return FORMATS[self.format][2]
+
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """
+        Convert an image to a mode the output format can store.
+
+        :param image: The finished meme.
+        :return: The image to encode; the input if no conversion is needed.
+        """
+        if self.format == "jpeg":
+            return flatten(image)
+        return normalize_mode(image)
+
+    def save(self, image: Image.Image, fp: Union[str, IO[bytes]]) -> None:
+        """
+        Encode an image into a file.
+
+        :param image: The finished meme.
+        :param fp: Path or binary file object to write to.
+        """
+        options = {}
+        if not self.strip_metadata:
+            for key in ("exif", "icc_profile"):
+                if image.info.get(key):
+                    options[key] = image.info[key]
+        if self.format in ("jpeg", "webp"):
+            options["quality"] = self.quality
+        if self.format == "jpeg":
+            options["progressive"] = self.progressive
+            options["optimize"] = self.optimize
+            if self.subsampling is not None:
+                options["subsampling"] = SUBSAMPLING[self.subsampling]
+        elif self.format == "png":
+            options["optimize"] = self.optimize
+        self.prepare(image).save(fp, format=FORMATS[self.format][0],
+                                 **options)
@@ -0,0 +1,154 @@
+"""
+Image Fetcher Module.
+
+This module defines the ImageFetcher class, which downloads source images
+for custom memes. Downloads go through a pooled HTTP session with connect
+and read timeouts, and the body is streamed into memory while a maximum size
+is enforced, so a slow or huge URL cannot tie up a worker. The fetched image
+is returned as an in-memory buffer that MemeGenerator can decode directly.
+Downloads are timed as the "download" stage of the meme engine's recorder.
+
+Classes:
+    FetchError: Raised when an image cannot be fetched.
+    FetchResult: The status, body and headers of a fetch.
+    ImageFetcher: A bounded, connection-reusing HTTP image fetcher.
+
+Functions:
+    None.
+"""
+
+import asyncio
+import io
+from typing import Mapping, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .recorder import recorder
+
+
+class FetchError(ValueError):
+    """Raised when a remote image cannot be fetched."""
+
+
+class FetchResult(NamedTuple):
+    """
+    The outcome of an HTTP fetch.
+
+    Attributes:
+        status (int): The HTTP status code (200 or 304).
+        content (bytes): The response body; empty for 304 responses.
+        headers (Mapping): The response headers.
+    """
+
+    status: int
+    content: bytes
+    headers: Mapping[str, str]
+
+
+class ImageFetcher:
+    """
+    ImageFetcher downloads images over a shared, pooled HTTP session.
+
+    Attributes:
+        connect_timeout (float): Seconds allowed to establish a connection.
+        read_timeout (float): Seconds allowed between received bytes.
+        max_bytes (int): Largest accepted response body, in bytes.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 max_bytes: int = 10 * 1024 * 1024, pool_size: int = 10):
+        """
+        Initialize the fetcher and its connection pool.
+
+        :param connect_timeout: Seconds allowed to establish a connection.
+        :param read_timeout: Seconds allowed between received bytes.
+        :param max_bytes: Largest accepted response body, in bytes.
+        :param pool_size: Number of connections kept open per host.
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str,
+            headers: Optional[Mapping[str, str]] = None) -> FetchResult:
+        """
+        Fetch a URL, streaming the body up to the size limit.
+
+        A 304 Not Modified response is returned as is, so callers can send
+        conditional request headers.
+
+        :param url: The http or https URL to fetch.
+        :param headers: Optional extra request headers.
+        :return: The status, body and headers of the response.
+        :raises FetchError: If the URL is invalid, the request fails or
+                            times out, or the body exceeds max_bytes.
+        """
+        if urlparse(url).scheme not in ("http", "https"):
+            raise FetchError(f"Unsupported image URL: {url}")
+        with recorder.stage("meme", "download"):
+            return self.__get(url, headers)
+
+    def __get(self, url: str,
+              headers: Optional[Mapping[str, str]]) -> FetchResult:
+        """Send the request and stream the body; see get."""
+        try:
+            with self.session.get(
+                url, headers=headers, stream=True,
+                timeout=(self.connect_timeout, self.read_timeout)
+            ) as response:
+                if response.status_code == 304:
+                    return FetchResult(304, b"", response.headers)
+                if response.status_code != 200:
+                    raise FetchError(f"Fetching {url} returned HTTP "
+                                     f"{response.status_code}")
+                length = response.headers.get("Content-Length")
+                if length is not None and length.isdigit() \
+                        and int(length) > self.max_bytes:
+                    raise FetchError(f"Image at {url} is larger than "
+                                     f"{self.max_bytes} bytes")
+                body = bytearray()
+                for chunk in response.iter_content(self.chunk_size):
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        raise FetchError(f"Image at {url} is larger than "
+                                         f"{self.max_bytes} bytes")
+                return FetchResult(200, bytes(body), response.headers)
+        except requests.RequestException as error:
+            raise FetchError(f"Could not fetch {url}: {error}") from error
+
+    def fetch(self, url: str) -> io.BytesIO:
+        """
+        Fetch an image into an in-memory buffer.
+
+        :param url: The http or https URL of the image.
+        :return: A buffer holding the image bytes, positioned at the start.
+        :raises FetchError: If the image cannot be fetched.
+        """
+        return io.BytesIO(self.get(url).content)
+
+    async def fetch_async(self, url: str) -> io.BytesIO:
+        """
+        Fetch an image without blocking the running event loop.
+
+        The blocking fetch runs in the loop's default thread pool and still
+        uses the shared connection pool.
+
+        :param url: The http or https URL of the image.
+        :return: A buffer holding the image bytes, positioned at the start.
+        :raises FetchError: If the image cannot be fetched.
+        """
+        return await asyncio.to_thread(self.fetch, url)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
@@ -0,0 +1,94 @@
+"""
+Font Registry Module.
+
+This module defines the FontRegistry class, a process-wide cache of loaded
+TrueType fonts. Each (font file, size) pair is parsed from disk once and the
+resulting face is shared by every render in the process.
+
+Font files are registered under a short name. The bundled `arial.ttf` is
+registered as "arial" and resolved relative to this package, so rendering
+no longer depends on the current working directory.
+
+Classes:
+    FontRegistry: A thread-safe registry and cache of TrueType fonts.
+
+Attributes:
+    fonts: The process-wide FontRegistry used by MemeGenerator.
+"""
+
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import ImageFont
+
+DEFAULT_FONT = "arial"
+FONT_DIR = Path(__file__).resolve().parent
+
+
+class FontRegistry:
+    """
+    FontRegistry loads each (font file, size) pair once.
+
+    Loading is serialised by a lock so concurrent first uses of a font do
+    not parse the file twice. Faces are read-only after loading, and Pillow
+    draws text while holding the GIL, so cached faces can be shared by
+    worker threads.
+    """
+
+    def __init__(self):
+        """Initialize the registry with the bundled Arial font."""
+        self._files: Dict[str, str] = {}
+        self._faces: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        self._lock = threading.Lock()
+        self.register(DEFAULT_FONT, FONT_DIR / "arial.ttf")
+
+    def register(self, name: str, path) -> None:
+        """
+        Register a font file under a name.
+
+        Re-registering a name drops the faces loaded from the old file.
+
+        :param name: Name used to request the font.
+        :param path: Path to a TrueType or OpenType font file.
+        """
+        path = str(Path(path).resolve())
+        if not Path(path).is_file():
+            raise ValueError(f"Font file not found: {path}")
+        with self._lock:
+            self._files[name] = path
+            for key in [key for key in self._faces if key[0] == name]:
+                del self._faces[key]
+
+    def get(self, name: str = DEFAULT_FONT,
+            size: int = 20) -> ImageFont.FreeTypeFont:
+        """
+        Return the cached face for a registered font at the given size.
+
+        :param name: Name the font was registered under.
+        :param size: Font size in points.
+        :return: The loaded font face.
+        """
+        face = self._faces.get((name, size))
+        if face is not None:
+            return face
+        with self._lock:
+            face = self._faces.get((name, size))
+            if face is None:
+                if name not in self._files:
+                    raise ValueError(f"Unknown font: {name}")
+                face = ImageFont.truetype(self._files[name], size)
+                self._faces[(name, size)] = face
+            return face
+
+    def names(self) -> list:
+        """Return the names of the registered fonts."""
+        return sorted(self._files)
+
+    def clear(self) -> None:
+        """Drop every loaded face; registered files are kept."""
+        with self._lock:
+            self._faces.clear()
+
+
+fonts = FontRegistry()
@@ -0,0 +1,260 @@
+"""
+Image Pool Module.
+
+This module defines the ImagePool class, an in-memory pool of decoded and
+resized source photos. Registered photos are decoded from disk once and
+resized once per requested width; later renders work on a copy of the pooled
+frame instead of decoding the file again.
+
+Classes:
+    ImagePool: A memory-capped LRU pool of decoded source images.
+
+Functions:
+    normalize_mode: Convert an image to RGB, or RGBA if it is transparent.
+    resize_to_width: Resize an image to a width, keeping the aspect ratio.
+    open_for_width: Open an image, decoding JPEGs near a target width.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+RESAMPLE = {
+    "nearest": Image.NEAREST,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+
+
+def normalize_mode(image: Image.Image) -> Image.Image:
+    """
+    Convert an image to RGB, or to RGBA if it has transparency.
+
+    Palette, greyscale and CMYK photos are converted once here, so text
+    can be drawn in colour and filters other than nearest neighbour work.
+
+    :param image: The image to convert.
+    :return: The image itself if it is RGB or RGBA, otherwise a new image.
+    """
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def resize_to_width(image: Image.Image, width: int,
+                    resample: int = Image.NEAREST) -> Image.Image:
+    """
+    Resize an image to the given width while maintaining the aspect ratio.
+
+    The result is always an RGB or RGBA image (see normalize_mode).
+
+    :param image: The image to resize.
+    :param width: Desired width of the resized image.
+    :param resample: PIL resampling filter (default: nearest neighbour).
+    :return: The resized image.
+    """
+    aspect_ratio = width / image.width
+    new_h = max(1, int(image.height * aspect_ratio))
+    converted = normalize_mode(image)
+    if converted.size == (width, new_h):
+        return converted.copy() if converted is image else converted
+    return converted.resize((width, new_h), resample)
+
+
+def open_for_width(source, width: Optional[int] = None) -> Image.Image:
+    """
+    Open an image, decoding JPEGs at reduced scale when possible.
+
+    JPEG decoders can scale by 1/2, 1/4 or 1/8 while decoding. When a
+    target width is given, the largest reduction that still keeps the
+    image at least that wide is requested, so big photos are never fully
+    decoded only to be shrunk afterwards.
+
+    :param source: Path to the image file, or a binary file object.
+    :param width: The width the image will be resized to, if known.
+    :return: The opened (not yet loaded) image.
+    """
+    image = Image.open(source)
+    if width is not None and image.format == "JPEG" and width < image.width:
+        height = max(1, int(image.height * width / image.width))
+        image.draft(image.mode, (width, height))
+    return image
+
+
+class ImagePool:
+    """
+    ImagePool keeps decoded source photos in memory.
+
+    Only paths registered with the pool are served from it; any other path
+    is left to the caller to load from disk. For each registered photo the
+    pool keeps the decoded original and one frame per requested width, and
+    evicts the least recently used frames once the memory cap is exceeded.
+    Frames are reloaded when the file's modification time changes. Photos
+    that are removed or cannot be decoded are dropped from the pool by
+    preload, so one bad file never breaks the others.
+
+    Callers must not modify returned frames; copy them before drawing.
+
+    Attributes:
+        max_bytes (int): Memory cap for all pooled frames, in bytes.
+        hits (int): Number of lookups answered from the pool.
+        misses (int): Number of lookups that had to decode or resize.
+    """
+
+    def __init__(self, paths: Iterable[str] = (),
+                 max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the pool with the given source photos.
+
+        :param paths: Paths of the source photos served by the pool.
+        :param max_bytes: Memory cap for pooled frames in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._paths = set()
+        self._frames: "OrderedDict[Tuple, Tuple[Image.Image, int]]" = \
+            OrderedDict()
+        self._total_bytes = 0
+        self.register(paths)
+
+    def register(self, paths: Iterable[str]) -> None:
+        """Add source photos to the set of paths served by the pool."""
+        with self._lock:
+            self._paths = self._paths | {os.path.abspath(p) for p in paths}
+
+    def unregister(self, paths: Iterable[str]) -> None:
+        """Stop serving source photos and drop their frames."""
+        removed = {os.path.abspath(p) for p in paths}
+        with self._lock:
+            self._paths = self._paths - removed
+            self._drop(removed)
+
+    def sync(self, paths: Iterable[str]) -> None:
+        """
+        Serve exactly the given source photos.
+
+        Photos registered before but missing from paths are unregistered
+        and their frames dropped, e.g. after they were deleted.
+
+        :param paths: Paths of the source photos served from now on.
+        """
+        wanted = {os.path.abspath(p) for p in paths}
+        with self._lock:
+            removed = self._paths - wanted
+            self._paths = wanted
+            self._drop(removed)
+
+    def holds(self, img_path) -> bool:
+        """Return True if the given path is served by the pool."""
+        return isinstance(img_path, (str, os.PathLike)) and \
+            os.path.abspath(img_path) in self._paths
+
+    def preload(self, widths: Iterable[int] = (500,)) -> List[str]:
+        """
+        Decode every registered photo and resize it to each width.
+
+        A photo that is missing or cannot be decoded is logged and
+        unregistered, and the others are still preloaded.
+
+        :param widths: Widths to prepare frames for.
+        :return: The paths that were dropped.
+        """
+        widths = list(widths)
+        with self._lock:
+            paths = sorted(self._paths)
+        dropped = []
+        for path in paths:
+            try:
+                for width in widths:
+                    self.get(path, width)
+            except OSError as error:
+                # Includes PIL's UnidentifiedImageError
+                logger.warning("Dropping image %s from the pool: %s",
+                               path, error)
+                self.unregister([path])
+                dropped.append(path)
+        return dropped
+
+    def get(self, img_path, width: int,
+            resample: int = Image.NEAREST) -> Optional[Image.Image]:
+        """
+        Return the pooled frame of a photo resized to the given width.
+
+        :param img_path: Path to the source photo.
+        :param width: Desired width of the frame.
+        :param resample: PIL resampling filter used for the resize.
+        :return: The shared frame, or None if the path is not registered.
+        """
+        if not self.holds(img_path):
+            return None
+        path = os.path.abspath(img_path)
+        mtime = os.stat(path).st_mtime_ns
+        frame = self._lookup((path, mtime, width, resample))
+        with self._lock:
+            if frame is not None:
+                self.hits += 1
+                return frame
+            self.misses += 1
+        original = self._lookup((path, mtime, None, None))
+        if original is None:
+            with Image.open(path) as img:
+                img.load()
+            original = img
+            self._store((path, mtime, None, None), original)
+        frame = resize_to_width(original, width, resample)
+        self._store((path, mtime, width, resample), frame)
+        return frame
+
+    def clear(self) -> None:
+        """Drop every pooled frame."""
+        with self._lock:
+            self._frames.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """Return the pool counters and current memory usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "frames": len(self._frames),
+                "bytes": self._total_bytes,
+            }
+
+    def _lookup(self, key: Tuple) -> Optional[Image.Image]:
+        """Return a pooled frame and mark it as recently used."""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            return entry[0]
+
+    def _drop(self, paths: set) -> None:
+        """Drop the frames of the given paths; the caller holds the lock."""
+        for key in [key for key in self._frames if key[0] in paths]:
+            _, size = self._frames.pop(key)
+            self._total_bytes -= size
+
+    def _store(self, key: Tuple, frame: Image.Image) -> None:
+        """Add a frame to the pool and evict old ones if needed."""
+        size = frame.width * frame.height * len(frame.getbands())
+        with self._lock:
+            if key in self._frames:
+                return
+            self._frames[key] = (frame, size)
+            self._total_bytes += size
+            while len(self._frames) > 1 and \
+                    self._total_bytes > self.max_bytes:
+                _, (_, old_size) = self._frames.popitem(last=False)
+                self._total_bytes -= old_size
@@ -11,7 +11,12 @@ finally saving the generated meme.
 Usage:
     To generate a meme, instantiate the MemeGenerator class with an output
     directory, then call the make_meme method with the path to an image,
-    a quote, and the author's name.
+    a quote, and the author's name. To put many quotes on the same image,
+    call make_meme_variants, which composites them in vectorized chunks.
+
+Every render stage (frame copy, decode, resize, wrap, text, draw, composite
+and encode) is timed through the package's recorder, which is a no-op
+until an application installs one with memeengine.set_recorder.
 
 Classes:
     MemeGenerator: A class that provides functionality for creating memes by
@@ -21,12 +26,24 @@ Functions:
     None.
 """
 
+import io
+import os
 import random
 import tempfile
 import textwrap
 from pathlib import Path
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+
+from PIL import Image
 
-from PIL import Image, ImageDraw, ImageFont
+from .batch import MemeBatch, MemeJob
+from .encoder import Encoder
+from .fonts import DEFAULT_FONT
+from .image_pool import RESAMPLE, ImagePool, open_for_width, resize_to_width
+from .recorder import recorder
+from .render_cache import RenderCache
+from .text_layer import STYLES, TextLayer, text_layers
 
 
 class MemeGenerator:
@@ -40,33 +57,107 @@ class MemeGenerator:
 
     Attributes:
         output_dir (Path): The directory where the meme will be saved.
+        cache (RenderCache): Optional cache of already rendered memes.
+        pool (ImagePool): Optional pool of decoded, pre-resized photos.
+        font (str): Name of the registered font used to draw text.
+        persist (bool): Whether make_meme writes memes to output_dir by
+                        default, instead of returning the encoded bytes.
+        resample (str): Resampling filter used to resize images.
+        style (str): Text style: "plain", "outline" or "shadow".
+        encoder (Encoder): Default output format and encoding settings.
     """
 
-    def __init__(self, output_dir: str):
+    margin = 10
+
+    def __init__(self, output_dir: str, cache: Optional[RenderCache] = None,
+                 pool: Optional[ImagePool] = None, font: str = DEFAULT_FONT,
+                 persist: bool = True, resample: str = "nearest",
+                 style: str = "plain", encoder: Optional[Encoder] = None):
         """
         Initialize the MemeGenerator with the specified output directory.
 
         :param output_dir: Output directory to save the generated meme images.
+        :param cache: Optional render cache; identical requests then reuse
+                      the meme rendered the first time.
+        :param pool: Optional image pool; photos registered with it are
+                     rendered from a copy of the pooled frame.
+        :param font: Name of a font registered with memeengine.fonts.fonts
+                     (default: the bundled Arial).
+        :param persist: If False, make_meme returns the encoded meme in a
+                        BytesIO instead of writing a file (default: True).
+        :param resample: Resampling filter for resizing: "nearest",
+                         "bilinear", "bicubic" or "lanczos"
+                         (default: "nearest", the fastest).
+        :param style: Text style: "plain", "outline" or "shadow"
+                      (default: "plain").
+        :param encoder: Output format and encoding settings (default: JPEG
+                        with Pillow's default settings).
         """
+        if resample not in RESAMPLE:
+            raise ValueError(f"Unsupported resample filter: {resample}")
+        if style not in STYLES:
+            raise ValueError(f"Unsupported text style: {style}")
         self.output_dir = Path(output_dir)
-
-    def load_image(self, img_path: str) -> None:
+        self.cache = cache
+        self.pool = pool
+        self.font = font
+        self.persist = persist
+        self.resample = resample
+        self.style = style
+        self.encoder = encoder if encoder is not None else Encoder()
+
+    @property
+    def mimetype(self) -> str:
+        """Return the MIME type of memes made with the default encoder."""
+        return self.encoder.mimetype
+
+    def load_image(self, img_path: Union[str, BinaryIO],
+                   width: Optional[int] = None) -> Image.Image:
         """
-        Load an image from the specified path.
+        Load an image from the specified path or in-memory buffer.
+
+        When the target width is known, JPEGs are decoded at the smallest
+        built-in reduction that is still at least that wide.
 
-        :param img_path: Path to the image file to be loaded.
+        :param img_path: Path to the image file, or a binary file object
+                         such as the BytesIO returned by ImageFetcher.
+        :param width: Width the image will be resized to, if known.
+        :return: The opened image.
         """
-        self.image = Image.open(img_path)
+        return open_for_width(img_path, width)
 
-    def resize_image(self, width: int = 500):
+    def resize_image(self, image: Image.Image,
+                     width: int = 500) -> Image.Image:
         """Resize the image while maintaining the aspect ratio.
 
+        :param image: The image to resize.
         :param width: Desired width of the output meme image (default: 500).
+        :return: A new, resized image.
         """
-        aspect_ratio = width / self.image.width
-        new_w = width
-        new_h = int(self.image.height * aspect_ratio)
-        self.image = self.image.resize((new_w, new_h), Image.NEAREST)
+        return resize_to_width(image, width, RESAMPLE[self.resample])
+
+    def frame(self, img_path: Union[str, BinaryIO],
+              width: int = 500) -> Image.Image:
+        """
+        Return a private copy of the source image resized to a width.
+
+        Photos registered with the image pool are copied from the pooled
+        frame; others are decoded and resized.
+
+        :param img_path: Path to the image file, or a binary file object.
+        :param width: Desired width of the frame (default: 500).
+        :return: A new image the caller may draw on.
+        """
+        if self.pool is not None:
+            pooled = self.pool.get(img_path, width, RESAMPLE[self.resample])
+            if pooled is not None:
+                with recorder.stage("meme", "copy"):
+                    return pooled.copy()
+        with recorder.stage("meme", "decode"):
+            image = self.load_image(img_path, width)
+            image.load()
+        with recorder.stage("meme", "resize"):
+            return self.resize_image(image, width)
 
     def wrap_text(self, text: str, width: int = 25):
         """Wrap the text to fit within the image.
@@ -77,74 +168,290 @@ class MemeGenerator:
         wrapper = textwrap.TextWrapper(width=width)
         return "\n".join(wrapper.wrap(text))
 
-    def add_text_to_image(self, text: str, author: str, new_h: int):
+    def layout_text(self, body: Tuple[int, int], author: Tuple[int, int],
+                    size: Tuple[int, int]) -> Tuple[Tuple[int, int],
+                                                    Tuple[int, int]]:
+        """Choose random positions that keep the text inside the image.
+
+        The author line is placed near the bottom edge and the quote
+        somewhere above it; when the image is too small for a block, it is
+        pinned to the top-left margin.
+
+        :param body: Width and height of the quote text block.
+        :param author: Width and height of the author line.
+        :param size: Width and height of the image.
+        :return: The (x, y) positions of the quote and of the author line.
+        """
+        width, height = size
+        body_w, body_h = body
+        author_w, author_h = author
+        margin = self.margin
+
+        def offset(low: int, high: int) -> int:
+            return random.randint(low, high) if high > low else max(0, high)
+
+        author_x = offset(margin, width - author_w - margin)
+        author_y = offset(max(margin, height - author_h - 100),
+                          height - author_h - margin)
+        text_x = offset(margin, width - body_w - margin)
+        text_y = offset(margin, author_y - body_h - margin)
+        return (text_x, text_y), (author_x, author_y)
+
+    def place_text(self, text: str, author: str, size: Tuple[int, int]
+                   ) -> Tuple[Tuple[TextLayer, Tuple[int, int]], ...]:
+        """
+        Rasterize the quote and author and choose where they go.
+
+        The text is taken from the process-wide text layer cache, so a quote
+        is rasterized once and then only composited onto each meme.
+
+        :param text: The wrapped quote text.
+        :param author: The author of the quote.
+        :param size: Width and height of the image.
+        :return: The (layer, position) pairs of the quote and the author.
+        """
+        # Fetch the rasterized text, rendering it on first use
+        with recorder.stage("meme", "text"):
+            body_layer = text_layers.get(text, self.font, 20, self.style)
+            author_layer = text_layers.get(f"- {author}", self.font, 25,
+                                           self.style)
+
+        # Randomize positions within the measured bounds of the text
+        text_pos, author_pos = self.layout_text(
+            body_layer.extent, author_layer.extent, size)
+        return (body_layer, text_pos), (author_layer, author_pos)
+
+    def add_text_to_image(self, image: Image.Image, text: str, author: str):
         """Add the given text and author to the image at random positions.
 
+        :param image: The image to draw on; it is modified in place.
         :param text: The text to be overlayed on the image.
         :param author: The author of the quote to be overlayed on the image.
-        :param new_h: The new height of the image after resizing.
         """
-        # Load fonts
-        font_body = ImageFont.truetype("memeengine/arial.ttf", 20)
-        font_author = ImageFont.truetype("memeengine/arial.ttf", 25)
+        placements = self.place_text(text, author, image.size)
 
-        # Draw text on the image at random positions
-        draw = ImageDraw.Draw(self.image)
+        # Composite the text layers onto the image
+        with recorder.stage("meme", "draw"):
+            for layer, (x, y) in placements:
+                image.paste(layer.image, (x + layer.offset[0],
+                                          y + layer.offset[1]), layer.image)
 
-        # Randomize position for body text and author text
-        text_x = random.randint(50, self.image.width - 300)
-        text_y = random.randint(50, new_h - 150)
-        author_x = random.randint(50, self.image.width - 100)
-        author_y = new_h - random.randint(35, 100)
-
-        # Add the wrapped text and author to the image
-        draw.text((text_x, text_y), text, font=font_body, fill="black")
-        draw.text((author_x, author_y), f"- {author}",
-                  font=font_author, fill="black")
-
-    def __save_image(self) -> str:
+    def __save_image(self, image: Image.Image, encoder: Encoder,
+                     cache_key: Optional[str] = None) -> str:
         """
         Save the generated meme image to a file and returns the file path.
 
         Create a temporary file in the specified output directory and saves
-        the image. Returns the path of the saved file.
+        the image. When a cache key is given, the image is moved to the
+        cache's content-addressed file instead and registered with the cache.
+        Returns the path of the saved file.
 
+        :param image: The finished meme.
+        :param encoder: The output format and encoding settings.
+        :param cache_key: Optional render cache key for the image.
         :return: The path of the saved meme image.
         """
         self.output_dir.mkdir(parents=True, exist_ok=True)
         full_output_path = tempfile.NamedTemporaryFile(
             dir=self.output_dir, prefix="meme-generator-",
-            suffix=".jpg", delete=False
+            suffix=encoder.suffix, delete=False
         ).name
-        self.image.save(full_output_path)
+        with recorder.stage("meme", "encode", format=encoder.format):
+            encoder.save(image, full_output_path)
+        if cache_key is not None:
+            cached_path = self.cache.path_for(cache_key, encoder.suffix)
+            os.replace(full_output_path, cached_path)
+            self.cache.put(cache_key, cached_path)
+            full_output_path = cached_path
         return str(self.output_dir) + "/" + str(Path(full_output_path).name)
 
-    def make_meme(self, img_path: str, text: str,
-                  author: str, width: int = 500) -> str:
+    def __cache_key(self, img_path: Union[str, BinaryIO], text: str,
+                    author: str, width: int, encoder: Encoder) -> str:
+        """Return the render cache key of a meme."""
+        return self.cache.make_key(img_path, text=text, author=author,
+                                   width=width, font=self.font,
+                                   resample=self.resample, style=self.style,
+                                   encoding=encoder.params())
+
+    def __encode_image(self, image: Image.Image,
+                       encoder: Encoder) -> io.BytesIO:
+        """
+        Encode the generated meme image in memory.
+
+        :param image: The finished meme.
+        :param encoder: The output format and encoding settings.
+        :return: A buffer holding the encoded bytes, positioned at the start.
+        """
+        buffer = io.BytesIO()
+        with recorder.stage("meme", "encode", format=encoder.format):
+            encoder.save(image, buffer)
+        buffer.seek(0)
+        return buffer
+
+    def make_meme(self, img_path: Union[str, BinaryIO], text: str,
+                  author: str, width: int = 500,
+                  persist: Optional[bool] = None,
+                  encoder: Optional[Encoder] = None
+                  ) -> Union[str, io.BytesIO]:
         """
         Generate a meme by overlaying the given text and author on the image.
 
         Resize the image to the specified width while maintaining the aspect
         ratio. Text is wrapped to fit within the image, and both the text and
-        author are drawn on the image.
+        author are drawn on the image. With a render cache configured, a
+        request identical to an earlier one returns the earlier meme without
+        any image processing. Photos registered with the image pool skip the
+        decode and resize steps.
+
+        Every render works on its own image and keeps no state on the
+        generator, so one generator can serve many threads at once.
+
+        When persistence is off the meme is encoded in memory and returned
+        as a BytesIO; nothing is written to disk and the render cache, which
+        stores files, is not consulted.
 
-        :param img_path: Path to the image file.
+        :param img_path: Path to the image file, or a binary file object.
         :param text: Text to be overlayed on the image.
         :param author: Author of the quote to be overlayed on the image.
         :param width: Desired width of the output meme image (default: 500).
+        :param persist: Override the generator's persist setting.
+        :param encoder: Override the generator's encoder, e.g. to serve
+                        a format a client asked for.
 
-        :return: The path of the saved meme image.
+        :return: The path of the saved meme image, or a buffer holding the
+                 encoded meme when not persisting.
         """
-        # Load the image
-        self.load_image(img_path)
-
-        # Resize the image
-        self.resize_image(width)
+        if persist is None:
+            persist = self.persist
+        if encoder is None:
+            encoder = self.encoder
+
+        cache_key = None
+        if persist and self.cache is not None:
+            cache_key = self.__cache_key(img_path, text, author, width,
+                                         encoder)
+            cached_path = self.cache.get(cache_key)
+            recorder.count("meme_render_cache_total",
+                           result="miss" if cached_path is None else "hit")
+            if cached_path is not None:
+                return (str(self.output_dir) + "/"
+                        + str(Path(cached_path).name))
+        recorder.count("meme_renders_total", kind="single")
+
+        # Get a private, resized copy of the image
+        image = self.frame(img_path, width)
 
         # Wrap text to fit within the image
-        wrapped_text = self.wrap_text(text)
+        with recorder.stage("meme", "wrap"):
+            wrapped_text = self.wrap_text(text)
 
         # Add text to the image at random positions
-        self.add_text_to_image(wrapped_text, author, self.image.height)
+        self.add_text_to_image(image, wrapped_text, author)
+
+        if not persist:
+            return self.__encode_image(image, encoder)
+        return self.__save_image(image, encoder, cache_key)
+
+    def make_meme_variants(
+        self, img_path: Union[str, BinaryIO],
+        quotes: Iterable[Tuple[str, str]], width: int = 500,
+        persist: Optional[bool] = None, max_bytes: int = 64 * 1024 * 1024,
+        encoder: Optional[Encoder] = None
+    ) -> Iterator[Union[str, io.BytesIO]]:
+        """
+        Generate one meme per quote, all on the same image.
+
+        The image is decoded and resized once. Quotes are taken in chunks
+        that fit max_bytes; each chunk is composited onto copies of the
+        frame with NumPy in one vectorized pass per text slot, and then
+        every frame is encoded. Transparent photos are composited as RGBA
+        and only flattened by the encoder when it writes JPEG, as in
+        make_meme. Results are the same as calling make_meme for each
+        quote, including render cache lookups and stores.
+
+        :param img_path: Path to the image file, or a binary file object.
+        :param quotes: (text, author) pairs to overlay on the image.
+        :param width: Desired width of the output meme images (default: 500).
+        :param persist: Override the generator's persist setting.
+        :param max_bytes: Memory budget for compositing one chunk of memes
+                          (default: 64 MiB).
+        :param encoder: Override the generator's encoder.
+
+        :return: An iterator over the saved meme paths, or over buffers
+                 holding the encoded memes when not persisting, in quote
+                 order.
+        """
+        import numpy as np
+
+        from .composite import composite, frames_per_chunk
+
+        if persist is None:
+            persist = self.persist
+        if encoder is None:
+            encoder = self.encoder
+
+        # Frames are RGB or RGBA (see image_pool.normalize_mode)
+        frame = self.frame(img_path, width)
+        mode = frame.mode
+        base = np.asarray(frame)
+        size = frame.size
+
+        quotes = iter(quotes)
+        chunk_size = frames_per_chunk(size, max_bytes, len(mode))
+        while True:
+            chunk = list(islice(quotes, chunk_size))
+            if not chunk:
+                return
+            results = [None] * len(chunk)
+            pending = []
+            for index, (text, author) in enumerate(chunk):
+                cache_key = None
+                if persist and self.cache is not None:
+                    cache_key = self.__cache_key(img_path, text, author,
+                                                 width, encoder)
+                    cached_path = self.cache.get(cache_key)
+                    recorder.count("meme_render_cache_total",
+                                   result="miss" if cached_path is None
+                                   else "hit")
+                    if cached_path is not None:
+                        results[index] = (str(self.output_dir) + "/"
+                                          + str(Path(cached_path).name))
+                        continue
+                placements = self.place_text(self.wrap_text(text), author,
+                                             size)
+                pending.append((index, cache_key, placements))
+
+            recorder.count("meme_renders_total", len(pending),
+                           kind="variant")
+            with recorder.stage("meme", "composite"):
+                frames = composite(base, [placements
+                                          for _, _, placements in pending])
+            for (index, cache_key, _), pixels in zip(pending, frames):
+                image = Image.frombuffer(mode, size, pixels,
+                                         "raw", mode, 0, 1)
+                if persist:
+                    results[index] = self.__save_image(image, encoder,
+                                                       cache_key)
+                else:
+                    results[index] = self.__encode_image(image, encoder)
+            del frames
+            yield from results
+
+    def make_memes(self, jobs: Iterable[MemeJob],
+                   processes: Optional[int] = None) -> MemeBatch:
+        """
+        Generate many memes in parallel worker processes.
+
+        Jobs are (img_path, text, author[, width]) tuples or MemeJob
+        instances. The returned batch yields a BatchResult for each job as
+        soon as it finishes, in completion order, and reports throughput
+        through its completed, failed, elapsed and throughput attributes.
 
-        return self.__save_image()
+        :param jobs: The memes to render.
+        :param processes: Number of worker processes (default: CPU count).
+
+        :return: A MemeBatch to iterate over for the results.
+        """
+        return MemeBatch(self.output_dir, jobs, processes=processes,
+                         font=self.font, resample=self.resample,
+                         style=self.style, encoder=self.encoder)
@@ -0,0 +1,80 @@
+"""
+Recorder Module.
+
+This module holds `recorder`, through which the meme engine times its
+render stages and counts renders. It records nothing until an application
+installs a metrics recorder with set_recorder, such as the web app's
+Telemetry instance, so the engine does not depend on any metrics module.
+While none is installed a stage costs an attribute check and returns a
+shared no-op context manager.
+
+Classes:
+    Recorder: Forwards stage timings and counts to an installed recorder.
+
+Functions:
+    set_recorder: Install the recorder the meme engine reports to.
+"""
+
+from contextlib import nullcontext
+from typing import ContextManager
+
+_NOOP = nullcontext()
+
+
+class Recorder:
+    """
+    Recorder forwards to an installed recorder, or does nothing.
+
+    Attributes:
+        target (object): The installed recorder, or None. It provides
+                         stage(component, stage, **labels) returning a
+                         context manager and count(name, value, **labels),
+                         like telemetry.Telemetry.
+    """
+
+    __slots__ = ("target",)
+
+    def __init__(self):
+        """Initialize a recorder with nothing installed."""
+        self.target = None
+
+    def stage(self, component: str, stage: str,
+              **labels) -> ContextManager:
+        """
+        Time a stage of a hot path.
+
+        :param component: The instrumented component, e.g. "meme".
+        :param stage: The stage within it, e.g. "decode".
+        :param labels: Extra labels, e.g. format="webp".
+        :return: A context manager timing its block; a shared no-op while
+                 nothing is installed.
+        """
+        target = self.target
+        if target is None:
+            return _NOOP
+        return target.stage(component, stage, **labels)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Increment a counter of the installed recorder, if any.
+
+        :param name: The counter name, e.g. "meme_renders_total".
+        :param value: The amount to add (default: 1).
+        :param labels: The counter labels.
+        """
+        target = self.target
+        if target is not None:
+            target.count(name, value, **labels)
+
+
+# The recorder shared by the meme engine's modules
+recorder = Recorder()
+
+
+def set_recorder(target) -> None:
+    """
+    Install the recorder the meme engine reports to.
+
+    :param target: E.g. `telemetry.telemetry`, or None to stop reporting.
+    """
+    recorder.target = target
@@ -0,0 +1,263 @@
+"""
+Remote Image Cache Module.
+
+This module defines the RemoteImageCache class, an on-disk cache of source
+images fetched from URLs. Cached images are served without a download while
+they are younger than the TTL; older ones are revalidated with a conditional
+request using the stored ETag and Last-Modified validators, so an unchanged
+image costs a 304 response instead of a full download.
+
+Concurrent requests for the same URL are coalesced into a single fetch, and
+the cache is kept under a total size budget by evicting the least recently
+used images.
+
+Classes:
+    RemoteImageCache: A URL-keyed, revalidating cache of fetched images.
+
+Functions:
+    None.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional
+
+from .fetcher import FetchError, FetchResult, ImageFetcher
+
+
+class RemoteImageCache:
+    """
+    RemoteImageCache stores fetched images on disk, keyed by URL.
+
+    Each URL owns an image file and a JSON metadata file named after the
+    SHA-256 of the URL. Entries written by earlier processes are adopted
+    when the cache is created.
+
+    Attributes:
+        cache_dir (Path): The directory holding cached images.
+        fetcher (ImageFetcher): The fetcher used for downloads.
+        ttl (float): Seconds an image is served without revalidation.
+        max_bytes (int): Total size budget for cached images.
+        hits (int): Number of fetches served from disk without a request.
+        revalidations (int): Number of fetches answered with 304.
+        misses (int): Number of fetches that downloaded the image.
+        coalesced (int): Number of fetches that waited on another fetch of
+                         the same URL.
+    """
+
+    def __init__(self, cache_dir: str, fetcher: Optional[ImageFetcher] = None,
+                 ttl: float = 300.0, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache and adopt entries already on disk.
+
+        :param cache_dir: Directory where fetched images are stored.
+        :param fetcher: Fetcher used for downloads (default: a new one).
+        :param ttl: Seconds an image is served without revalidation.
+        :param max_bytes: Total size budget for cached images in bytes.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.fetcher = fetcher if fetcher is not None else ImageFetcher()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._total_bytes = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._adopt_existing()
+
+    def _adopt_existing(self) -> None:
+        """Register cached images left in the cache directory."""
+        found = []
+        for meta_path in self.cache_dir.glob("*.json"):
+            try:
+                with open(meta_path, encoding="utf-8") as file:
+                    meta = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if (self.cache_dir / f"{meta_path.stem}.img").is_file():
+                found.append((meta_path.stat().st_mtime, meta_path.stem,
+                              meta))
+        with self._lock:
+            for _, key, meta in sorted(found, key=lambda item: item[0]):
+                self._entries[key] = meta
+                self._total_bytes += meta["size"]
+            self._evict()
+
+    def fetch(self, url: str) -> io.BytesIO:
+        """
+        Return the image at a URL, from the cache when possible.
+
+        :param url: The http or https URL of the image.
+        :return: A buffer holding the image bytes, positioned at the start.
+        :raises FetchError: If the image is not cached and cannot be
+                            fetched.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return io.BytesIO(future.result())
+        try:
+            content = self._load(url, key)
+            future.set_result(content)
+            return io.BytesIO(content)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _load(self, url: str, key: str) -> bytes:
+        """Serve, revalidate or download the image for a URL."""
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is not None:
+                self._entries.move_to_end(key)
+
+        if meta is not None and time.time() - meta["fetched_at"] < self.ttl:
+            content = self._read(key)
+            if content is not None:
+                with self._lock:
+                    self.hits += 1
+                return content
+            meta = None
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        result = self.fetcher.get(url, headers=headers)
+
+        if result.status == 304:
+            if meta is None:
+                raise FetchError(f"Fetching {url} returned HTTP 304 for an "
+                                 f"image that is not cached")
+            content = self._revalidate(key, meta)
+            if content is not None:
+                return content
+            # The image was evicted meanwhile, so download it again
+            result = self.fetcher.get(url)
+            if result.status != 200:
+                raise FetchError(f"Fetching {url} returned HTTP "
+                                 f"{result.status}")
+        return self._store(url, key, result)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        """Read a cached image, or forget it and return None if it is gone."""
+        try:
+            # Eviction unlinks whole files, so a read sees all or nothing
+            return (self.cache_dir / f"{key}.img").read_bytes()
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+
+    def _revalidate(self, key: str, meta: dict) -> Optional[bytes]:
+        """Serve a cached image confirmed by a 304, restarting its TTL."""
+        content = self._read(key)
+        if content is None:
+            return None
+        meta = dict(meta, fetched_at=time.time())
+        with self._lock:
+            self.revalidations += 1
+            cached = key in self._entries
+            if cached:
+                self._entries[key] = meta
+        if cached:
+            self._write_meta(key, meta)
+        return content
+
+    def _store(self, url: str, key: str, result: FetchResult) -> bytes:
+        """Save a downloaded image and evict others over the budget."""
+        meta = {
+            "url": url,
+            "etag": result.headers.get("ETag"),
+            "last_modified": result.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "size": len(result.content),
+        }
+        image_path = self.cache_dir / f"{key}.img"
+        temp_path = image_path.with_suffix(".tmp")
+        temp_path.write_bytes(result.content)
+        os.replace(temp_path, image_path)
+        self._write_meta(key, meta)
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old["size"]
+            self._entries[key] = meta
+            self._total_bytes += meta["size"]
+            self._evict()
+        return result.content
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        """Atomically write the metadata file of an entry."""
+        meta_path = self.cache_dir / f"{key}.json"
+        temp_path = meta_path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(temp_path, meta_path)
+
+    def _forget(self, key: str) -> None:
+        """Drop an entry and delete its files."""
+        with self._lock:
+            meta = self._entries.pop(key, None)
+            if meta is not None:
+                self._total_bytes -= meta["size"]
+        self._remove_files(key)
+
+    def _evict(self) -> None:
+        """Delete least recently used images until the budget is met."""
+        while len(self._entries) > 1 and self._total_bytes > self.max_bytes:
+            key, meta = self._entries.popitem(last=False)
+            self._total_bytes -= meta["size"]
+            self._remove_files(key)
+
+    def _remove_files(self, key: str) -> None:
+        """Delete the image and metadata files of an entry."""
+        for suffix in (".img", ".json"):
+            try:
+                os.remove(self.cache_dir / f"{key}{suffix}")
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Remove every cached image."""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for key in keys:
+            self._remove_files(key)
+
+    def stats(self) -> dict:
+        """Return the cache counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
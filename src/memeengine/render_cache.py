@@ -0,0 +1,205 @@
+"""
+Render Cache Module.
+
+This module defines the RenderCache class, a content-addressed cache for
+rendered memes. A rendered meme is identified by a hash of the source image
+bytes together with the render parameters (quote, author, width), so asking
+for the same meme twice returns the file that was already written instead of
+rendering it again.
+
+Cached files live in the generator's output directory and are evicted in
+least-recently-used order once the configured byte or entry budget is
+exceeded.
+
+Classes:
+    RenderCache: An LRU cache of rendered meme files keyed by content hash.
+
+Functions:
+    None.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class RenderCache:
+    """
+    RenderCache maps render requests to meme files already on disk.
+
+    Keys are SHA-256 digests of the source image bytes and the render
+    parameters. Each key owns exactly one file in the output directory,
+    named after the key, so files written by an earlier process are picked
+    up again when a new cache is created on the same directory.
+
+    Attributes:
+        output_dir (Path): The directory holding the cached meme files.
+        max_bytes (int): Total size budget for the cached files.
+        max_entries (int): Optional cap on the number of cached files.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that required a render.
+        evictions (int): Number of files removed to respect the budget.
+    """
+
+    prefix = "meme-cache-"
+
+    def __init__(self, output_dir: str, max_bytes: int = 64 * 1024 * 1024,
+                 max_entries: Optional[int] = None):
+        """
+        Initialize the cache and adopt cached files already on disk.
+
+        :param output_dir: Directory where cached memes are stored.
+        :param max_bytes: Total size budget for cached files in bytes.
+        :param max_entries: Optional maximum number of cached files.
+        """
+        self.output_dir = Path(output_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._adopt_existing()
+
+    def _adopt_existing(self) -> None:
+        """Register cached files left in the output directory."""
+        if not self.output_dir.is_dir():
+            return
+        found = []
+        for path in self.output_dir.glob(self.prefix + "*"):
+            stat = path.stat()
+            key = path.stem[len(self.prefix):]
+            found.append((stat.st_mtime, key, str(path), stat.st_size))
+        for _, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+            self._total_bytes += size
+        self._evict()
+
+    def _source_digest(self, img_path) -> str:
+        """
+        Return the SHA-256 digest of the source image bytes.
+
+        Digests of files are remembered per (path, size, mtime), so an
+        unchanged source file is only read and hashed once. In-memory
+        sources are hashed from their current contents every time.
+
+        :param img_path: Path to the source image, or a binary file object.
+        :return: The hex digest of the image bytes.
+        """
+        if not isinstance(img_path, (str, os.PathLike)):
+            position = img_path.tell()
+            digest = hashlib.sha256(img_path.read()).hexdigest()
+            img_path.seek(position)
+            return digest
+        stat = os.stat(img_path)
+        stamp = (os.path.abspath(img_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(img_path, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 16), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._digests[stamp] = digest
+        return digest
+
+    def make_key(self, img_path, **params) -> str:
+        """
+        Build the cache key for a render request.
+
+        :param img_path: Path to the source image, or a binary file object.
+        :param params: Render parameters, e.g. text, author and width.
+        :return: The cache key as a hex string.
+        """
+        sha = hashlib.sha256(self._source_digest(img_path).encode())
+        sha.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        return sha.hexdigest()
+
+    def path_for(self, key: str, suffix: str = ".jpg") -> str:
+        """Return the file path that stores the meme for the given key."""
+        return str(self.output_dir / f"{self.prefix}{key}{suffix}")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendered meme.
+
+        :param key: Cache key returned by make_key.
+        :return: The path of the cached meme, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not os.path.exists(entry[0]):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, path: str) -> None:
+        """
+        Register a freshly rendered meme and evict old ones if needed.
+
+        :param key: Cache key returned by make_key.
+        :param path: Path of the meme file written for the key.
+        """
+        size = os.path.getsize(path)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (path, size)
+            self._total_bytes += size
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove every cached meme file."""
+        with self._lock:
+            while self._entries:
+                key = next(iter(self._entries))
+                self._remove_file(self._entries[key][0])
+                self._drop(key)
+
+    def stats(self) -> dict:
+        """Return the cache counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+    def _drop(self, key: str) -> None:
+        """Forget an entry without touching its file."""
+        _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the budget is met."""
+        while len(self._entries) > 1 and (
+            self._total_bytes > self.max_bytes
+            or (self.max_entries is not None
+                and len(self._entries) > self.max_entries)
+        ):
+            key, (path, _) = next(iter(self._entries.items()))
+            self._drop(key)
+            self._remove_file(path)
+            self.evictions += 1
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        """Delete a cached file, ignoring files that are already gone."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
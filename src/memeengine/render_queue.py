@@ -0,0 +1,334 @@
+"""
+Render Queue Module.
+
+This module defines the RenderQueue class, an in-process job queue that
+runs renders on a bounded pool of worker threads instead of inside request
+handlers. Every job gets an id that can be polled for its result, a priority
+so cheap renders overtake heavy ones, and an optional deadline after which
+it is no longer worth running. The queue holds a bounded number of pending
+jobs and refuses new ones once it is full, so bursts turn into fast
+rejections instead of piling up.
+
+Only jobs submitted with keep=True, such as asynchronous requests whose
+result is collected later, can be looked up by id; they are kept for
+keep_seconds after they finish, up to max_kept of them. Other jobs are
+referenced only by their submitter and are freed once it is done with
+them, so memory does not grow with the request rate.
+
+Jobs run on the worker threads by default. With processes set, each worker
+thread hands its job to a process pool instead; job functions and their
+arguments must then be picklable. A deadline is checked when a job is taken
+from the queue; a job already running on a thread is never interrupted,
+while the result of a job running in a process is abandoned at its deadline.
+
+Jobs run on the worker threads in a copy of the context they were submitted
+from, so context variables such as a request's telemetry trace follow them.
+
+Classes:
+    QueueFull: Raised when a job is submitted to a full queue.
+    DeadlineExceeded: The error of a job that missed its deadline.
+    RenderJob: A submitted job, its state and its result.
+    RenderQueue: A bounded priority queue with a pool of workers.
+
+Functions:
+    None.
+"""
+
+import contextvars
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class QueueFull(RuntimeError):
+    """Raised when the render queue has no room for another job."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The job did not finish before its deadline."""
+
+
+class RenderJob:
+    """
+    A job submitted to a RenderQueue.
+
+    Attributes:
+        id (str): Unique id of the job.
+        priority (int): Lower numbers run first.
+        deadline (float): time.monotonic() value after which the job is
+                          abandoned, or None.
+        status (str): "queued", "running", "done" or "failed".
+        result (Any): The return value of the job function once done.
+        error (Exception): The error that failed the job, if any.
+        submitted (float): Unix time the job was submitted.
+        finished (float): Unix time the job finished, or None.
+        context (contextvars.Context): Copy of the submitter's context the
+                                       job runs in on a worker thread.
+    """
+
+    def __init__(self, func: Callable, args: tuple, kwargs: dict,
+                 priority: int, deadline: Optional[float]):
+        """Initialize a queued job; use RenderQueue.submit instead."""
+        self.id = uuid.uuid4().hex
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.deadline = deadline
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self.context = contextvars.copy_context()
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        """Return True once the job succeeded or failed."""
+        return self._done.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Return the seconds left until the deadline, if there is one."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the job to finish.
+
+        :param timeout: Seconds to wait at most; None waits indefinitely.
+        :return: True if the job finished.
+        """
+        return self._done.wait(timeout)
+
+    def _finish(self, result: Any = None,
+                error: Optional[Exception] = None) -> None:
+        """Record the outcome and wake up waiters."""
+        self.result = result
+        self.error = error
+        self.status = "failed" if error is not None else "done"
+        self.finished = time.time()
+        # Release the job's inputs, e.g. fetched images
+        self.func = self.args = self.kwargs = self.context = None
+        self._done.set()
+
+
+class RenderQueue:
+    """
+    RenderQueue runs submitted jobs on a bounded pool of workers.
+
+    Workers are started on the first submit. Finished jobs submitted with
+    keep=True stay available through get for keep_seconds, so clients can
+    collect their results; at most max_kept of them are retained.
+
+    Attributes:
+        workers (int): Number of worker threads.
+        max_pending (int): Maximum number of jobs waiting to run.
+        processes (int): Size of the process pool jobs run in; 0 runs jobs
+                         on the worker threads.
+        keep_seconds (float): How long finished kept jobs are retained.
+        max_kept (int): Maximum number of finished kept jobs retained.
+        rejected (int): Number of jobs refused because the queue was full.
+        expired (int): Number of jobs that missed their deadline.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 64,
+                 processes: int = 0, keep_seconds: float = 300.0,
+                 max_kept: int = 1024):
+        """
+        Initialize the queue without starting the workers.
+
+        :param workers: Number of worker threads (default: 4).
+        :param max_pending: Maximum number of queued jobs (default: 64).
+        :param processes: Run jobs in a pool of this many processes
+                          instead of on the worker threads (default: 0).
+        :param keep_seconds: How long finished kept jobs can be looked up
+                             (default: 300).
+        :param max_kept: Maximum number of finished kept jobs retained;
+                         the oldest are dropped first (default: 1024).
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.processes = processes
+        self.keep_seconds = keep_seconds
+        self.max_kept = max_kept
+        self.rejected = 0
+        self.expired = 0
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue(max_pending)
+        self._order = itertools.count()
+        # Kept jobs, unfinished and then finished in order of finishing
+        self._jobs: Dict[str, RenderJob] = {}
+        self._finished: "OrderedDict[str, RenderJob]" = OrderedDict()
+        self._running = 0
+        self._counts: Dict[str, int] = {"done": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._executor = None
+
+    def submit(self, func: Callable, *args, priority: int = PRIORITY_NORMAL,
+               timeout: Optional[float] = None, keep: bool = False,
+               **kwargs) -> RenderJob:
+        """
+        Queue a call of func(*args, **kwargs).
+
+        :param func: The function to run.
+        :param args: Positional arguments for func.
+        :param priority: Lower numbers run first (default: PRIORITY_NORMAL).
+        :param timeout: Seconds from now until the job's deadline; a job
+                        still queued at its deadline fails with
+                        DeadlineExceeded without running.
+        :param keep: Make the job and its result available through get,
+                     e.g. for a client that collects it later; otherwise
+                     only the returned job refers to it.
+        :param kwargs: Keyword arguments for func.
+        :return: The queued job.
+        :raises QueueFull: If max_pending jobs are already waiting.
+        """
+        self._start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = RenderJob(func, args, kwargs, priority, deadline)
+        with self._lock:
+            self._prune()
+            try:
+                self._queue.put_nowait((priority, next(self._order), job))
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFull(
+                    f"{self.max_pending} render jobs are already waiting"
+                ) from None
+            if keep:
+                self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        """
+        Return a kept job by id.
+
+        :param job_id: The id of a job submitted with keep=True.
+        :return: The job, or None if it is unknown, was not kept, or has
+                 expired.
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return job if job is not None else self._finished.get(job_id)
+
+    def stats(self) -> dict:
+        """Return the queue length and job counters."""
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "running": self._running,
+                "kept": len(self._jobs) + len(self._finished),
+                "done": self._counts["done"],
+                "failed": self._counts["failed"],
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "workers": self.workers,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the workers after the jobs already queued."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            # None sorts after every priority, so queued jobs run first
+            self._queue.put((float("inf"), next(self._order), None))
+        for thread in threads:
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _start(self) -> None:
+        """Start the worker threads and process pool, once."""
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            if self.processes and self._executor is None:
+                self._executor = ProcessPoolExecutor(self.processes)
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._work,
+                                          name=f"render-worker-{number}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _prune(self) -> None:
+        """Forget the oldest finished kept jobs; the caller holds the lock."""
+        horizon = time.time() - self.keep_seconds
+        # Finished jobs are in order of finishing, so only expired ones
+        # are visited
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if job.finished >= horizon and \
+                    len(self._finished) <= self.max_kept:
+                break
+            self._finished.popitem(last=False)
+
+    def _work(self) -> None:
+        """Run queued jobs until a stop marker is taken."""
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            remaining = job.remaining()
+            if remaining is not None and remaining <= 0:
+                with self._lock:
+                    self.expired += 1
+                self._finish(job, error=DeadlineExceeded(
+                    "the render job expired while queued"))
+                continue
+            job.status = "running"
+            with self._lock:
+                self._running += 1
+            try:
+                if self._executor is None:
+                    result = job.context.run(job.func, *job.args,
+                                             **job.kwargs)
+                else:
+                    future = self._executor.submit(job.func, *job.args,
+                                                   **job.kwargs)
+                    try:
+                        result = future.result(timeout=remaining)
+                    except FutureTimeout:
+                        if future.done():
+                            raise
+                        # The process keeps running; its result is dropped
+                        future.cancel()
+                        with self._lock:
+                            self.expired += 1
+                        self._finish(job, error=DeadlineExceeded(
+                            "the render job did not finish in time"))
+                        continue
+            except Exception as error:
+                self._finish(job, error=error)
+            else:
+                self._finish(job, result=result)
+
+    def _finish(self, job: RenderJob, result: Any = None,
+                error: Optional[Exception] = None) -> None:
+        """Record a job's outcome, count it and retain it if kept."""
+        running = job.status == "running"
+        job._finish(result, error)
+        with self._lock:
+            if running:
+                self._running -= 1
+            self._counts["failed" if error is not None else "done"] += 1
+            if self._jobs.pop(job.id, None) is not None:
+                self._finished[job.id] = job
+                self._prune()
@@ -0,0 +1,152 @@
+"""
+Meme Reservoir Module.
+
+This module defines the MemeReservoir class, a bounded stock of memes
+rendered ahead of time. Background threads call a producer function until
+the reservoir holds its target number of memes; consumers take one without
+waiting, and every take makes room for a producer to render the next.
+When the reservoir is empty, take returns None and the caller renders the
+meme itself.
+
+Classes:
+    MemeReservoir: A background-filled stock of pre-rendered memes.
+
+Functions:
+    None.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+class MemeReservoir:
+    """
+    MemeReservoir keeps up to size memes rendered by background threads.
+
+    Attributes:
+        size (int): Number of memes the reservoir is kept filled to.
+        workers (int): Number of threads rendering memes concurrently.
+        hits (int): Number of takes answered from the reservoir.
+        misses (int): Number of takes that found it empty.
+        produced (int): Number of memes rendered into the reservoir.
+        errors (int): Number of failed renders.
+        last_error (Exception): The error of the last failed render.
+    """
+
+    retry_seconds = 1.0
+
+    def __init__(self, produce: Callable[[], Any], size: int = 32,
+                 workers: int = 1, name: str = "meme-reservoir"):
+        """
+        Initialize an empty reservoir; call start to begin filling it.
+
+        :param produce: Renders and returns one meme.
+        :param size: Number of memes to keep ready (default: 32).
+        :param workers: Number of rendering threads (default: 1).
+        :param name: Name prefix of the rendering threads.
+        """
+        self.produce = produce
+        self.size = size
+        self.workers = workers
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.produced = 0
+        self.errors = 0
+        self.last_error = None
+        self._items = deque()
+        self._in_flight = 0
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def __len__(self) -> int:
+        """Return the number of memes ready to be taken."""
+        return len(self._items)
+
+    def start(self) -> None:
+        """Start the rendering threads, once."""
+        with self._cond:
+            if self._threads:
+                return
+            self._stop.clear()
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._fill,
+                                          name=f"{self.name}-{number}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop the rendering threads after their current render."""
+        self._stop.set()
+        with self._cond:
+            threads, self._threads = self._threads, []
+            self._cond.notify_all()
+        for thread in threads:
+            thread.join()
+
+    def take(self) -> Optional[Any]:
+        """
+        Take a pre-rendered meme without waiting.
+
+        :return: A meme, or None if the reservoir is empty.
+        """
+        with self._cond:
+            if not self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            item = self._items.popleft()
+            self._cond.notify()
+            return item
+
+    def clear(self) -> None:
+        """Drop every stored meme, e.g. after the corpus changed."""
+        with self._cond:
+            self._items.clear()
+            # Memes being rendered now are dropped when they arrive
+            self._generation += 1
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Return the fill level and counters."""
+        with self._cond:
+            takes = self.hits + self.misses
+            return {
+                "size": self.size,
+                "available": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / takes if takes else 0.0,
+                "produced": self.produced,
+                "errors": self.errors,
+            }
+
+    def _fill(self) -> None:
+        """Render memes whenever the reservoir has room, until stopped."""
+        while not self._stop.is_set():
+            with self._cond:
+                while len(self._items) + self._in_flight >= self.size \
+                        and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                self._in_flight += 1
+                generation = self._generation
+            try:
+                item = self.produce()
+            except Exception as error:
+                with self._cond:
+                    self._in_flight -= 1
+                    self.errors += 1
+                    self.last_error = error
+                self._stop.wait(self.retry_seconds)
+                continue
+            with self._cond:
+                self._in_flight -= 1
+                if generation == self._generation:
+                    self._items.append(item)
+                    self.produced += 1
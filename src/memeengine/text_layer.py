@@ -0,0 +1,183 @@
+"""
+Text Layer Module.
+
+This module defines the TextLayerCache class, a process-wide cache of text
+rasterized into transparent RGBA layers. Popular quotes are drawn on many
+memes; instead of rasterizing their glyphs for every render, each
+(text, font, size, style) is drawn once into a layer that later renders
+alpha-composite onto the image with a single paste.
+
+Styles:
+    plain: Black text.
+    outline: Black text with a white outline.
+    shadow: Black text with a soft grey drop shadow.
+
+Classes:
+    TextLayer: A rasterized text layer and its offset from the text origin.
+    TextLayerCache: A memory-capped LRU cache of text layers.
+
+Attributes:
+    text_layers: The process-wide TextLayerCache used by MemeGenerator.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from .fonts import DEFAULT_FONT, fonts
+
+STYLES = ("plain", "outline", "shadow")
+FILL = (0, 0, 0, 255)
+OUTLINE = (255, 255, 255, 255)
+SHADOW = (0, 0, 0, 110)
+SHADOW_OFFSET = 2
+
+
+class TextLayer(NamedTuple):
+    """
+    Text rasterized into a transparent image.
+
+    Attributes:
+        image (Image.Image): The RGBA layer, cropped to the drawn pixels.
+        offset (Tuple[int, int]): Position of the layer's top-left corner
+                                  relative to the point the text is drawn
+                                  at, as used by ImageDraw.text.
+    """
+
+    image: Image.Image
+    offset: Tuple[int, int]
+
+    @property
+    def extent(self) -> Tuple[int, int]:
+        """Return the right and bottom edges relative to the text origin."""
+        return (self.offset[0] + self.image.width,
+                self.offset[1] + self.image.height)
+
+
+def render_layer(text: str, font: str = DEFAULT_FONT, size: int = 20,
+                 style: str = "plain") -> TextLayer:
+    """
+    Rasterize text into a new transparent layer.
+
+    :param text: The text to draw; may contain newlines.
+    :param font: Name of the registered font.
+    :param size: Font size in points.
+    :param style: One of STYLES.
+    :return: The rendered layer.
+    """
+    if style not in STYLES:
+        raise ValueError(f"Unsupported text style: {style}")
+    face = fonts.get(font, size)
+    stroke = 2 if style == "outline" else 0
+    probe = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    left, top, right, bottom = probe.multiline_textbbox(
+        (0, 0), text, font=face, stroke_width=stroke)
+    if style == "shadow":
+        right += SHADOW_OFFSET
+        bottom += SHADOW_OFFSET
+
+    layer = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)),
+                      (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    origin = (-left, -top)
+    if style == "shadow":
+        draw.multiline_text((origin[0] + SHADOW_OFFSET,
+                             origin[1] + SHADOW_OFFSET),
+                            text, font=face, fill=SHADOW)
+    draw.multiline_text(origin, text, font=face, fill=FILL,
+                        stroke_width=stroke, stroke_fill=OUTLINE)
+    return TextLayer(layer, (left, top))
+
+
+class TextLayerCache:
+    """
+    TextLayerCache keeps rendered text layers in memory.
+
+    Layers are keyed on (text, font, size, style) and the least recently
+    used ones are evicted once the memory cap is exceeded. Returned layers
+    are shared; callers must not modify them. Layers are keyed on the font
+    name, so call clear after registering a different file under a name.
+
+    Attributes:
+        max_bytes (int): Memory cap for all cached layers, in bytes.
+        hits (int): Number of layers served from the cache.
+        misses (int): Number of layers that had to be rendered.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Initialize an empty cache.
+
+        :param max_bytes: Memory cap for cached layers in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._layers: "OrderedDict[Tuple, Tuple[TextLayer, int]]" = \
+            OrderedDict()
+        self._total_bytes = 0
+
+    def get(self, text: str, font: str = DEFAULT_FONT, size: int = 20,
+            style: str = "plain") -> TextLayer:
+        """
+        Return the layer for a text, rendering it on first use.
+
+        :param text: The text to draw; may contain newlines.
+        :param font: Name of the registered font.
+        :param size: Font size in points.
+        :param style: One of STYLES.
+        :return: The shared layer.
+        """
+        key = (text, font, size, style)
+        layer = self._lookup(key)
+        if layer is not None:
+            return layer
+        layer = render_layer(text, font, size, style)
+        self._store(key, layer)
+        return layer
+
+    def clear(self) -> None:
+        """Drop every cached layer."""
+        with self._lock:
+            self._layers.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """Return the cache counters and current memory usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "layers": len(self._layers),
+                "bytes": self._total_bytes,
+            }
+
+    def _lookup(self, key: Tuple) -> Optional[TextLayer]:
+        """Return a cached layer, marking it as recently used, and count."""
+        with self._lock:
+            entry = self._layers.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._layers.move_to_end(key)
+            return entry[0]
+
+    def _store(self, key: Tuple, layer: TextLayer) -> None:
+        """Add a layer to the cache and evict old ones if needed."""
+        size = layer.image.width * layer.image.height * 4
+        with self._lock:
+            if key in self._layers:
+                return
+            self._layers[key] = (layer, size)
+            self._total_bytes += size
+            while len(self._layers) > 1 and \
+                    self._total_bytes > self.max_bytes:
+                _, (_, old_size) = self._layers.popitem(last=False)
+                self._total_bytes -= old_size
+
+
+text_layers = TextLayerCache()
@@ -3,7 +3,16 @@ This module provides access to the QuoteModel class and the Ingestor class.
 
 The QuoteModel is used to represent a quote and its author,
 while the Ingestor class is responsible for parsing various file formats (such
-as TXT, DOCX, PDF, CSV) to extract and return a list of quotes.
+as TXT, DOCX, PDF, CSV) to extract and return a list of quotes. The
+QuoteCache class keeps parsed quotes in a SQLite file so unchanged files
+are not parsed again, and the QuoteStore class packs large corpora into
+compact, memory-mappable buffers. QuoteIndex answers filtered selections
+by author, keyword and length without scanning the corpus. Corpus watches
+quote and image directories and reloads changed files in the background.
+PDF text is extracted by a pluggable backend from the pdf_text module, and
+DOCX paragraphs are streamed from the document XML by the docx_text module.
+Parse times and counts are reported to a recorder that an application
+installs with set_recorder; without one nothing is recorded.
 
 Usage:
     Import this module to use the QuoteModel for quote data storage or
@@ -13,10 +22,23 @@ Classes:
     QuoteModel: A class that encapsulates a quote's body and the author's name.
     Ingestor: A class that handles the ingestion and parsing of quote data from
               different file formats.
+    IngestReport: The quotes, errors and timings of a parallel ingestion.
+    QuoteCache: A persistent cache of parsed quotes, validated by file size
+                and modification time.
+    QuoteStore: An array-backed quote corpus with random sampling.
+    QuoteIndex: An author, keyword and length index over a quote corpus.
+    Corpus: A hot-reloading corpus of quotes and images.
+    PdfTextError: Raised when the text of a PDF cannot be extracted.
 
 Functions:
-    None.
+    set_recorder: Install the recorder the quote engine reports to.
 """
 
 from .quote_model import QuoteModel
-from .ingestor import Ingestor
+from .ingestor import Ingestor, IngestReport
+from .quote_cache import QuoteCache
+from .quote_store import QuoteStore
+from .quote_index import QuoteIndex
+from .corpus import Corpus, CorpusSnapshot
+from .pdf_text import PdfTextError
+from .recorder import set_recorder
@@ -0,0 +1,272 @@
+"""
+Hot-reloadable corpus of quotes and images.
+
+This module defines the Corpus class, which owns the quotes and source
+images a long-running server draws memes from. The corpus polls its quote
+and image directories for added, changed and removed files. Only changed
+quote files are parsed again, through Ingestor (or a QuoteCache), and the
+new corpus is published as an immutable CorpusSnapshot. Publishing is a
+single reference swap, so requests never wait on a reload and never see a
+half-built corpus.
+
+With a store path, the quote store is shared between processes: it is
+saved with a digest of the quote file stamps it was built from, and a
+process whose quotes match the saved digest maps the existing file rather
+than writing its own, so worker processes share its page-cache pages and
+only the first one to see a change writes the file.
+
+Classes:
+    CorpusSnapshot: An immutable view of the corpus at one generation.
+    Corpus: A polling, incrementally reloading quote and image corpus.
+
+Functions:
+    None.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import (Callable, Dict, Iterable, List, NamedTuple, Optional,
+                    Tuple)
+
+from .ingestor import Ingestor
+from .quote_cache import QuoteCache
+from .quote_index import QuoteIndex
+from .quote_store import QuoteStore
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no flock; processes there write the store unlocked
+    fcntl = None
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+
+
+class CorpusSnapshot(NamedTuple):
+    """
+    The corpus as published by one reload.
+
+    Attributes:
+        quotes (QuoteStore): Every quote, ordered by file path.
+        index (QuoteIndex): The index over quotes.
+        imgs (List[str]): Paths of the source images.
+        generation (int): Number of reloads that produced a new corpus.
+        reload_seconds (float): Duration of the reload that built it.
+        loaded_at (float): Unix time the snapshot was published.
+        errors (Dict[str, str]): Files whose latest version failed to parse.
+    """
+
+    quotes: QuoteStore
+    index: QuoteIndex
+    imgs: List[str]
+    generation: int
+    reload_seconds: float
+    loaded_at: float
+    errors: Dict[str, str]
+
+
+def _scan(dirs: Iterable[str],
+          accept: Callable[[str], bool]) -> Dict[str, Tuple[int, int]]:
+    """Return the (size, mtime) of every accepted file under the dirs."""
+    stamps = {}
+    for directory in dirs:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                if name.startswith(".") or not accept(name):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                stamps[path] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
+
+
+def _digest(stamps: Dict[str, Tuple[int, int]]) -> bytes:
+    """Return a digest identifying a set of file stamps."""
+    return hashlib.sha256(repr(sorted(stamps.items())).encode()).digest()
+
+
+@contextmanager
+def _exclusive(path: str):
+    """Hold an exclusive lock on a lock file, across processes."""
+    with open(path, "a") as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        yield
+
+
+def _is_image(name: str) -> bool:
+    """Return True if a file name has a supported image extension."""
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+class Corpus:
+    """
+    A quote and image corpus that reloads changed files in the background.
+
+    Attributes:
+        quote_dirs (List[str]): Directories searched for quote files.
+        image_dirs (List[str]): Directories searched for source images.
+        cache (QuoteCache): Optional persistent cache for parsed quotes.
+        store_path (str): Optional file the quote store is saved to and
+                          memory-mapped from, so processes share it.
+        last_error (Exception): The error of the last failed background
+                                reload, if any.
+    """
+
+    def __init__(self, quote_dirs: Iterable[str], image_dirs: Iterable[str],
+                 cache: Optional[QuoteCache] = None,
+                 store_path: Optional[str] = None,
+                 on_reload: Optional[Callable[[CorpusSnapshot], None]] = None):
+        """
+        Initialize an empty corpus; call reload to load it.
+
+        :param quote_dirs: Directories searched for quote files.
+        :param image_dirs: Directories searched for source images.
+        :param cache: Optional persistent cache for parsed quotes.
+        :param store_path: Optional file to memory-map the quotes from.
+        :param on_reload: Called with each newly published snapshot.
+        """
+        self.quote_dirs = list(quote_dirs)
+        self.image_dirs = list(image_dirs)
+        self.cache = cache
+        self.store_path = store_path
+        self.on_reload = on_reload
+        self.last_error = None
+        self._snapshot: Optional[CorpusSnapshot] = None
+        self._files: Dict[str, QuoteStore] = {}
+        self._quote_stamps: Dict[str, Tuple[int, int]] = {}
+        self._failed: Dict[str, str] = {}
+        self._image_stamps: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> Optional[CorpusSnapshot]:
+        """Return the current snapshot, or None before the first load."""
+        return self._snapshot
+
+    def reload(self, processes: Optional[int] = None) -> bool:
+        """
+        Re-ingest changed files and publish a new snapshot if needed.
+
+        :param processes: Process pool size for parsing, passed to
+                          Ingestor.parse_many; 0 parses on threads only.
+        :return: True if a new snapshot was published.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            quote_stamps = _scan(self.quote_dirs, Ingestor.can_ingest)
+            image_stamps = _scan(self.image_dirs, _is_image)
+            changed = [path for path, stamp in quote_stamps.items()
+                       if self._quote_stamps.get(path) != stamp]
+            removed = [path for path in self._quote_stamps
+                       if path not in quote_stamps]
+            if self._snapshot is not None and not changed and not removed \
+                    and image_stamps == self._image_stamps:
+                return False
+
+            if changed:
+                parser = self.cache if self.cache is not None else Ingestor
+                report = parser.parse_many(changed, processes=processes)
+                for path, quotes in report.results.items():
+                    self._files[path] = QuoteStore.from_quotes(quotes)
+                    self._failed.pop(path, None)
+                for path, error in report.errors.items():
+                    # The stamp is kept, so the file is only retried once
+                    # its size or mtime changes again
+                    self._failed[path] = f"{type(error).__name__}: {error}"
+            for path in removed:
+                self._files.pop(path, None)
+                self._failed.pop(path, None)
+
+            if self._snapshot is not None and not changed and not removed:
+                # Only images changed; keep the quotes and their index
+                quotes = self._snapshot.quotes
+                index = self._snapshot.index
+            else:
+                quotes = QuoteStore.from_quotes(
+                    quote
+                    for path in sorted(self._files)
+                    for quote in self._files[path]
+                )
+                if self.store_path is not None:
+                    quotes = self._share(quotes, quote_stamps)
+                index = QuoteIndex(quotes)
+
+            generation = 1 if self._snapshot is None \
+                else self._snapshot.generation + 1
+            snapshot = CorpusSnapshot(
+                quotes=quotes,
+                index=index,
+                imgs=sorted(image_stamps),
+                generation=generation,
+                reload_seconds=time.perf_counter() - started,
+                loaded_at=time.time(),
+                errors=dict(self._failed),
+            )
+            self._quote_stamps = quote_stamps
+            self._image_stamps = image_stamps
+            self._snapshot = snapshot
+        if self.on_reload is not None:
+            self.on_reload(snapshot)
+        return True
+
+    def _share(self, quotes: QuoteStore,
+               stamps: Dict[str, Tuple[int, int]]) -> QuoteStore:
+        """
+        Return the quotes mapped from the shared store file.
+
+        The file is written only if it was not already saved from the same
+        quote file stamps, by whichever process takes the lock first.
+
+        :param quotes: The quotes built by this process.
+        :param stamps: The quote file stamps they were built from.
+        :return: The quotes, memory-mapped from store_path.
+        """
+        tag = _digest(stamps)
+        with _exclusive(f"{self.store_path}.lock"):
+            try:
+                stored = QuoteStore.load(self.store_path)
+            except (OSError, ValueError):
+                stored = None
+            if stored is None or stored.tag != tag:
+                quotes.save(self.store_path, tag)
+                stored = QuoteStore.load(self.store_path)
+        return stored
+
+    def start(self, interval: float = 2.0) -> None:
+        """
+        Start polling for changes in a background thread.
+
+        :param interval: Seconds between polls.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,),
+                                        name="corpus-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background polling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, interval: float) -> None:
+        """Poll for changes until stopped."""
+        while not self._stop.wait(interval):
+            try:
+                # Forking a process pool from a threaded server is unsafe
+                self.reload(processes=0)
+                self.last_error = None
+            except Exception as error:
+                self.last_error = error
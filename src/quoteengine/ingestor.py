@@ -5,29 +5,39 @@ This module defines the interface and concrete classes responsible for
 ingesting quotes from various file formats including CSV, DOCX, PDF, and TXT.
 
 The main class, Ingestor, selects the appropriate ingestor based on the file
-type and uses it to parse quotes into QuoteModel instances.
+type and uses it to parse quotes into QuoteModel instances. Parse times per
+format, the time spent extracting PDF text, and the files and quotes parsed
+are recorded through the package's recorder, a no-op until an application
+installs one with quoteengine.set_recorder.
 
 Classes:
     IngestorInterface: An abstract base class that defines the interface for
                         all ingestor classes.
     IngestorCSV: A class to ingest quotes from CSV files.
     IngestorDOCX: A class to ingest quotes from DOCX files.
-    IngestorPDF: A class to ingest quotes from PDF files using the `pdftotext`
-                 tool.
+    IngestorPDF: A class to ingest quotes from PDF files using a pluggable
+                 text extraction backend (see pdf_text).
     IngestorTXT: A class to ingest quotes from TXT files.
     Ingestor: A class that selects the appropriate ingestor based on the file
               type and parses the quotes.
+    IngestReport: The quotes, per-file errors and per-format timings of a
+                  multi-file ingestion.
 
 Functions:
     None.
 """
 
-from typing import List
+from typing import Dict, Iterator, List
 from .quote_model import QuoteModel
+from .docx_text import iter_paragraphs
+from .pdf_text import PdfBackend, default_backend
+from .recorder import recorder
 from abc import ABC, abstractmethod
-import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+import time
 import csv
-import docx
+import os
 
 
 class IngestorInterface:
@@ -37,6 +47,10 @@ class IngestorInterface:
         """Determine if the given file can be ingested by this class."""
         raise NotImplementedError
 
+    def iter_parse(self, path: str) -> Iterator[QuoteModel]:
+        """Parse the given file and yield QuoteModel instances lazily."""
+        raise NotImplementedError
+
     def parse(self, path: str) -> [QuoteModel]:
         """Parse the given file and returns a list of QuoteModel instances."""
         raise NotImplementedError
@@ -51,23 +65,31 @@ class IngestorCSV(IngestorInterface):
         return path.endswith(".csv")
 
     @classmethod
-    def parse(cls, path: str) -> List[QuoteModel]:
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
         """
-        Parse the CSV file.
+        Parse the CSV file lazily.
 
-        Parse the file read at the given path and
-        returns a list of QuoteModel instances.
+        Read the file at the given path row by row and
+        yield a QuoteModel instance for each quote.
         """
         if not cls.can_ingest(path):
             raise ValueError(f"Unsupported file type: {path}")
 
-        quotes = []
         with open(path, mode="r", newline="", encoding="utf-8") as file:
             reader = csv.DictReader(file)
             for row in reader:
                 if "body" in row and "author" in row:
-                    quotes.append(QuoteModel(row["body"], row["author"]))
-        return quotes
+                    yield QuoteModel(row["body"], row["author"])
+
+    @classmethod
+    def parse(cls, path: str) -> List[QuoteModel]:
+        """
+        Parse the CSV file.
+
+        Parse the file read at the given path and
+        returns a list of QuoteModel instances.
+        """
+        return list(cls.iter_parse(path))
 
 
 class IngestorDOCX(IngestorInterface):
@@ -79,42 +101,82 @@ class IngestorDOCX(IngestorInterface):
         return path.endswith(".docx")
 
     @classmethod
-    def parse(cls, path: str) -> List[QuoteModel]:
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
         """
-        Parse the DOCX file.
+        Parse the DOCX file lazily.
 
-        Parse the file read at the given path and
-        returns a list of QuoteModel instances.
+        Stream the paragraphs of the file at the given path and
+        yield a QuoteModel instance for each quote. Paragraph text is
+        read straight from the document XML, falling back to python-docx
+        for documents the streaming reader does not recognize.
         """
         if not cls.can_ingest(path):
             raise ValueError(f"Unsupported file type: {path}")
 
-        quotes = []
-        doc = docx.Document(path)
-        for para in doc.paragraphs:
-            if " - " in para.text:
-                parts = para.text.rsplit(" - ", 1)
+        for text in iter_paragraphs(path):
+            if " - " in text:
+                parts = text.rsplit(" - ", 1)
                 if len(parts) == 2:
-                    quotes.append(QuoteModel(parts[0].strip(),
-                                             parts[1].strip()))
-        return quotes
+                    yield QuoteModel(parts[0].strip(), parts[1].strip())
+
+    @classmethod
+    def parse(cls, path: str) -> List[QuoteModel]:
+        """
+        Parse the DOCX file.
+
+        Parse the file read at the given path and
+        returns a list of QuoteModel instances.
+        """
+        return list(cls.iter_parse(path))
 
 
 class IngestorPDF(IngestorInterface):
-    """A class to ingest quotes from PDF files using the `pdftotext` tool."""
+    """
+    A class to ingest quotes from PDF files.
+
+    The text is extracted by a backend from pdf_text: in-process with pypdf
+    or pdfminer.six when one is installed, otherwise with `pdftotext`.
+    Assign a backend, e.g. pdf_text.make_backend("pdftotext"), to choose
+    one; by default the fastest available is chosen on first use.
+    """
+
+    backend: PdfBackend = None
+    _backend_lock = threading.Lock()
 
     @classmethod
     def can_ingest(cls, path: str) -> bool:
         """Return True if the file is a PDF file, False otherwise."""
         return path.endswith(".pdf")
 
-    @staticmethod
-    def __extract_text(pdf_path: str) -> List[str]:
-        """Return True if the file is a PDF file, False otherwise."""
-        result = subprocess.run(
-            ["pdftotext", pdf_path, "-"], capture_output=True, text=True
-        )
-        return result.stdout.strip().split("\n")
+    @classmethod
+    def get_backend(cls) -> PdfBackend:
+        """Return the text extraction backend, choosing it on first use."""
+        if cls.backend is None:
+            with cls._backend_lock:
+                if cls.backend is None:
+                    cls.backend = default_backend()
+        return cls.backend
+
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """
+        Parse the PDF file lazily.
+
+        Read the text extracted from the file at the given path
+        line by line and yield a QuoteModel instance for each quote.
+
+        :raises PdfTextError: If the text cannot be extracted.
+        """
+        if not cls.can_ingest(path):
+            raise ValueError(f"Unsupported file type: {path}")
+
+        backend = cls.get_backend()
+        # Timed from the start of extraction until the last line is read
+        with recorder.stage("ingest", backend.name):
+            for line in backend.iter_lines(path):
+                parts = line.rsplit(" - ", 1)
+                if len(parts) == 2:
+                    yield QuoteModel(parts[0].strip(), parts[1].strip())
 
     @classmethod
     def parse(cls, path: str) -> List[QuoteModel]:
@@ -124,16 +186,7 @@ class IngestorPDF(IngestorInterface):
         Parse the file read at the given path and
         returns a list of QuoteModel instances.
         """
-        if not cls.can_ingest(path):
-            raise ValueError(f"Unsupported file type: {path}")
-
-        quotes = []
-        lines = cls.__extract_text(path)
-        for line in lines:
-            parts = line.rsplit(" - ", 1)
-            if len(parts) == 2:
-                quotes.append(QuoteModel(parts[0].strip(), parts[1].strip()))
-        return quotes
+        return list(cls.iter_parse(path))
 
 
 class IngestorTXT(IngestorInterface):
@@ -145,24 +198,31 @@ class IngestorTXT(IngestorInterface):
         return path.endswith(".txt")
 
     @classmethod
-    def parse(cls, path: str) -> List[QuoteModel]:
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
         """
-        Parse the TXT file.
+        Parse the TXT file lazily.
 
-        Parse the file read at the given path and
-        returns a list of QuoteModel instances.
+        Read the file at the given path line by line and
+        yield a QuoteModel instance for each quote.
         """
         if not cls.can_ingest(path):
             raise ValueError(f"Unsupported file type: {path}")
 
-        quotes = []
         with open(path, "r", encoding="utf-8") as file:
             for line in file:
                 parts = line.strip().rsplit(" - ", 1)
                 if len(parts) == 2:
-                    quotes.append(QuoteModel(parts[0].strip(),
-                                             parts[1].strip()))
-        return quotes
+                    yield QuoteModel(parts[0].strip(), parts[1].strip())
+
+    @classmethod
+    def parse(cls, path: str) -> List[QuoteModel]:
+        """
+        Parse the TXT file.
+
+        Parse the file read at the given path and
+        returns a list of QuoteModel instances.
+        """
+        return list(cls.iter_parse(path))
 
 
 class Ingestor:
@@ -170,6 +230,19 @@ class Ingestor:
 
     ingestors = [IngestorCSV, IngestorDOCX, IngestorPDF, IngestorTXT]
 
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """
+        Select the appropriate ingestor and parse lazily.
+
+        Select the ingestor based on file type and yield the quotes
+        one at a time, so memory stays flat however large the file is.
+        """
+        for ingestor in cls.ingestors:
+            if ingestor.can_ingest(path):
+                return ingestor.iter_parse(path)
+        raise ValueError(f"Unsupported file type: {path}")
+
     @classmethod
     def parse(cls, path: str) -> List[QuoteModel]:
         """
@@ -178,7 +251,139 @@ class Ingestor:
         Select the ingestor based on
         file type and returns the parsed quotes.
         """
-        for ingestor in cls.ingestors:
-            if ingestor.can_ingest(path):
-                return ingestor.parse(path)
-        raise ValueError(f"Unsupported file type: {path}")
+        fmt = _format_of(path)
+        with recorder.stage("ingest", "parse", format=fmt):
+            quotes = list(cls.iter_parse(path))
+        _count_parsed(fmt, len(quotes))
+        return quotes
+
+    @classmethod
+    def can_ingest(cls, path: str) -> bool:
+        """Return True if any ingestor supports the given file."""
+        return any(ingestor.can_ingest(path) for ingestor in cls.ingestors)
+
+    @classmethod
+    def parse_many(cls, paths: List[str], threads: int = None,
+                   processes: int = None) -> "IngestReport":
+        """
+        Parse many files in parallel.
+
+        PDF files extracted by `pdftotext` spend their time waiting on the
+        subprocess and are parsed on a thread pool; the CPU-bound formats,
+        including PDFs extracted in-process, are parsed on a process pool.
+        Quotes keep the order of the given paths, and a file that fails to
+        parse is recorded in the report instead of aborting the others.
+
+        :param paths: The files to parse.
+        :param threads: Size of the PDF thread pool (default: automatic).
+        :param processes: Size of the process pool (default: CPU count);
+                          0 parses every format on the thread pool.
+        :return: An IngestReport with the quotes, errors and timings.
+        """
+        report = IngestReport()
+        started = time.perf_counter()
+        pdf_on_threads = not IngestorPDF.get_backend().in_process
+        futures = []
+        with ThreadPoolExecutor(max_workers=threads) as thread_pool:
+            process_pool = None
+            try:
+                for path in paths:
+                    if processes == 0 or (pdf_on_threads and
+                                          IngestorPDF.can_ingest(path)):
+                        pool = thread_pool
+                    else:
+                        if process_pool is None:
+                            process_pool = ProcessPoolExecutor(
+                                max_workers=processes)
+                        pool = process_pool
+                    futures.append((path, pool is process_pool,
+                                    pool.submit(_timed_parse, path)))
+                for path, in_process_pool, future in futures:
+                    fmt = _format_of(path)
+                    try:
+                        quotes, seconds = future.result()
+                    except Exception as error:
+                        report.errors[path] = error
+                        recorder.count("ingest_errors_total", format=fmt)
+                        continue
+                    if in_process_pool:
+                        # Worker processes do not report to our recorder
+                        recorder.observe("ingest_stage_seconds", seconds,
+                                         stage="parse", format=fmt)
+                        _count_parsed(fmt, len(quotes))
+                    report.results[path] = quotes
+                    report.timings[fmt] = report.timings.get(fmt, 0.0) \
+                        + seconds
+                    report.files[fmt] = report.files.get(fmt, 0) + 1
+            finally:
+                if process_pool is not None:
+                    process_pool.shutdown()
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    @classmethod
+    def parse_dir(cls, root: str, threads: int = None,
+                  processes: int = None) -> "IngestReport":
+        """
+        Parse every supported file under a directory tree in parallel.
+
+        Files are visited in sorted path order, so the quote order is
+        deterministic. See parse_many for the pool arguments.
+
+        :param root: The directory to search.
+        :return: An IngestReport with the quotes, errors and timings.
+        """
+        paths = sorted(
+            os.path.join(dirpath, name)
+            for dirpath, _, names in os.walk(root)
+            for name in names
+            if cls.can_ingest(name)
+        )
+        return cls.parse_many(paths, threads=threads, processes=processes)
+
+
+class IngestReport:
+    """
+    The outcome of parsing many files with Ingestor.parse_many.
+
+    Attributes:
+        results (Dict[str, List[QuoteModel]]): The quotes of each parsed
+                                               file, in the order of the
+                                               given paths.
+        errors (Dict[str, Exception]): The error raised for each file that
+                                       could not be parsed.
+        timings (Dict[str, float]): Seconds spent parsing, per file format.
+        files (Dict[str, int]): Number of files parsed, per file format.
+        elapsed (float): Wall-clock seconds for the whole ingestion.
+    """
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.results: Dict[str, List[QuoteModel]] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.timings: Dict[str, float] = {}
+        self.files: Dict[str, int] = {}
+        self.elapsed = 0.0
+
+    @property
+    def quotes(self) -> List[QuoteModel]:
+        """Return the quotes of all parsed files, in path order."""
+        return [quote for quotes in self.results.values() for quote in quotes]
+
+
+def _format_of(path: str) -> str:
+    """Return the lowercase file extension of a path, e.g. "pdf"."""
+    return os.path.splitext(path)[1].lstrip(".").lower()
+
+
+def _count_parsed(fmt: str, quotes: int) -> None:
+    """Count a parsed file and its quotes."""
+    recorder.count("ingest_files_total", format=fmt)
+    recorder.count("ingest_quotes_total", quotes, format=fmt)
+
+
+def _timed_parse(path: str):
+    """Parse a file and return its quotes with the seconds it took."""
+    started = time.perf_counter()
+    quotes = Ingestor.parse(path)
+    return quotes, time.perf_counter() - started
@@ -0,0 +1,201 @@
+"""
+PDF Text Extraction Backends.
+
+This module defines the pluggable backends IngestorPDF uses to turn a PDF
+into lines of text. In-process backends use a PDF library and avoid any
+process spawn; when no library is importable, the text comes from the
+poppler `pdftotext` tool, whose output is streamed line by line so memory
+stays flat however large the PDF is.
+
+Available backends, in the order default_backend prefers them:
+    pypdf: In-process extraction with the pypdf package.
+    pdfminer: In-process extraction with the pdfminer.six package.
+    pdftotext: `pdftotext` started from this process for every file.
+
+In-process backends lay text out slightly differently from `pdftotext`,
+but each PDF text line still becomes one line, which is what the quote
+format relies on. Every backend raises PdfTextError when a file cannot be
+read or `pdftotext` is missing or fails, instead of yielding no lines.
+
+Classes:
+    PdfTextError: Raised when the text of a PDF cannot be extracted.
+    PdfBackend: Interface of the extraction backends.
+    PypdfBackend: In-process extraction with pypdf.
+    PdfminerBackend: In-process extraction with pdfminer.six.
+    PdftotextBackend: A `pdftotext` process per file.
+
+Functions:
+    make_backend: Create a backend by name.
+    default_backend: Create the fastest backend available here.
+"""
+
+import importlib.util
+import shutil
+import subprocess
+import tempfile
+from typing import Iterator, Optional
+
+
+class PdfTextError(RuntimeError):
+    """Raised when the text of a PDF cannot be extracted."""
+
+
+class PdfBackend:
+    """
+    Interface for all PDF text extraction backends.
+
+    Attributes:
+        name (str): Name of the backend, as accepted by make_backend.
+        in_process (bool): Whether extraction runs on the calling thread
+                           and holds the GIL, so parallel parsing should
+                           use processes rather than threads.
+    """
+
+    name = ""
+    in_process = False
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return True if the backend can run here."""
+        raise NotImplementedError
+
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """
+        Yield the text lines of a PDF.
+
+        :param path: Path of the PDF file.
+        :raises PdfTextError: If the text cannot be extracted.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources the backend holds."""
+
+
+class PypdfBackend(PdfBackend):
+    """Extract text in-process with pypdf, one page at a time."""
+
+    name = "pypdf"
+    in_process = True
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return True if pypdf is importable."""
+        return importlib.util.find_spec("pypdf") is not None
+
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """Yield the text lines of a PDF, page by page."""
+        from pypdf import PdfReader
+        from pypdf.errors import PyPdfError
+
+        try:
+            for page in PdfReader(path).pages:
+                yield from page.extract_text().splitlines()
+        except (OSError, PyPdfError) as error:
+            raise PdfTextError(f"Cannot read {path}: {error}") from error
+
+
+class PdfminerBackend(PdfBackend):
+    """Extract text in-process with pdfminer.six."""
+
+    name = "pdfminer"
+    in_process = True
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return True if pdfminer.six is importable."""
+        return importlib.util.find_spec("pdfminer") is not None
+
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """Yield the text lines of a PDF."""
+        from pdfminer.high_level import extract_text
+        from pdfminer.pdfparser import PDFSyntaxError
+
+        try:
+            text = extract_text(path)
+        except (OSError, PDFSyntaxError) as error:
+            raise PdfTextError(f"Cannot read {path}: {error}") from error
+        yield from text.splitlines()
+
+
+def _failure(path: str, status: Optional[int], stderr: str) -> PdfTextError:
+    """Return the error for a `pdftotext` run that did not succeed."""
+    if status is None:
+        return PdfTextError("pdftotext is not installed")
+    return PdfTextError(f"pdftotext failed on {path} with exit status "
+                        f"{status}: {stderr.strip()}")
+
+
+class PdftotextBackend(PdfBackend):
+    """Stream the output of a `pdftotext` process started per file."""
+
+    name = "pdftotext"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return True if `pdftotext` is on the PATH."""
+        return shutil.which("pdftotext") is not None
+
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """Yield the lines `pdftotext` writes, then check its status."""
+        # stderr goes to a file, so a chatty process cannot block on it
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                process = subprocess.Popen(
+                    ["pdftotext", path, "-"], stdout=subprocess.PIPE,
+                    stderr=stderr, text=True
+                )
+            except FileNotFoundError:
+                raise _failure(path, None, "") from None
+            try:
+                for line in process.stdout:
+                    yield line.rstrip("\n")
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                status = process.wait()
+            if status != 0:
+                stderr.seek(0)
+                raise _failure(path, status,
+                               stderr.read().decode(errors="replace"))
+
+
+BACKENDS = {backend.name: backend
+            for backend in (PypdfBackend, PdfminerBackend,
+                            PdftotextBackend)}
+
+
+def make_backend(name: str) -> PdfBackend:
+    """
+    Create a backend by name.
+
+    :param name: One of the names in BACKENDS.
+    :return: The backend.
+    :raises ValueError: If the name is unknown.
+    :raises PdfTextError: If the backend cannot run here.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name}")
+    if not BACKENDS[name].available():
+        raise PdfTextError(f"The {name} PDF backend is not available")
+    return BACKENDS[name]()
+
+
+def default_backend(name: Optional[str] = None) -> PdfBackend:
+    """
+    Create the preferred backend available here.
+
+    In-process backends come first. If nothing can extract text, the
+    per-file `pdftotext` backend is returned anyway, so the missing tool is
+    reported when a PDF is parsed rather than when the app starts.
+
+    :param name: Backend to use instead of choosing one.
+    :return: The backend.
+    """
+    if name:
+        return make_backend(name)
+    for backend in BACKENDS.values():
+        if backend.available():
+            return backend()
+    return PdftotextBackend()
@@ -0,0 +1,217 @@
+"""
+Persistent cache of parsed quotes.
+
+This module defines the QuoteCache class, which stores the quotes parsed
+from each source file in a SQLite database. Each file is recorded with its
+size and modification time; as long as those are unchanged the quotes are
+loaded from the database instead of running the file's ingestor again, so
+PDF text extraction and DOCX parsing only happen for changed files.
+
+The database only holds derived data, so a corrupt cache file is replaced
+by an empty one, and a database error while the cache is in use turns a
+lookup into a miss instead of failing the parse.
+
+Classes:
+    QuoteCache: A SQLite-backed cache of parsed quotes keyed by file.
+
+Functions:
+    None.
+"""
+
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from typing import List, Optional
+
+from .ingestor import Ingestor, IngestReport
+from .quote_model import QuoteModel
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    path TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    author TEXT NOT NULL,
+    PRIMARY KEY (path, idx)
+) WITHOUT ROWID;
+"""
+
+
+class QuoteCache:
+    """
+    A persistent cache of parsed quotes, validated by file size and mtime.
+
+    Every call opens its own short-lived connection, so one cache file can
+    be shared by threads and by several processes.
+
+    Attributes:
+        db_path (str): Path of the SQLite database file.
+        hits (int): Number of files loaded from the cache.
+        misses (int): Number of files parsed with their ingestor.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open the cache, creating the database file if needed.
+
+        :param db_path: Path of the SQLite database file.
+        """
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        try:
+            self._create()
+        except sqlite3.DatabaseError as error:
+            logger.warning("Replacing the unreadable quote cache %s: %s",
+                           db_path, error)
+            self._remove()
+            self._create()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache database."""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _create(self) -> None:
+        """Create the tables if the database does not have them yet."""
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _remove(self) -> None:
+        """Delete the database file and its journals."""
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            try:
+                os.remove(self.db_path + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _lookup(self, path: str,
+                stat: os.stat_result) -> Optional[List[QuoteModel]]:
+        """Return the cached quotes of a file if it is unchanged."""
+        key = os.path.abspath(path)
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT size, mtime_ns FROM files WHERE path = ?", (key,)
+                ).fetchone()
+                if row != (stat.st_size, stat.st_mtime_ns):
+                    return None
+                return [
+                    QuoteModel(body, author)
+                    for body, author in conn.execute(
+                        "SELECT body, author FROM quotes WHERE path = ? "
+                        "ORDER BY idx", (key,))
+                ]
+        except sqlite3.DatabaseError as error:
+            logger.warning("Cannot read %s from the quote cache: %s",
+                           path, error)
+            return None
+
+    def parse(self, path: str) -> List[QuoteModel]:
+        """
+        Return the quotes of a file, parsing it only if it changed.
+
+        :param path: Path of the quote file.
+        :return: The quotes of the file, in file order.
+        """
+        stat = os.stat(path)
+        quotes = self._lookup(path, stat)
+        if quotes is not None:
+            self.hits += 1
+            return quotes
+
+        quotes = Ingestor.parse(path)
+        self.misses += 1
+        self.store(path, quotes, stat)
+        return quotes
+
+    def parse_many(self, paths: List[str], threads: int = None,
+                   processes: int = None) -> IngestReport:
+        """
+        Return the quotes of many files, parsing changed ones in parallel.
+
+        Unchanged files are loaded from the cache; the others go through
+        Ingestor.parse_many and are stored once parsed.
+
+        :param paths: The files to load.
+        :param threads: Size of the PDF thread pool (default: automatic).
+        :param processes: Size of the process pool (default: CPU count).
+        :return: An IngestReport with the quotes of every file, in path
+                 order, and the errors and timings of the parsed ones.
+        """
+        cached = {}
+        stats = {}
+        for path in paths:
+            try:
+                stats[path] = os.stat(path)
+            except OSError:
+                continue
+            quotes = self._lookup(path, stats[path])
+            if quotes is not None:
+                self.hits += 1
+                cached[path] = quotes
+
+        stale = [path for path in paths if path not in cached]
+        report = Ingestor.parse_many(stale, threads=threads,
+                                     processes=processes) \
+            if stale else IngestReport()
+        for path, quotes in report.results.items():
+            self.misses += 1
+            if path in stats:
+                self.store(path, quotes, stats[path])
+
+        results = {**cached, **report.results}
+        report.results = {path: results[path]
+                          for path in paths if path in results}
+        return report
+
+    def store(self, path: str, quotes: List[QuoteModel],
+              stat: Optional[os.stat_result] = None) -> None:
+        """
+        Record the parsed quotes of a file.
+
+        :param path: Path of the quote file.
+        :param quotes: The quotes parsed from the file.
+        :param stat: The file status taken before parsing; taken now if
+                     not given.
+        """
+        key = os.path.abspath(path)
+        stat = stat if stat is not None else os.stat(path)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM quotes WHERE path = ?", (key,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns),
+                )
+                conn.executemany(
+                    "INSERT INTO quotes VALUES (?, ?, ?, ?)",
+                    ((key, idx, quote.body, quote.author)
+                     for idx, quote in enumerate(quotes)),
+                )
+        except sqlite3.DatabaseError as error:
+            # The file is parsed again next time
+            logger.warning("Cannot store %s in the quote cache: %s",
+                           path, error)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drop cached quotes so they are parsed again on next use.
+
+        :param path: The file to invalidate; all files if None.
+        """
+        with closing(self._connect()) as conn, conn:
+            if path is None:
+                conn.execute("DELETE FROM quotes")
+                conn.execute("DELETE FROM files")
+            else:
+                key = os.path.abspath(path)
+                conn.execute("DELETE FROM quotes WHERE path = ?", (key,))
+                conn.execute("DELETE FROM files WHERE path = ?", (key,))
@@ -0,0 +1,190 @@
+"""
+Indexed lookup of quotes by author, keyword and length.
+
+This module defines the QuoteIndex class, which indexes a quote corpus so
+filtered selections such as "a random quote by this author" or "quotes
+under 80 characters" do not need a scan over every quote. The index keeps:
+
+- an author map from each (case-insensitive) author to its quote ids,
+- an inverted keyword index from each word to the ids of quotes using it,
+- the quote ids ordered by body length, so a length range is a contiguous
+  slice found by binary search.
+
+A query starts from the smallest of the matching candidate lists and checks
+the remaining conditions per candidate.
+
+Classes:
+    QuoteIndex: An author, keyword and length index over a quote corpus.
+
+Functions:
+    tokenize: Split text into lowercase keywords.
+"""
+
+import random
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence
+
+from .quote_model import QuoteModel
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Return the lowercase words of a text, in order."""
+    return WORD.findall(text.lower())
+
+
+class QuoteIndex:
+    """
+    An index over a sequence of quotes.
+
+    The quotes may be a list of QuoteModel instances or a QuoteStore; ids
+    are positions in that sequence.
+
+    Attributes:
+        quotes (Sequence[QuoteModel]): The indexed quotes.
+    """
+
+    sample_tries = 32
+
+    def __init__(self, quotes: Sequence[QuoteModel]):
+        """
+        Build the index.
+
+        :param quotes: The quotes to index.
+        """
+        self.quotes = quotes
+        self._author_ids: Dict[str, int] = {}
+        self._authors: List[array] = []
+        self._author_of = array("I")
+        self._keywords: Dict[str, array] = {}
+        self._lengths = array("I")
+
+        for quote_id, quote in enumerate(quotes):
+            key = quote.author.strip().lower()
+            author_id = self._author_ids.get(key)
+            if author_id is None:
+                author_id = self._author_ids[key] = len(self._authors)
+                self._authors.append(array("I"))
+            self._authors[author_id].append(quote_id)
+            self._author_of.append(author_id)
+            for word in set(tokenize(quote.body)):
+                postings = self._keywords.get(word)
+                if postings is None:
+                    postings = self._keywords[word] = array("I")
+                postings.append(quote_id)
+            self._lengths.append(len(quote.body))
+
+        order = sorted(range(len(self._lengths)),
+                       key=self._lengths.__getitem__)
+        self._by_length = array("I", order)
+        self._sorted_lengths = array(
+            "I", (self._lengths[i] for i in order))
+
+    def __len__(self) -> int:
+        """Return the number of indexed quotes."""
+        return len(self._lengths)
+
+    def authors(self) -> List[str]:
+        """Return the indexed (lowercase) author names."""
+        return sorted(self._author_ids)
+
+    def _plan(self, author: Optional[str], keyword: Optional[str],
+              min_length: Optional[int], max_length: Optional[int]):
+        """
+        Resolve filters into candidate lists and per-id checks.
+
+        :return: The smallest candidate list and the checks that ids from
+                 it must pass, or (None, None) if nothing can match.
+        """
+        candidates = []
+        checks = []
+        if author is not None:
+            author_id = self._author_ids.get(author.strip().lower())
+            if author_id is None:
+                return None, None
+            candidates.append(self._authors[author_id])
+            checks.append(lambda i: self._author_of[i] == author_id)
+        for word in set(tokenize(keyword or "")):
+            postings = self._keywords.get(word)
+            if postings is None:
+                return None, None
+            candidates.append(postings)
+            checks.append(lambda i, p=postings: _contains(p, i))
+        if min_length is not None or max_length is not None:
+            low = 0 if min_length is None else min_length
+            high = max_length
+            if high is None:
+                high = self._sorted_lengths[-1] if len(self) else 0
+            start = bisect_left(self._sorted_lengths, low)
+            end = bisect_right(self._sorted_lengths, high)
+            candidates.append(memoryview(self._by_length)[start:end])
+            checks.append(lambda i: low <= self._lengths[i] <= high)
+        if not candidates:
+            return range(len(self)), []
+
+        smallest = min(range(len(candidates)),
+                       key=lambda n: len(candidates[n]))
+        del checks[smallest]
+        return candidates[smallest], checks
+
+    def query(self, author: Optional[str] = None,
+              keyword: Optional[str] = None,
+              min_length: Optional[int] = None,
+              max_length: Optional[int] = None) -> List[int]:
+        """
+        Return the ids of every quote matching all given filters.
+
+        :param author: Author name, compared case-insensitively.
+        :param keyword: Words that must all appear in the body.
+        :param min_length: Minimum body length in characters.
+        :param max_length: Maximum body length in characters.
+        :return: The matching ids in ascending order.
+        """
+        candidates, checks = self._plan(author, keyword,
+                                        min_length, max_length)
+        if candidates is None:
+            return []
+        return sorted(i for i in candidates
+                      if all(check(i) for check in checks))
+
+    def choice(self, author: Optional[str] = None,
+               keyword: Optional[str] = None,
+               min_length: Optional[int] = None,
+               max_length: Optional[int] = None,
+               rng: random.Random = random) -> Optional[QuoteModel]:
+        """
+        Return a random quote matching all given filters.
+
+        Candidates are sampled from the smallest candidate list and checked
+        against the other filters; only if sampling keeps missing are all
+        matches collected. With a single filter this takes constant time.
+
+        :param author: Author name, compared case-insensitively.
+        :param keyword: Words that must all appear in the body.
+        :param min_length: Minimum body length in characters.
+        :param max_length: Maximum body length in characters.
+        :param rng: The random number generator to use.
+        :return: A matching quote, or None if there is none.
+        """
+        candidates, checks = self._plan(author, keyword,
+                                        min_length, max_length)
+        if not candidates:
+            return None
+        for _ in range(self.sample_tries):
+            quote_id = candidates[rng.randrange(len(candidates))]
+            if all(check(quote_id) for check in checks):
+                return self.quotes[quote_id]
+        matches = [i for i in candidates
+                   if all(check(i) for check in checks)]
+        if not matches:
+            return None
+        return self.quotes[rng.choice(matches)]
+
+
+def _contains(postings: array, quote_id: int) -> bool:
+    """Return True if a sorted posting list contains an id."""
+    position = bisect_left(postings, quote_id)
+    return position < len(postings) and postings[position] == quote_id
@@ -22,6 +22,9 @@ class QuoteModel:
     - body: the content of the quote.
     - author: the author of the quote.
 
+    Instances are slotted, without a per-instance `__dict__`, to keep
+    large in-memory corpora small.
+
     Attributes:
         body (str): The content of the quote.
         author (str): The author of the quote.
@@ -31,6 +34,8 @@ class QuoteModel:
                   '"body" - author'.
     """
 
+    __slots__ = ("body", "author")
+
     def __init__(self, body: str, author: str):
         """
         Initialize a QuoteModel instance with the given body and author.
@@ -0,0 +1,204 @@
+"""
+Compact storage for large quote corpora.
+
+This module defines the QuoteStore class, which keeps a corpus of quotes in
+a few contiguous buffers instead of one Python object per quote. Quote
+bodies are stored back to back as UTF-8 with an offset array, and authors
+are interned: each distinct author is stored once and quotes refer to it by
+id. A store can be saved to a file and memory-mapped, so several worker
+processes share the same pages. A saved store carries a caller-chosen tag,
+such as a digest of the files it was built from, so a process can tell
+whether an existing file is current before writing its own.
+
+QuoteModel instances are created on demand when a quote is accessed.
+
+Classes:
+    QuoteStore: An array-backed, optionally memory-mapped quote corpus.
+
+Functions:
+    None.
+"""
+
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+from .quote_model import QuoteModel
+
+MAGIC = b"QSTORE2" + (b"L" if sys.byteorder == "little" else b"B")
+HEADER = struct.Struct("<8sQQQQ32s")
+
+
+class QuoteStore:
+    """
+    A read-only sequence of quotes packed into contiguous buffers.
+
+    The store supports len(), indexing and iteration, so it can be used
+    wherever a list of QuoteModel instances was, including random.choice.
+
+    Attributes:
+        authors (int): Number of distinct authors in the store.
+        tag (bytes): The tag the store was saved with, empty if unsaved.
+    """
+
+    def __init__(self, body_offsets, author_offsets, author_ids,
+                 bodies, authors, mapping=None, tag=b""):
+        """
+        Initialize the store from its buffers.
+
+        Use from_quotes or load instead of calling this directly.
+
+        :param body_offsets: n + 1 byte offsets of the bodies.
+        :param author_offsets: m + 1 byte offsets of the distinct authors.
+        :param author_ids: The author id of each of the n quotes.
+        :param bodies: The UTF-8 bodies, back to back.
+        :param authors: The UTF-8 distinct authors, back to back.
+        :param mapping: The mmap backing the buffers, if any.
+        :param tag: The tag read from a saved store.
+        """
+        self._body_offsets = body_offsets
+        self._author_offsets = author_offsets
+        self._author_ids = author_ids
+        self._bodies = bodies
+        self._authors = authors
+        self._mapping = mapping
+        self.authors = len(author_offsets) - 1
+        self.tag = tag
+
+    @classmethod
+    def from_quotes(cls, quotes: Iterable[QuoteModel]) -> "QuoteStore":
+        """
+        Pack quotes into a new store.
+
+        The quotes are consumed one at a time, so a lazy source such as
+        Ingestor.iter_parse never has to be held in memory as a list.
+
+        :param quotes: The quotes to store.
+        :return: The new store.
+        """
+        body_offsets = array("Q", [0])
+        author_offsets = array("Q", [0])
+        author_ids = array("I")
+        bodies = bytearray()
+        authors = bytearray()
+        interned = {}
+        for quote in quotes:
+            bodies += quote.body.encode("utf-8")
+            body_offsets.append(len(bodies))
+            author_id = interned.get(quote.author)
+            if author_id is None:
+                author_id = interned[quote.author] = len(interned)
+                authors += quote.author.encode("utf-8")
+                author_offsets.append(len(authors))
+            author_ids.append(author_id)
+        return cls(body_offsets, author_offsets, author_ids,
+                   bytes(bodies), bytes(authors))
+
+    def save(self, path: str, tag: bytes = b"") -> None:
+        """
+        Write the store to a file that load can memory-map.
+
+        The file is written next to its destination and renamed into
+        place, so processes mapping the old file are not disturbed.
+
+        :param path: The destination file.
+        :param tag: Up to 32 bytes identifying the content, read back,
+                    padded with zero bytes to 32, as the tag attribute of
+                    the loaded store.
+        :raises ValueError: If the tag is longer than 32 bytes.
+        """
+        if len(tag) > 32:
+            raise ValueError("A quote store tag is at most 32 bytes")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, len(self), self.authors,
+                                   len(self._bodies), len(self._authors),
+                                   tag))
+            for buffer in (self._body_offsets, self._author_offsets,
+                           self._author_ids, self._bodies, self._authors):
+                file.write(memoryview(buffer).cast("B"))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "QuoteStore":
+        """
+        Memory-map a store written by save.
+
+        :param path: The file to map.
+        :return: A store whose buffers are views of the mapped file.
+        :raises ValueError: If the file is not a quote store written on a
+                            machine with the same byte order.
+        """
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        if len(view) < HEADER.size:
+            raise ValueError(f"Not a quote store: {path}")
+        magic, count, authors, bodies_len, authors_len, tag = \
+            HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"Not a quote store: {path}")
+
+        position = HEADER.size
+
+        def take(size: int, fmt: str = "B") -> memoryview:
+            nonlocal position
+            chunk = view[position:position + size]
+            position += size
+            return chunk.cast(fmt) if fmt != "B" else chunk
+
+        body_offsets = take(8 * (count + 1), "Q")
+        author_offsets = take(8 * (authors + 1), "Q")
+        author_ids = take(4 * count, "I")
+        return cls(body_offsets, author_offsets, author_ids,
+                   take(bodies_len), take(authors_len), mapping, tag)
+
+    def __len__(self) -> int:
+        """Return the number of quotes."""
+        return len(self._author_ids)
+
+    def __getitem__(self, index: int) -> QuoteModel:
+        """Return the quote at an index as a QuoteModel."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("quote index out of range")
+        return QuoteModel(self.body(index), self.author(index))
+
+    def __iter__(self) -> Iterator[QuoteModel]:
+        """Yield every quote as a QuoteModel."""
+        for index in range(len(self)):
+            yield QuoteModel(self.body(index), self.author(index))
+
+    def body(self, index: int) -> str:
+        """Return the body of the quote at an index."""
+        start = self._body_offsets[index]
+        end = self._body_offsets[index + 1]
+        return str(self._bodies[start:end], "utf-8")
+
+    def author_id(self, index: int) -> int:
+        """Return the interned author id of the quote at an index."""
+        return self._author_ids[index]
+
+    def author_name(self, author_id: int) -> str:
+        """Return the name of an interned author."""
+        start = self._author_offsets[author_id]
+        end = self._author_offsets[author_id + 1]
+        return str(self._authors[start:end], "utf-8")
+
+    def author(self, index: int) -> str:
+        """Return the author of the quote at an index."""
+        return self.author_name(self._author_ids[index])
+
+    def sample(self, rng: random.Random = random) -> QuoteModel:
+        """
+        Return a uniformly random quote in constant time.
+
+        :param rng: The random number generator to use.
+        :return: The chosen quote.
+        """
+        return self[rng.randrange(len(self))]
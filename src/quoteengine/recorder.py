@@ -0,0 +1,89 @@
+"""
+Recorder Module.
+
+This module holds `recorder`, through which the ingestors time parsing and
+text extraction and count parsed files, quotes and errors. Nothing is
+recorded until an application installs a metrics recorder with
+set_recorder, such as the web app's Telemetry instance, so the quote
+engine works without any metrics module.
+
+Classes:
+    Recorder: Forwards timings and counts to an installed recorder.
+
+Functions:
+    set_recorder: Install the recorder the quote engine reports to.
+"""
+
+from contextlib import nullcontext
+from typing import ContextManager
+
+_NOOP = nullcontext()
+
+
+class Recorder:
+    """
+    Recorder forwards to an installed recorder, or does nothing.
+
+    Attributes:
+        target (object): The installed recorder, or None. It provides
+                         stage, observe and count like telemetry.Telemetry.
+    """
+
+    __slots__ = ("target",)
+
+    def __init__(self):
+        """Initialize a recorder with nothing installed."""
+        self.target = None
+
+    def stage(self, component: str, stage: str,
+              **labels) -> ContextManager:
+        """
+        Time a stage of ingestion.
+
+        :param component: The instrumented component, e.g. "ingest".
+        :param stage: The stage within it, e.g. "parse".
+        :param labels: Extra labels, e.g. format="pdf".
+        :return: A context manager timing its block; a shared no-op while
+                 nothing is installed.
+        """
+        target = self.target
+        if target is None:
+            return _NOOP
+        return target.stage(component, stage, **labels)
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """
+        Record a duration measured by the caller, e.g. in a worker.
+
+        :param name: The histogram name, e.g. "ingest_stage_seconds".
+        :param seconds: The duration.
+        :param labels: The histogram labels.
+        """
+        target = self.target
+        if target is not None:
+            target.observe(name, seconds, **labels)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Increment a counter of the installed recorder, if any.
+
+        :param name: The counter name, e.g. "ingest_files_total".
+        :param value: The amount to add (default: 1).
+        :param labels: The counter labels.
+        """
+        target = self.target
+        if target is not None:
+            target.count(name, value, **labels)
+
+
+# The recorder shared by the quote engine's modules
+recorder = Recorder()
+
+
+def set_recorder(target) -> None:
+    """
+    Install the recorder the quote engine reports to.
+
+    :param target: E.g. `telemetry.telemetry`, or None to stop reporting.
+    """
+    recorder.target = target
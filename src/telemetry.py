@@ -0,0 +1,353 @@
+"""
+Telemetry Module.
+
+This module defines the Telemetry class, which times the stages of the hot
+paths (decoding, resizing, drawing and encoding memes, parsing quote files,
+waiting on pdftotext) and counts their events. Stage timings are aggregated
+into histograms that render in the Prometheus text format, and can also be
+collected per request for a Server-Timing header.
+
+Telemetry is off by default. While it is off and no trace is active, a
+stage costs a context variable lookup and returns a shared no-op context
+manager, so the instrumented code runs at practically full speed.
+
+The meme and quote engines do not import this module; they report to
+whatever recorder is installed with memeengine.set_recorder and
+quoteengine.set_recorder, which the web app points at `telemetry`.
+
+Timings are aggregated per process; stages that run in worker processes,
+such as MemeBatch renders or quote files parsed on a process pool, are not
+seen by the parent's histograms unless the parent records them itself.
+
+Usage:
+    from telemetry import telemetry
+
+    telemetry.enable()
+    with telemetry.stage("meme", "decode"):
+        image.load()
+    telemetry.count("meme_renders_total")
+    print(telemetry.render())
+
+Classes:
+    Histogram: Cumulative bucket counts, sum and count of observations.
+    Trace: The stage timings of one request, for a Server-Timing header.
+    Telemetry: Histograms, counters and gauges of a process.
+
+Functions:
+    None.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import (Callable, ContextManager, Dict, Iterable, List,
+                    Optional, Sequence, Tuple)
+
+# Seconds; spans cached lookups (sub-millisecond) to slow PDF parses
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+_NOOP = nullcontext()
+_trace: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar(
+    "telemetry_trace", default=None)
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    """Return labels as a hashable, sorted tuple of strings."""
+    return tuple(sorted((name, str(value))
+                        for name, value in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    """Return labels in the Prometheus text format, e.g. {a="b"}."""
+    escaped = [
+        '{}="{}"'.format(name, value.replace("\\", "\\\\")
+                         .replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    ]
+    return "{" + ",".join(escaped) + "}" if escaped else ""
+
+
+def _format_value(value: float) -> str:
+    """Return a sample value, without a fraction for whole numbers."""
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Histogram:
+    """
+    Histogram counts observations into cumulative buckets.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, ascending.
+        counts (list): Observations per bucket, plus one for +Inf.
+        sum (float): Sum of all observations.
+        count (int): Number of observations.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialize an empty histogram with the given bucket bounds."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Count one observation; the caller holds the registry lock."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf")
+                          else _format_value(bound), total))
+        return pairs
+
+
+class Trace:
+    """
+    Trace collects the stage timings of one request.
+
+    Stages timed while the trace is started are summed by name, also when
+    they run on a render queue worker on behalf of the request.
+
+    Attributes:
+        timings (dict): Seconds spent per stage name, e.g. "meme-decode".
+    """
+
+    def __init__(self):
+        """Initialize an empty, stopped trace."""
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def __enter__(self) -> "Trace":
+        """Start the trace."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the trace."""
+        self.stop()
+
+    def start(self) -> None:
+        """Make this the trace of the current context."""
+        self._previous = _trace.get()
+        _trace.set(self)
+
+    def stop(self) -> None:
+        """Restore the trace that was current before start."""
+        _trace.set(self._previous)
+        self._previous = None
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add the duration of a stage."""
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def header(self, total: Optional[float] = None) -> str:
+        """
+        Return the timings as a Server-Timing header value.
+
+        :param total: Optional duration of the whole request, in seconds.
+        :return: E.g. "meme-decode;dur=3.1, meme-encode;dur=1.2".
+        """
+        with self._lock:
+            timings = list(self.timings.items())
+        if total is not None:
+            timings.append(("total", total))
+        return ", ".join(f"{name};dur={1000 * seconds:.2f}"
+                         for name, seconds in timings)
+
+
+class _Timer:
+    """Context manager that times one stage when telemetry is active."""
+
+    __slots__ = ("telemetry", "family", "trace_name", "labels", "trace",
+                 "started")
+
+    def __init__(self, telemetry: "Telemetry", family: str, trace_name: str,
+                 labels: Labels, trace: Optional[Trace]):
+        """Initialize a timer; use Telemetry.stage instead."""
+        self.telemetry = telemetry
+        self.family = family
+        self.trace_name = trace_name
+        self.labels = labels
+        self.trace = trace
+        self.started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        """Start timing."""
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Record the elapsed time, also when the block raised."""
+        elapsed = time.perf_counter() - self.started
+        if self.telemetry.enabled:
+            self.telemetry._observe(self.family, self.labels, elapsed)
+        if self.trace is not None:
+            self.trace.add(self.trace_name, elapsed)
+
+
+class Telemetry:
+    """
+    Telemetry aggregates stage timings, counters and gauges of a process.
+
+    Stage timings go to histograms named "<component>_stage_seconds" with a
+    "stage" label; counters and plain histograms are named by the caller.
+    Gauges, and counters kept by other objects such as cache hits, are read
+    from collector functions when the metrics are rendered.
+
+    Attributes:
+        enabled (bool): Whether timings and counts are recorded.
+        buckets (tuple): Bucket bounds of new histograms, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialize disabled telemetry with no recorded data."""
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._collectors: List[Tuple[str,
+                                     Callable[[], Iterable[Sample]]]] = []
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True) -> None:
+        """Start, or with enabled=False stop, recording."""
+        self.enabled = enabled
+
+    def stage(self, component: str, stage: str,
+              **labels) -> ContextManager:
+        """
+        Time a stage of a hot path.
+
+        :param component: The instrumented component, e.g. "meme".
+        :param stage: The stage within it, e.g. "decode".
+        :param labels: Extra histogram labels, e.g. format="pdf".
+        :return: A context manager timing its block; a shared no-op while
+                 telemetry is disabled and no trace is active.
+        """
+        trace = _trace.get()
+        if not self.enabled and trace is None:
+            return _NOOP
+        return _Timer(self, f"{component}_stage_seconds",
+                      f"{component}-{stage}",
+                      _labels({"stage": stage, **labels}), trace)
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """
+        Record a duration measured by the caller in a histogram.
+
+        :param name: The histogram name, e.g. "http_request_seconds".
+        :param seconds: The duration.
+        :param labels: The histogram labels.
+        """
+        if self.enabled:
+            self._observe(name, _labels(labels), seconds)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Increment a counter.
+
+        :param name: The counter name, e.g. "meme_renders_total".
+        :param value: The amount to add (default: 1).
+        :param labels: The counter labels.
+        """
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def collect(self, collector: Callable[[], Iterable[Sample]],
+                kind: str = "gauge") -> None:
+        """
+        Register a function reporting samples when metrics are rendered.
+
+        :param collector: Returns (name, labels, value) samples.
+        :param kind: "gauge", or "counter" for values that only grow, such
+                     as cache hits; counter names should end in "_total".
+        :raises ValueError: If kind is neither "gauge" nor "counter".
+        """
+        if kind not in ("gauge", "counter"):
+            raise ValueError(f"Unknown metric kind: {kind}")
+        with self._lock:
+            self._collectors.append((kind, collector))
+
+    def trace(self) -> Trace:
+        """Return a new trace; start it to collect a request's timings."""
+        return Trace()
+
+    def reset(self) -> None:
+        """Forget every recorded histogram and counter."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            histograms = {
+                name: [(labels, histogram.cumulative(), histogram.sum,
+                        histogram.count)
+                       for labels, histogram in sorted(series.items())]
+                for name, series in self._histograms.items()
+            }
+            counters = {name: sorted(series.items())
+                        for name, series in self._counters.items()}
+            collectors = list(self._collectors)
+
+        for name in sorted(histograms):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, buckets, total, count in histograms[name]:
+                for bound, cumulative in buckets:
+                    bucket_labels = _format_labels(labels + (("le", bound),))
+                    lines.append(f"{name}_bucket{bucket_labels} "
+                                 f"{cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} "
+                             f"{_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        for name in sorted(counters):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in counters[name]:
+                lines.append(f"{name}{_format_labels(labels)} "
+                             f"{_format_value(value)}")
+
+        collected: Dict[Tuple[str, str], List[str]] = {}
+        for kind, collector in collectors:
+            for name, labels, value in collector():
+                collected.setdefault((name, kind), []).append(
+                    f"{name}{_format_labels(_labels(labels))} "
+                    f"{_format_value(value)}")
+        for name, kind in sorted(collected):
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(collected[name, kind])
+        return "\n".join(lines) + "\n"
+
+    def _observe(self, name: str, labels: Labels, seconds: float) -> None:
+        """Add an observation to a histogram, creating it on first use."""
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+
+# Process-wide telemetry shared by the engines and the web app
+telemetry = Telemetry()
@@ -0,0 +1,99 @@
+"""
+Shared pytest setup.
+
+The packages under src import each other as top-level modules, the way
+app.py and meme.py run them, so src is put on the import path. The app
+finds its data and templates relative to the working directory, so the
+tests run from src as well.
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+os.chdir(SRC)
+
+
+@pytest.fixture
+def data_dir():
+    """Return the path of the bundled _data directory."""
+    return os.path.join(SRC, "_data")
+
+
+class ImageServer:
+    """
+    A local HTTP server answering from a table of routes.
+
+    Each route maps a path to (status, body, headers); the headers may
+    include an ETag, which is answered with 304 on a matching
+    If-None-Match, and a Content-Length of None to send the body without
+    one. delay holds the response back, and requests records
+    the path and headers of every request.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.delay = 0.0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        """Return the URL of a path on this server."""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def hits(self, path: str) -> int:
+        """Return how many requests asked for a path."""
+        return sum(requested == path for requested, _ in self.requests)
+
+    def close(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                time.sleep(server.delay)
+                status, body, headers = server.routes.get(
+                    self.path, (404, b"", {}))
+                etag = headers.get("ETag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                self.send_response(status)
+                headers = {"Content-Length": str(len(body)), **headers}
+                for name, value in headers.items():
+                    if value is not None:
+                        self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except OSError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def image_server():
+    """Yield a threaded local HTTP server, stopped after the test."""
+    server = ImageServer()
+    yield server
+    server.close()
@@ -0,0 +1,258 @@
+"""Tests of the Flask app."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import app
+from quoteengine.corpus import Corpus
+from quoteengine.ingestor import IngestorPDF
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_setup_parses_without_a_process_pool(monkeypatch):
+    """setup runs on a server thread, so it must not fork a pool."""
+    calls = []
+    monkeypatch.setattr(Corpus, "reload",
+                        lambda self, processes=None: calls.append(processes))
+    monkeypatch.setattr(Corpus, "start", lambda self, interval=2.0: None)
+    monkeypatch.setattr(IngestorPDF, "backend", IngestorPDF.backend)
+    app.setup()
+    assert calls == [0]
+
+
+@pytest.fixture
+def client():
+    """Return a test client of the app with the corpus loaded."""
+    app.resources.load()
+    return app.app.test_client()
+
+
+WEBP_BROWSER = "image/avif,image/webp,image/apng,*/*;q=0.8"
+
+
+@pytest.mark.parametrize("path", ["/", "/meme"])
+def test_negotiated_responses_vary_on_accept(client, path):
+    """Responses whose format came from Accept say so in Vary."""
+    response = client.get(path, headers={"Accept": WEBP_BROWSER})
+    assert response.status_code == 200
+    assert "Accept" in response.vary
+
+
+@pytest.mark.parametrize("path", ["/", "/meme"])
+def test_explicit_format_does_not_vary(client, path):
+    """A format chosen by query parameter does not depend on Accept."""
+    response = client.get(f"{path}?format=jpeg",
+                          headers={"Accept": WEBP_BROWSER})
+    assert response.status_code == 200
+    assert "Accept" not in response.vary
+
+
+def test_quote_filters_narrow_the_choice(client, monkeypatch):
+    """Filters pick a matching quote, or answer 404 if none matches."""
+    quotes = []
+    render = app.render_random
+
+    def spy(img, quote, encoder):
+        quotes.append(quote)
+        return render(img, quote, encoder)
+
+    monkeypatch.setattr(app, "render_random", spy)
+    for _ in range(5):
+        assert client.get("/?author=BORK&max_len=40").status_code == 200
+    assert {quote.author.strip() for quote in quotes} == {"Bork"}
+    assert all(len(quote.body) <= 40 for quote in quotes)
+    assert client.get("/?author=nobody").status_code == 404
+    assert client.get("/meme?q=meow+purr").status_code == 404
+
+
+@pytest.fixture
+def instrumented(monkeypatch):
+    """Return a client of an app built with metrics and Server-Timing."""
+    monkeypatch.setenv("MEME_METRICS", "1")
+    monkeypatch.setenv("MEME_SERVER_TIMING", "1")
+    flask_app = app.create_app(eager=True)
+    yield flask_app.test_client()
+    app.telemetry.enable(False)
+    app.telemetry.reset()
+
+
+def test_metrics_use_the_prometheus_text_format(instrumented):
+    """Stage timings are histograms and monotonic stats are counters."""
+    assert instrumented.get("/meme?format=png").status_code == 200
+    response = instrumented.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    lines = text.splitlines()
+
+    assert "# TYPE meme_stage_seconds histogram" in lines
+    assert any(line.startswith("meme_stage_seconds_bucket{")
+               and 'stage="encode"' in line and 'le="+Inf"' in line
+               for line in lines)
+    assert "# TYPE http_request_seconds histogram" in lines
+    assert "# TYPE meme_renders_total counter" in lines
+    for name in ["image_pool_hits_total", "text_layer_cache_misses_total",
+                 "render_queue_done_total"]:
+        assert f"# TYPE {name} counter" in lines
+        assert any(line.startswith(f"{name} ") for line in lines)
+    assert "# TYPE image_pool_frames gauge" in lines
+    assert "# TYPE render_queue_pending gauge" in lines
+    # Every counter is named *_total, and no sample lacks a TYPE
+    typed = {line.split()[2]: line.split()[3] for line in lines
+             if line.startswith("# TYPE")}
+    assert all(name.endswith("_total")
+               for name, kind in typed.items() if kind == "counter")
+    for line in lines:
+        if not line.startswith("#"):
+            name = line.split("{")[0].split()[0]
+            assert name in typed or name.rsplit("_", 1)[0] in typed
+
+
+def test_server_timing_reports_render_stages(instrumented):
+    """Stages timed on the render queue show up in Server-Timing."""
+    response = instrumented.get("/meme?format=png")
+    assert response.status_code == 200
+    timings = dict(entry.split(";dur=")
+                   for entry in response.headers["Server-Timing"]
+                   .split(", "))
+    assert "meme-encode" in timings and "total" in timings
+    assert all(float(value) >= 0 for value in timings.values())
+    assert float(timings["total"]) >= float(timings["meme-encode"])
+
+
+def test_metrics_are_off_by_default(client):
+    """Without MEME_METRICS the endpoint is not exposed."""
+    assert client.get("/metrics").status_code == 404
+
+
+@pytest.fixture
+def blocked_queue(monkeypatch):
+    """Give the app a one-job render queue whose worker is busy."""
+    from memeengine import RenderQueue
+
+    render_queue = RenderQueue(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+    render_queue.submit(lambda: started.set() or release.wait(10))
+    assert started.wait(10)
+    monkeypatch.setattr(app.resources, "_render_queue", render_queue)
+    yield render_queue
+    release.set()
+    render_queue.shutdown()
+
+
+@pytest.mark.parametrize("path", ["/?quality=50", "/meme"])
+def test_full_render_queue_answers_503(client, blocked_queue, path):
+    """A render that finds the queue full is refused with Retry-After."""
+    # quality bypasses the reservoir, so the render is queued
+    assert client.get("/?quality=50&async=1").status_code == 202
+    response = client.get(path)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.parametrize("path", ["/?quality=50", "/meme"])
+def test_render_missing_its_deadline_answers_504(client, blocked_queue,
+                                                 monkeypatch, path):
+    """A render not done by MEME_DEADLINE answers 504."""
+    monkeypatch.setenv("MEME_DEADLINE", "0.2")
+    assert client.get(path).status_code == 504
+
+
+def test_meme_streams_the_image_even_when_async(client):
+    """/meme answers with the image itself, never a job."""
+    response = client.get("/meme?format=png&async=1")
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    assert response.data.startswith(b"\x89PNG")
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+def test_deleted_photo_is_dropped_on_reload(tmp_path, data_dir,
+                                            monkeypatch):
+    """Reloading after a photo is deleted drops it and the old memes."""
+    from memeengine import ImagePool
+
+    quotes, photos = tmp_path / "quotes", tmp_path / "photos"
+    quotes.mkdir()
+    (quotes / "a.txt").write_text('"Woof" - Rex\n')
+    shutil.copytree(os.path.join(data_dir, "photos", "dog"), photos)
+    kept, deleted = sorted(str(path) for path in photos.iterdir())[:2]
+
+    app.resources.meme
+    pool = ImagePool()
+    monkeypatch.setattr(app.resources, "_pool", pool)
+    cleared = []
+    monkeypatch.setattr(app.resources, "clear_reservoirs",
+                        lambda: cleared.append(pool.holds(deleted)))
+    corpus = Corpus([str(quotes)], [str(photos)],
+                    on_reload=app.corpus_reloaded)
+    corpus.reload(processes=0)
+    assert pool.holds(deleted)
+
+    os.remove(deleted)
+    assert corpus.reload(processes=0)
+    assert deleted not in corpus.snapshot.imgs
+    assert not pool.holds(deleted)
+    assert pool.holds(kept)
+    # The reservoirs were cleared before the pool was touched
+    assert cleared == [False, True]
+
+
+STARTUP_CHECK = """
+import json
+import app
+client = app.app.test_client()
+app.resources.ready.wait(60)
+print(client.get("/ready").status_code, app.resources.load_error)
+print(json.dumps(sorted({client.get("/?quality=60").status_code
+                         for _ in range(20)})))
+"""
+
+
+def test_app_starts_with_a_corrupt_photo(tmp_path):
+    """An undecodable photo does not keep the app from becoming ready."""
+    tree = tmp_path / "src"
+    shutil.copytree(SRC, tree, ignore=shutil.ignore_patterns(
+        "tests", "__pycache__", "static", ".quotes*"))
+    (tree / "_data" / "photos" / "dog" / "bad.jpg").write_bytes(b"junk")
+
+    env = dict(os.environ, MEME_RESERVOIR_SIZE="0")
+    result = subprocess.run([sys.executable, "-c", STARTUP_CHECK],
+                            cwd=tree, env=env, capture_output=True,
+                            text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    ready, statuses = result.stdout.splitlines()[-2:]
+    assert ready == "200 None"
+    # Only the requests that pick the corrupt photo fail
+    assert 200 in json.loads(statuses)
+    assert "Dropping image" in result.stderr and "bad.jpg" in result.stderr
+
+
+def test_preloading_does_not_block_reloads(tmp_path, monkeypatch):
+    """A reload publishes its corpus while photos are still decoding."""
+    from memeengine import ImagePool
+
+    (tmp_path / "a.txt").write_text('"Woof" - Rex\n')
+    (tmp_path / "dog.jpg").write_bytes(b"")
+    app.resources.meme
+    pool = ImagePool()
+    monkeypatch.setattr(app.resources, "_pool", pool)
+    release = threading.Event()
+    monkeypatch.setattr(pool, "preload", lambda: release.wait(10))
+
+    corpus = Corpus([str(tmp_path)], [str(tmp_path)],
+                    on_reload=app.corpus_reloaded)
+    try:
+        assert corpus.reload(processes=0)
+        assert pool.holds(str(tmp_path / "dog.jpg"))
+        assert any(thread.name == "image-preloader"
+                   for thread in threading.enumerate())
+    finally:
+        release.set()
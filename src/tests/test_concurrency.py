@@ -0,0 +1,10 @@
+"""Concurrency stress test of one shared MemeGenerator."""
+
+from benchmarks.concurrency import check
+
+
+def test_concurrent_renders_match_serial_renders():
+    """Threads rendering through one generator never mix their memes."""
+    count, _, _, mixed = check(threads=8, rounds=3)
+    assert count == 24
+    assert mixed == []
@@ -0,0 +1,82 @@
+"""Tests of the hot-reloading quote corpus."""
+
+import os
+
+from benchmarks.synthetic import write_pdf
+from quoteengine.corpus import Corpus
+
+
+def test_failing_file_is_not_republished(tmp_path):
+    """A file that keeps failing is retried only once it changes."""
+    (tmp_path / "ok.txt").write_text('"Woof" - Rex\n')
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    corpus = Corpus([str(tmp_path)], [])
+
+    assert corpus.reload(processes=0)
+    assert str(broken) in corpus.snapshot.errors
+    for _ in range(3):
+        assert not corpus.reload(processes=0)
+    assert corpus.snapshot.generation == 1
+    assert str(broken) in corpus.snapshot.errors
+
+    write_pdf(str(broken), [("Bark", "Fido")])
+    os.utime(broken, ns=(1, 1))
+    assert corpus.reload(processes=0)
+    assert corpus.snapshot.generation == 2
+    assert corpus.snapshot.errors == {}
+    assert len(corpus.snapshot.quotes) == 2
+
+
+def test_removed_failing_file_clears_its_error(tmp_path):
+    """Removing a failing file publishes a snapshot without its error."""
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    corpus = Corpus([str(tmp_path)], [])
+    corpus.reload(processes=0)
+    assert corpus.snapshot.errors
+
+    broken.unlink()
+    assert corpus.reload(processes=0)
+    assert corpus.snapshot.errors == {}
+
+
+def test_processes_share_one_store_file(tmp_path):
+    """A second corpus maps the saved store instead of rewriting it."""
+    quotes = tmp_path / "quotes"
+    quotes.mkdir()
+    (quotes / "a.txt").write_text('"Woof" - Rex\n"Arf" - Fido\n')
+    store_path = str(tmp_path / "quotes.store")
+
+    first = Corpus([str(quotes)], [], store_path=store_path)
+    first.reload(processes=0)
+    written = os.stat(store_path)
+
+    second = Corpus([str(quotes)], [], store_path=store_path)
+    second.reload(processes=0)
+    assert os.stat(store_path).st_ino == written.st_ino
+    assert os.stat(store_path).st_mtime_ns == written.st_mtime_ns
+    assert list(map(str, second.snapshot.quotes)) == \
+        list(map(str, first.snapshot.quotes))
+
+    (quotes / "b.txt").write_text('"Bark" - Max\n')
+    assert first.reload(processes=0)
+    rewritten = os.stat(store_path)
+    assert rewritten.st_ino != written.st_ino
+    assert second.reload(processes=0)
+    assert os.stat(store_path).st_ino == rewritten.st_ino
+    assert len(second.snapshot.quotes) == 3
+
+
+def test_image_changes_keep_the_quotes(tmp_path):
+    """A reload caused only by images reuses the quote store and index."""
+    (tmp_path / "a.txt").write_text('"Woof" - Rex\n')
+    corpus = Corpus([str(tmp_path)], [str(tmp_path)])
+    corpus.reload(processes=0)
+    before = corpus.snapshot
+
+    (tmp_path / "dog.jpg").write_bytes(b"")
+    assert corpus.reload(processes=0)
+    assert corpus.snapshot.imgs == [str(tmp_path / "dog.jpg")]
+    assert corpus.snapshot.quotes is before.quotes
+    assert corpus.snapshot.index is before.index
@@ -0,0 +1,100 @@
+"""Parity tests of the streaming DOCX reader against python-docx."""
+
+import os
+import shutil
+
+import docx
+import pytest
+
+from benchmarks.docx_reader import write_markup_docx
+from quoteengine import QuoteModel
+from quoteengine import docx_text
+from quoteengine.ingestor import IngestorDOCX
+
+BUNDLED = ["DogQuotes/DogQuotesDOCX.docx", "SimpleLines/SimpleLines.docx"]
+
+# Empty and whitespace-only paragraphs, as Word writes them
+BLANKS = ["", " ", "   ", "\t", " \t ", '"Spaced"  -  Author  ', "  - "]
+
+
+def python_docx_paragraphs(path):
+    """Return the paragraph texts python-docx reads from a file."""
+    return [para.text for para in docx.Document(path).paragraphs]
+
+
+def python_docx_quotes(path):
+    """Parse quotes the way IngestorDOCX did with python-docx."""
+    quotes = []
+    for text in python_docx_paragraphs(path):
+        if " - " in text:
+            parts = text.rsplit(" - ", 1)
+            if len(parts) == 2:
+                quotes.append(QuoteModel(parts[0].strip(), parts[1].strip()))
+    return quotes
+
+
+def with_blanks(source, path):
+    """Copy a document and add empty and whitespace-only paragraphs."""
+    document = docx.Document(source)
+    first = document.paragraphs[0]
+    for text in BLANKS:
+        first.insert_paragraph_before(text)
+        document.add_paragraph(text)
+    paragraph = document.add_paragraph()
+    paragraph.add_run("  ")
+    paragraph.add_run("")
+    paragraph.add_run("\t")
+    document.save(path)
+    return path
+
+
+@pytest.fixture(params=BUNDLED + [f"{name} with blanks" for name in BUNDLED]
+                + ["markup", "markup in word/main.xml"])
+def document(request, data_dir, tmp_path, monkeypatch):
+    """Return the path of a document to compare both readers on."""
+    # Every one of these must be read by the streaming reader itself
+    monkeypatch.setattr(docx_text, "_python_docx_paragraphs", None)
+    name = request.param
+    if name.startswith("markup"):
+        path = str(tmp_path / "markup.docx")
+        part = "word/main.xml" if "main" in name else "word/document.xml"
+        write_markup_docx(path, part)
+        return path
+    source = os.path.join(data_dir, name.split(" ")[0])
+    if name.endswith("with blanks"):
+        return with_blanks(source, str(tmp_path / "blanks.docx"))
+    path = str(tmp_path / os.path.basename(source))
+    shutil.copy(source, path)
+    return path
+
+
+def test_paragraphs_match_python_docx(document):
+    """Paragraph texts, blank ones included, match python-docx."""
+    expected = python_docx_paragraphs(document)
+    assert list(docx_text.iter_paragraphs(document)) == expected
+
+
+def test_blank_paragraphs_are_kept(data_dir, tmp_path):
+    """Empty and whitespace-only paragraphs are yielded, not skipped."""
+    path = with_blanks(os.path.join(data_dir, BUNDLED[1]),
+                       str(tmp_path / "blanks.docx"))
+    paragraphs = list(docx_text.iter_paragraphs(path))
+    for text in BLANKS:
+        assert paragraphs.count(text) >= 2
+    assert paragraphs[-1] == "  \t"
+
+
+def test_ingestor_matches_python_docx(document):
+    """IngestorDOCX parses the same quotes as the python-docx version."""
+    expected = [(q.body, q.author) for q in python_docx_quotes(document)]
+    actual = [(q.body, q.author) for q in IngestorDOCX.parse(document)]
+    assert actual == expected
+
+
+def test_bundled_quotes(data_dir):
+    """The bundled documents parse into their known quotes."""
+    simple = IngestorDOCX.parse(os.path.join(data_dir, BUNDLED[1]))
+    assert [(q.body, q.author) for q in simple] == [
+        (f'"Line {n}"', f"Author {n}") for n in range(1, 6)]
+    dogs = IngestorDOCX.parse(os.path.join(data_dir, BUNDLED[0]))
+    assert len(dogs) == 4
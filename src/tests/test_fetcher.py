@@ -0,0 +1,112 @@
+"""Tests of the bounded HTTP image fetcher."""
+
+import asyncio
+import time
+
+import pytest
+
+from memeengine import FetchError, ImageFetcher
+
+IMAGE = b"\xff\xd8 fake jpeg bytes" * 100
+
+
+@pytest.fixture
+def fetcher():
+    """Return a fetcher with short timeouts, closed after the test."""
+    fetcher = ImageFetcher(connect_timeout=0.5, read_timeout=0.3,
+                           max_bytes=len(IMAGE))
+    yield fetcher
+    fetcher.close()
+
+
+def test_images_are_fetched_into_memory(fetcher, image_server):
+    """A 200 response body is returned as a buffer."""
+    image_server.routes["/img.jpg"] = (200, IMAGE, {})
+    assert fetcher.fetch(image_server.url("/img.jpg")).read() == IMAGE
+
+
+def test_requests_use_connect_and_read_timeouts(fetcher, image_server,
+                                                monkeypatch):
+    """Every request passes the (connect, read) timeout pair."""
+    image_server.routes["/img.jpg"] = (200, IMAGE, {})
+    calls = []
+    get = fetcher.session.get
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return get(*args, **kwargs)
+
+    monkeypatch.setattr(fetcher.session, "get", spy)
+    fetcher.fetch(image_server.url("/img.jpg"))
+    assert calls[0]["timeout"] == (0.5, 0.3)
+    assert calls[0]["stream"] is True
+
+
+def test_slow_responses_time_out(fetcher, image_server):
+    """A server slower than read_timeout raises FetchError promptly."""
+    image_server.routes["/slow.jpg"] = (200, IMAGE, {})
+    image_server.delay = 2
+    started = time.monotonic()
+    with pytest.raises(FetchError):
+        fetcher.fetch(image_server.url("/slow.jpg"))
+    assert time.monotonic() - started < 1.5
+
+
+def test_declared_oversized_bodies_are_refused(fetcher, image_server):
+    """A Content-Length above max_bytes fails before reading the body."""
+    image_server.routes["/big.jpg"] = (200, IMAGE + b"!", {})
+    with pytest.raises(FetchError, match="larger than"):
+        fetcher.fetch(image_server.url("/big.jpg"))
+
+
+def test_streamed_oversized_bodies_are_refused(fetcher, image_server):
+    """Without a Content-Length the streamed size is checked."""
+    image_server.routes["/big.jpg"] = (200, IMAGE * 4,
+                                       {"Content-Length": None})
+    image_server.routes["/ok.jpg"] = (200, IMAGE, {"Content-Length": None})
+    with pytest.raises(FetchError, match="larger than"):
+        fetcher.fetch(image_server.url("/big.jpg"))
+    assert fetcher.fetch(image_server.url("/ok.jpg")).read() == IMAGE
+
+
+@pytest.mark.parametrize("status", [404, 500, 302])
+def test_other_statuses_are_errors(fetcher, image_server, status):
+    """Responses other than 200 and 304 raise FetchError."""
+    image_server.routes["/img.jpg"] = (status, b"nope", {})
+    with pytest.raises(FetchError, match=str(status)):
+        fetcher.fetch(image_server.url("/img.jpg"))
+
+
+def test_not_modified_is_returned_to_the_caller(fetcher, image_server):
+    """A 304 to a conditional request is returned, not raised."""
+    image_server.routes["/img.jpg"] = (200, IMAGE, {"ETag": '"v1"'})
+    result = fetcher.get(image_server.url("/img.jpg"),
+                         headers={"If-None-Match": '"v1"'})
+    assert (result.status, result.content) == (304, b"")
+
+
+def test_unsupported_schemes_are_rejected(fetcher):
+    """Only http and https URLs are fetched."""
+    with pytest.raises(FetchError):
+        fetcher.fetch("file:///etc/passwd")
+
+
+def test_fetch_async_does_not_block_the_loop(fetcher, image_server):
+    """fetch_async returns the image while the event loop keeps running."""
+    image_server.routes["/img.jpg"] = (200, IMAGE, {})
+    image_server.delay = 0.2
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        buffer = await fetcher.fetch_async(image_server.url("/img.jpg"))
+        ticker.cancel()
+        return buffer
+
+    assert asyncio.run(main()).read() == IMAGE
+    assert len(ticks) > 5
@@ -0,0 +1,139 @@
+"""Tests of the pool of decoded source photos."""
+
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from memeengine.image_pool import ImagePool, open_for_width
+
+
+def write_photo(path, size=(400, 300), fmt="JPEG"):
+    """Write a gradient photo and return its path."""
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    image.save(path, fmt)
+    return str(path)
+
+
+@pytest.fixture
+def photos(tmp_path):
+    """Return the paths of three photos."""
+    return [write_photo(tmp_path / f"dog{n}.jpg") for n in range(3)]
+
+
+def test_frames_are_kept_per_width(photos):
+    """Each width gets its own frame, reused by later lookups."""
+    pool = ImagePool(photos[:1])
+    small = pool.get(photos[0], 200)
+    large = pool.get(photos[0], 300)
+    assert small.size == (200, 150)
+    assert large.size == (300, 225)
+    assert pool.get(photos[0], 200) is small
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 2
+    # The decoded original and one frame per width
+    assert pool.stats()["frames"] == 3
+
+
+def test_concurrent_lookups_are_all_counted(photos):
+    """Every lookup from any thread counts as exactly one hit or miss."""
+    pool = ImagePool(photos)
+    pool.preload(widths=(200,))
+
+    def lookups():
+        for _ in range(200):
+            for path in photos:
+                pool.get(path, 200)
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Preloading counted one miss per photo; every lookup since hits
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"]) == \
+        (4 * 200 * len(photos), len(photos))
+
+
+def test_unregistered_paths_are_not_served(photos):
+    """Paths the pool was not given are left to the caller."""
+    pool = ImagePool(photos[:1])
+    assert pool.get(photos[1], 200) is None
+    assert not pool.holds(photos[1])
+
+
+def test_byte_cap_evicts_least_recently_used(photos):
+    """Frames beyond max_bytes are evicted oldest use first."""
+    frame_bytes = 100 * 75 * 3
+    original_bytes = 400 * 300 * 3
+    # Room for one decoded original and two frames
+    pool = ImagePool(photos, max_bytes=original_bytes + 2 * frame_bytes)
+    first = pool.get(photos[0], 100)
+    pool.get(photos[1], 100)
+    assert pool.get(photos[0], 100) is first
+    pool.get(photos[2], 100)
+
+    stats = pool.stats()
+    assert stats["bytes"] <= pool.max_bytes
+    # photo 1's frame was used least recently, so it went first
+    misses = stats["misses"]
+    assert pool.get(photos[0], 100) is first
+    pool.get(photos[1], 100)
+    assert pool.stats()["misses"] == misses + 1
+
+
+def test_changed_files_are_reloaded(photos):
+    """A new modification time makes the pool decode the file again."""
+    pool = ImagePool(photos[:1])
+    before = pool.get(photos[0], 100)
+    write_photo(photos[0], size=(200, 200))
+    os.utime(photos[0], ns=(1, 1))
+    after = pool.get(photos[0], 100)
+    assert after is not before
+    assert after.size == (100, 100)
+
+
+def test_preload_drops_missing_and_corrupt_files(photos, tmp_path):
+    """A bad file is dropped and the other photos are still preloaded."""
+    corrupt = tmp_path / "bad.jpg"
+    corrupt.write_bytes(b"not an image")
+    pool = ImagePool(photos + [str(corrupt)])
+    os.remove(photos[2])
+
+    dropped = pool.preload([100])
+    assert sorted(dropped) == sorted([str(corrupt), photos[2]])
+    assert not pool.holds(str(corrupt))
+    assert not pool.holds(photos[2])
+    assert pool.holds(photos[0]) and pool.holds(photos[1])
+    assert pool.stats()["frames"] == 4
+    assert pool.preload([100]) == []
+
+
+def test_sync_drops_removed_photos(photos):
+    """sync unregisters photos missing from the new paths."""
+    pool = ImagePool(photos)
+    pool.preload([100])
+    pool.sync(photos[:2])
+    assert not pool.holds(photos[2])
+    assert pool.get(photos[2], 100) is None
+    assert pool.stats()["frames"] == 4
+
+
+def test_open_for_width_decodes_jpegs_at_reduced_scale(tmp_path):
+    """JPEGs much wider than the target are decoded with draft."""
+    path = write_photo(tmp_path / "big.jpg", size=(1600, 1200))
+    image = open_for_width(path, 300)
+    image.load()
+    # 1600 / 4 is the largest reduction still at least 300 wide
+    assert image.size == (400, 300)
+    assert open_for_width(path).size == (1600, 1200)
+
+
+def test_open_for_width_leaves_other_formats_alone(tmp_path):
+    """Formats without scaled decoding are opened at full size."""
+    path = write_photo(tmp_path / "big.png", size=(1600, 1200), fmt="PNG")
+    image = open_for_width(path, 300)
+    image.load()
+    assert image.size == (1600, 1200)
@@ -0,0 +1,101 @@
+"""Tests of parallel and lazy quote ingestion."""
+
+import os
+import shutil
+
+import pytest
+
+from quoteengine.ingestor import Ingestor
+
+
+def pairs(quotes):
+    """Return quotes as (body, author) tuples."""
+    return [(quote.body, quote.author) for quote in quotes]
+
+
+@pytest.fixture
+def quote_files(data_dir):
+    """Return every bundled quote file, in sorted order."""
+    return sorted(
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(data_dir)
+        for name in names
+        if Ingestor.can_ingest(name)
+    )
+
+
+@pytest.mark.parametrize("processes", [None, 2, 0])
+def test_parallel_parsing_matches_serial(quote_files, processes):
+    """parse_many returns what parsing each file in turn returns."""
+    report = Ingestor.parse_many(quote_files, processes=processes)
+    assert report.errors == {}
+    assert list(report.results) == quote_files
+    for path in quote_files:
+        assert pairs(report.results[path]) == pairs(Ingestor.parse(path))
+    assert pairs(report.quotes) == [
+        pair for path in quote_files for pair in pairs(Ingestor.parse(path))]
+    assert sum(report.files.values()) == len(quote_files)
+
+
+@pytest.mark.parametrize("processes", [None, 0])
+def test_failing_files_do_not_abort_the_batch(tmp_path, quote_files,
+                                              processes):
+    """Each failing file is reported and the others are still parsed."""
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    missing = str(tmp_path / "missing.txt")
+    unsupported = tmp_path / "notes.md"
+    unsupported.write_text("Sit - Rex\n")
+    paths = [str(broken), *quote_files, missing, str(unsupported)]
+
+    report = Ingestor.parse_many(paths, processes=processes)
+    assert set(report.errors) == {str(broken), missing, str(unsupported)}
+    assert isinstance(report.errors[missing], OSError)
+    assert isinstance(report.errors[str(unsupported)], ValueError)
+    assert list(report.results) == quote_files
+
+
+def test_parse_dir_walks_the_tree_in_order(tmp_path, data_dir):
+    """parse_dir parses supported files below a directory, sorted."""
+    shutil.copytree(os.path.join(data_dir, "SimpleLines"),
+                    tmp_path / "b")
+    (tmp_path / "a" / "deeper").mkdir(parents=True)
+    (tmp_path / "a" / "deeper" / "quotes.txt").write_text("Sit - Rex\n")
+    (tmp_path / "a" / "photo.jpg").write_bytes(b"not quotes")
+
+    report = Ingestor.parse_dir(str(tmp_path), processes=0)
+    expected = sorted(str(path) for path in tmp_path.rglob("*")
+                      if path.is_file() and Ingestor.can_ingest(path.name))
+    assert list(report.results) == expected
+    assert len(expected) == 5
+    assert pairs(report.results[expected[0]]) == [("Sit", "Rex")]
+    assert report.errors == {}
+
+
+@pytest.mark.parametrize("suffix", ["txt", "csv"])
+def test_iter_parse_is_lazy(tmp_path, suffix):
+    """Quotes are yielded before the rest of the file is read."""
+    path = tmp_path / f"quotes.{suffix}"
+    header = b"body,author\n" if suffix == "csv" else b""
+    line = b"Sit,Rex\n" if suffix == "csv" else b"Sit - Rex\n"
+    # Undecodable bytes far past the first quote
+    path.write_bytes(header + line * 50_000 + b"\xff\xfe broken\n")
+
+    quotes = Ingestor.iter_parse(str(path))
+    assert pairs([next(quotes)]) == [("Sit", "Rex")]
+    with pytest.raises(UnicodeDecodeError):
+        for _ in quotes:
+            pass
+
+
+def test_iter_parse_opens_files_on_first_use(tmp_path):
+    """A missing file only fails once its quotes are asked for."""
+    quotes = Ingestor.iter_parse(str(tmp_path / "missing.txt"))
+    with pytest.raises(FileNotFoundError):
+        next(quotes)
+
+
+def test_unsupported_files_are_refused_at_once(tmp_path):
+    """Unknown file types fail when the parse is requested."""
+    with pytest.raises(ValueError):
+        Ingestor.iter_parse(str(tmp_path / "notes.md"))
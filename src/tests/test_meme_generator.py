@@ -0,0 +1,48 @@
+"""Tests of meme rendering."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from memeengine.encoder import Encoder, available_formats
+from memeengine.meme_generator import MemeGenerator
+
+QUOTES = [("To bork or not to bork", "Bork"),
+          ("He who smelt it dealt it, and then some more", "Stinky")]
+
+
+@pytest.fixture
+def transparent_png(tmp_path):
+    """Write a PNG whose alpha fades from opaque to transparent."""
+    height, width = 300, 400
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    pixels[..., 0] = np.arange(width) * 255 // width
+    pixels[..., 1] = 90
+    pixels[..., 2] = np.arange(height)[:, None] * 255 // height
+    pixels[..., 3] = np.arange(width) * 255 // (width - 1)
+    path = tmp_path / "transparent.png"
+    Image.fromarray(pixels, "RGBA").save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("fmt", ["png", "webp", "jpeg"])
+def test_variants_match_make_meme(tmp_path, transparent_png, fmt):
+    """Variants of a transparent photo decode to make_meme's pixels."""
+    if fmt not in available_formats():
+        pytest.skip(f"Pillow cannot write {fmt} here")
+    generator = MemeGenerator(str(tmp_path), persist=False,
+                              encoder=Encoder(fmt))
+
+    # Pin the text, partly over transparent pixels, instead of placing
+    # it at random
+    generator.layout_text = lambda body, author, size: (
+        (10, 10), (size[0] - author[0] - 10, size[1] - author[1] - 10))
+    variants = list(generator.make_meme_variants(transparent_png, QUOTES))
+    singles = [generator.make_meme(transparent_png, text, author)
+               for text, author in QUOTES]
+
+    for variant, single in zip(variants, singles):
+        variant, single = Image.open(variant), Image.open(single)
+        assert variant.mode == single.mode
+        assert variant.mode == ("RGB" if fmt == "jpeg" else "RGBA")
+        assert np.array_equal(np.asarray(variant), np.asarray(single))
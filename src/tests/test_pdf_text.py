@@ -0,0 +1,50 @@
+"""Tests of the PDF text extraction backends."""
+
+import pytest
+
+from benchmarks.synthetic import write_pdf
+from quoteengine.pdf_text import (BACKENDS, PdfTextError, default_backend,
+                                  make_backend)
+
+QUOTES = [("Bark less, wag more", "Rex"), ("Fetch is life", "Fido")]
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    """Yield each backend that can run here."""
+    if not BACKENDS[request.param].available():
+        pytest.skip(f"The {request.param} backend is not available")
+    backend = make_backend(request.param)
+    yield backend
+    backend.close()
+
+
+def test_backends_yield_one_line_per_quote(tmp_path, backend):
+    """Every backend reads each PDF text line as one line."""
+    path = str(tmp_path / "quotes.pdf")
+    write_pdf(path, QUOTES)
+    lines = [line.strip() for line in backend.iter_lines(path)
+             if line.strip()]
+    assert lines == [f"{body} - {author}" for body, author in QUOTES]
+
+
+def test_backends_report_unreadable_files(tmp_path, backend):
+    """A file that is not a PDF raises instead of yielding nothing."""
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf")
+    with pytest.raises(PdfTextError):
+        list(backend.iter_lines(str(path)))
+
+
+def test_unknown_backends_are_rejected():
+    """make_backend only accepts the names in BACKENDS."""
+    with pytest.raises(ValueError):
+        make_backend("pdftotext-pool")
+
+
+def test_requirements_give_an_in_process_default():
+    """With pypdf from requirements.txt, no pdftotext process is started."""
+    pytest.importorskip("pypdf")
+    backend = default_backend()
+    assert backend.in_process
+    assert backend.name == "pypdf"
@@ -0,0 +1,108 @@
+"""Tests of the SQLite cache of parsed quotes."""
+
+import os
+import sqlite3
+
+import pytest
+
+from quoteengine import QuoteCache
+
+
+def pairs(quotes):
+    """Return quotes as (body, author) tuples."""
+    return [(quote.body, quote.author) for quote in quotes]
+
+
+@pytest.fixture
+def quotes_file(tmp_path):
+    """Write a TXT quote file."""
+    path = tmp_path / "quotes.txt"
+    path.write_text("Sit - Rex\nStay - Fido\n")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Return a cache in a fresh database file."""
+    return QuoteCache(str(tmp_path / "quotes.sqlite3"))
+
+
+def test_unchanged_files_are_not_parsed_again(cache, quotes_file):
+    """The second parse of an unchanged file is a cache hit."""
+    first = cache.parse(str(quotes_file))
+    assert pairs(cache.parse(str(quotes_file))) == pairs(first) == \
+        [("Sit", "Rex"), ("Stay", "Fido")]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_touched_files_are_parsed_again(cache, quotes_file):
+    """A new mtime alone invalidates the entry."""
+    cache.parse(str(quotes_file))
+    stat = quotes_file.stat()
+    os.utime(quotes_file, ns=(stat.st_atime_ns,
+                              stat.st_mtime_ns + 1_000_000_000))
+    cache.parse(str(quotes_file))
+    assert (cache.hits, cache.misses) == (0, 2)
+    cache.parse(str(quotes_file))
+    assert cache.hits == 1
+
+
+def test_resized_files_are_parsed_again(cache, quotes_file):
+    """A new size invalidates the entry even with the old mtime."""
+    cache.parse(str(quotes_file))
+    stat = quotes_file.stat()
+    quotes_file.write_text("Sit - Rex\nStay - Fido\nRoll over - Max\n")
+    os.utime(quotes_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert pairs(cache.parse(str(quotes_file)))[-1] == ("Roll over", "Max")
+    assert cache.misses == 2
+
+
+def test_entries_survive_a_new_cache(tmp_path, quotes_file):
+    """Another cache on the same file, e.g. after a restart, hits."""
+    db_path = str(tmp_path / "quotes.sqlite3")
+    QuoteCache(db_path).parse(str(quotes_file))
+    cache = QuoteCache(db_path)
+    cache.parse(str(quotes_file))
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_invalidate_forces_a_parse(cache, quotes_file):
+    """An invalidated file is parsed on its next use."""
+    cache.parse(str(quotes_file))
+    cache.invalidate(str(quotes_file))
+    cache.parse(str(quotes_file))
+    assert cache.misses == 2
+
+
+def test_parse_many_mixes_hits_and_parses(cache, tmp_path, quotes_file):
+    """Cached and changed files come back together in path order."""
+    other = tmp_path / "other.txt"
+    other.write_text("Fetch - Buddy\n")
+    cache.parse(str(quotes_file))
+    report = cache.parse_many([str(other), str(quotes_file)], processes=0)
+    assert list(report.results) == [str(other), str(quotes_file)]
+    assert pairs(report.results[str(other)]) == [("Fetch", "Buddy")]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_corrupt_database_files_are_replaced(tmp_path, quotes_file):
+    """A cache file that is not a database is recreated empty."""
+    db_path = tmp_path / "quotes.sqlite3"
+    db_path.write_bytes(b"this is not a SQLite database" * 100)
+    cache = QuoteCache(str(db_path))
+    assert len(cache.parse(str(quotes_file))) == 2
+    assert cache.parse(str(quotes_file))
+    assert cache.hits == 1
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM quotes").fetchone() == (2,)
+
+
+def test_database_corrupted_in_use_falls_back_to_parsing(cache,
+                                                         quotes_file):
+    """If the database breaks while in use, files are parsed instead."""
+    cache.parse(str(quotes_file))
+    with open(cache.db_path, "r+b") as file:
+        file.write(b"garbage" * 20)
+    assert pairs(cache.parse(str(quotes_file))) == \
+        [("Sit", "Rex"), ("Stay", "Fido")]
+    assert cache.misses == 2
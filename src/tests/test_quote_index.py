@@ -0,0 +1,106 @@
+"""Tests of the author, keyword and length quote index."""
+
+import itertools
+import random
+
+import pytest
+
+from quoteengine import QuoteIndex, QuoteModel
+from quoteengine.quote_index import tokenize
+from quoteengine.quote_store import QuoteStore
+
+QUOTES = [
+    QuoteModel("To bork or not to bork", "Bork"),
+    QuoteModel("He who smelt it dealt it", "Stinky"),
+    QuoteModel("Bark less, wag more", "Rex"),
+    QuoteModel("Wag more", "rex "),
+    QuoteModel("Treats are life", "Fido"),
+    QuoteModel("Life is ruff, bark anyway", "Rex"),
+    QuoteModel("Bork", "Bork"),
+]
+
+FILTERS = {
+    "author": [None, "rex", "BORK", "Nobody"],
+    "keyword": [None, "bark", "wag more", "life", "meow"],
+    "min_length": [None, 5, 20],
+    "max_length": [None, 8, 21, 3],
+}
+
+
+def matches(author=None, keyword=None, min_length=None, max_length=None):
+    """Return the ids of QUOTES matching the filters, by brute force."""
+    return [
+        i for i, quote in enumerate(QUOTES)
+        if (author is None
+            or quote.author.strip().lower() == author.strip().lower())
+        and set(tokenize(keyword or "")) <= set(tokenize(quote.body))
+        and (min_length is None or len(quote.body) >= min_length)
+        and (max_length is None or len(quote.body) <= max_length)
+    ]
+
+
+def combinations():
+    """Yield every combination of the test filters as keyword args."""
+    names = list(FILTERS)
+    for values in itertools.product(*FILTERS.values()):
+        yield dict(zip(names, values))
+
+
+@pytest.fixture(params=["list", "store"])
+def index(request):
+    """Index QUOTES held in a list or in a QuoteStore."""
+    quotes = QUOTES if request.param == "list" \
+        else QuoteStore.from_quotes(QUOTES)
+    return QuoteIndex(quotes)
+
+
+def test_queries_match_a_full_scan(index):
+    """Every combination of filters finds exactly the matching quotes."""
+    for filters in combinations():
+        assert index.query(**filters) == matches(**filters), filters
+
+
+def test_choice_returns_only_matching_quotes(index):
+    """choice picks among the matches, and can pick each of them."""
+    rng = random.Random(7)
+    for filters in combinations():
+        expected = {(QUOTES[i].body, QUOTES[i].author.strip().lower())
+                    for i in matches(**filters)}
+        chosen = set()
+        for _ in range(40):
+            quote = index.choice(rng=rng, **filters)
+            if not expected:
+                assert quote is None, filters
+                break
+            chosen.add((quote.body, quote.author.strip().lower()))
+        if expected:
+            assert chosen == expected, filters
+
+
+@pytest.mark.parametrize("filters", [
+    {"author": "Nobody"},
+    {"keyword": "meow"},
+    {"min_length": 100},
+    {"max_length": 3},
+    {"min_length": 10, "max_length": 9},
+    # Both lists exist but do not intersect: the sampling fallback
+    {"author": "Stinky", "keyword": "bark"},
+])
+def test_choice_returns_none_without_matches(index, filters):
+    """Filters that match nothing give None rather than a quote."""
+    assert index.choice(**filters) is None
+
+
+def test_empty_corpus_has_no_choice():
+    """An empty index answers every query with nothing."""
+    index = QuoteIndex([])
+    assert len(index) == 0
+    assert index.choice() is None
+    assert index.choice(min_length=1) is None
+    assert index.query(max_length=10) == []
+
+
+def test_authors_are_case_insensitive(index):
+    """Authors are stored lowercase and trimmed."""
+    assert index.authors() == ["bork", "fido", "rex", "stinky"]
+    assert index.query(author="  REX") == [2, 3, 5]
@@ -0,0 +1,28 @@
+"""Tests of the compact quote store."""
+
+import pytest
+
+from quoteengine import QuoteModel
+from quoteengine.quote_store import QuoteStore
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """A saved store maps back with the same quotes and its tag."""
+    quotes = [QuoteModel("Woof", "Rex"), QuoteModel("Arf", "Rex"),
+              QuoteModel("Ünïcode", "Fido")]
+    path = str(tmp_path / "quotes.store")
+    QuoteStore.from_quotes(quotes).save(path, b"tag")
+
+    store = QuoteStore.load(path)
+    assert [(q.body, q.author) for q in store] == \
+        [(q.body, q.author) for q in quotes]
+    assert store.authors == 2
+    assert store.tag == b"tag".ljust(32, b"\0")
+
+
+def test_load_rejects_other_files(tmp_path):
+    """Files that are not quote stores raise ValueError."""
+    path = tmp_path / "quotes.store"
+    path.write_bytes(b"QSTORE")
+    with pytest.raises(ValueError):
+        QuoteStore.load(str(path))
@@ -0,0 +1,115 @@
+"""Tests of the revalidating on-disk cache of remote images."""
+
+import threading
+
+import pytest
+
+from memeengine import FetchError, RemoteImageCache
+
+IMAGE = b"\x89PNG fake image bytes" * 50
+
+
+@pytest.fixture
+def served(image_server):
+    """Serve IMAGE at /a.png, /b.png and /c.png with ETags."""
+    for name in "abc":
+        image_server.routes[f"/{name}.png"] = (
+            200, IMAGE, {"ETag": f'"{name}1"'})
+    return image_server
+
+
+def test_fresh_images_are_served_from_disk(tmp_path, served):
+    """Within the TTL a cached image costs no request."""
+    cache = RemoteImageCache(str(tmp_path), ttl=300)
+    url = served.url("/a.png")
+    assert cache.fetch(url).read() == IMAGE
+    assert cache.fetch(url).read() == IMAGE
+    assert served.hits("/a.png") == 1
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 1)
+
+
+def test_concurrent_fetches_are_coalesced(tmp_path, served):
+    """Fetches of a URL already being downloaded wait for that download."""
+    cache = RemoteImageCache(str(tmp_path))
+    served.delay = 0.3
+    url = served.url("/a.png")
+    results = []
+
+    def fetch():
+        results.append(cache.fetch(url).read())
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == [IMAGE] * 4
+    assert served.hits("/a.png") == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"]) == (1, 3)
+
+
+def test_stale_images_are_revalidated(tmp_path, served):
+    """After the TTL the stored ETag is sent and a 304 reuses the file."""
+    cache = RemoteImageCache(str(tmp_path), ttl=0)
+    url = served.url("/a.png")
+    cache.fetch(url)
+    assert cache.fetch(url).read() == IMAGE
+    _, headers = served.requests[-1]
+    assert headers["If-None-Match"] == '"a1"'
+    assert cache.stats()["revalidations"] == 1
+
+    # A changed image is downloaded again
+    served.routes["/a.png"] = (200, b"new image", {"ETag": '"a2"'})
+    assert cache.fetch(url).read() == b"new image"
+    assert cache.stats()["misses"] == 2
+
+
+def test_unexpected_not_modified_is_an_error(tmp_path, image_server):
+    """A 304 for an image that is not cached raises FetchError."""
+    image_server.routes["/odd.png"] = (304, b"", {})
+    cache = RemoteImageCache(str(tmp_path))
+    with pytest.raises(FetchError):
+        cache.fetch(image_server.url("/odd.png"))
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("ttl", [300, 0])
+def test_missing_files_are_downloaded_again(tmp_path, served, ttl):
+    """An image deleted from disk is fetched again instead of failing."""
+    cache = RemoteImageCache(str(tmp_path), ttl=ttl)
+    url = served.url("/a.png")
+    cache.fetch(url)
+    for path in tmp_path.glob("*.img"):
+        path.unlink()
+    assert cache.fetch(url).read() == IMAGE
+    assert cache.stats()["misses"] == 2
+    assert list(tmp_path.glob("*.img"))
+
+
+def test_least_recently_used_images_are_evicted(tmp_path, served):
+    """Past max_bytes the least recently used image is removed."""
+    cache = RemoteImageCache(str(tmp_path), max_bytes=len(IMAGE) * 5 // 2)
+    a, b, c = (served.url(f"/{name}.png") for name in "abc")
+    cache.fetch(a)
+    cache.fetch(b)
+    cache.fetch(a)
+    cache.fetch(c)
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 2 * len(IMAGE))
+    assert len(list(tmp_path.glob("*.img"))) == 2
+
+    # b was evicted, a was not
+    cache.fetch(a)
+    assert served.hits("/a.png") == 1
+    cache.fetch(b)
+    assert served.hits("/b.png") == 2
+
+
+def test_entries_are_adopted_from_disk(tmp_path, served):
+    """A new cache over the same directory reuses the stored images."""
+    url = served.url("/a.png")
+    RemoteImageCache(str(tmp_path)).fetch(url)
+    cache = RemoteImageCache(str(tmp_path))
+    assert cache.fetch(url).read() == IMAGE
+    assert served.hits("/a.png") == 1
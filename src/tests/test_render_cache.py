@@ -0,0 +1,106 @@
+"""Tests of the content-addressed cache of rendered memes."""
+
+import io
+import os
+import shutil
+
+import pytest
+from PIL import Image
+
+from memeengine.meme_generator import MemeGenerator
+from memeengine.render_cache import RenderCache
+
+
+@pytest.fixture
+def photo(tmp_path):
+    """Write a small JPEG photo."""
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (320, 240), (200, 120, 40)).save(path)
+    return str(path)
+
+
+def write(path, size):
+    """Write a file of the given size and return its path."""
+    path.write_bytes(b"m" * size)
+    return str(path)
+
+
+def test_keys_address_content_and_parameters(tmp_path, photo):
+    """Keys depend on the image bytes and parameters, not the path."""
+    cache = RenderCache(str(tmp_path / "out"))
+    copy = tmp_path / "copy.jpg"
+    shutil.copy(photo, copy)
+    key = cache.make_key(photo, text="a", author="b", width=500)
+
+    assert cache.make_key(str(copy), width=500, author="b", text="a") == key
+    buffer = io.BytesIO(copy.read_bytes())
+    assert cache.make_key(buffer, text="a", author="b", width=500) == key
+    assert buffer.tell() == 0
+    assert cache.make_key(photo, text="a", author="b", width=400) != key
+    assert cache.make_key(photo, text="A", author="b", width=500) != key
+
+    copy.write_bytes(copy.read_bytes() + b"\0")
+    assert cache.make_key(str(copy), text="a", author="b",
+                          width=500) != key
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    """Past max_bytes the least recently used file is deleted."""
+    cache = RenderCache(str(tmp_path), max_bytes=250)
+    first = write(tmp_path / "meme-cache-1.jpg", 100)
+    second = write(tmp_path / "meme-cache-2.jpg", 100)
+    third = write(tmp_path / "meme-cache-3.jpg", 100)
+    cache.put("1", first)
+    cache.put("2", second)
+    assert cache.get("1") == first
+    cache.put("3", third)
+
+    assert cache.get("2") is None
+    assert not os.path.exists(second)
+    assert (cache.get("1"), cache.get("3")) == (first, third)
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 200)
+    assert stats["evictions"] == 1
+
+
+def test_entry_cap_evicts_too(tmp_path):
+    """max_entries bounds the number of files regardless of size."""
+    cache = RenderCache(str(tmp_path), max_entries=2)
+    paths = [write(tmp_path / f"meme-cache-{n}.jpg", 10) for n in range(3)]
+    for n, path in enumerate(paths):
+        cache.put(str(n), path)
+    assert cache.get("0") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_deleted_files_are_misses(tmp_path):
+    """A cached file removed from disk is forgotten on lookup."""
+    cache = RenderCache(str(tmp_path))
+    path = write(tmp_path / "meme-cache-1.jpg", 10)
+    cache.put("1", path)
+    os.remove(path)
+    assert cache.get("1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_files_are_adopted_by_a_new_cache(tmp_path):
+    """A cache over the same directory finds the files already there."""
+    path = write(tmp_path / "meme-cache-abc.jpg", 10)
+    assert RenderCache(str(tmp_path)).get("abc") == path
+
+
+def test_repeated_memes_return_the_cached_file(tmp_path, photo):
+    """The same meme twice is rendered once and served from one path."""
+    out = tmp_path / "out"
+    generator = MemeGenerator(str(out), cache=RenderCache(str(out)))
+    path = generator.make_meme(photo, "Sit", "Rex")
+    written = os.stat(path).st_mtime_ns
+
+    assert generator.make_meme(photo, "Sit", "Rex") == path
+    assert os.stat(path).st_mtime_ns == written
+    other = generator.make_meme(photo, "Stay", "Rex")
+    assert other != path
+    stats = generator.cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert sorted(os.listdir(out)) == sorted(
+        [os.path.basename(path), os.path.basename(other)])
@@ -0,0 +1,136 @@
+"""Tests of the bounded priority render queue."""
+
+import threading
+import time
+
+import pytest
+
+from memeengine.render_queue import (PRIORITY_HIGH, PRIORITY_LOW,
+                                     DeadlineExceeded, QueueFull,
+                                     RenderQueue)
+
+
+@pytest.fixture
+def render_queue():
+    """Return a queue with one worker, shut down after the test."""
+    render_queue = RenderQueue(workers=1, max_pending=4)
+    yield render_queue
+    render_queue.shutdown()
+
+
+def block(render_queue):
+    """Occupy the worker until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(10)
+
+    render_queue.submit(hold)
+    assert started.wait(10)
+    return release
+
+
+def test_jobs_return_results_and_errors(render_queue):
+    """A job's return value or exception is recorded on it."""
+    done = render_queue.submit(pow, 2, 10, keep=True)
+    failed = render_queue.submit(int, "not a number", keep=True)
+    assert done.wait(10) and failed.wait(10)
+    assert (done.status, done.result) == ("done", 1024)
+    assert failed.status == "failed"
+    assert isinstance(failed.error, ValueError)
+    assert render_queue.get(done.id) is done
+    assert render_queue.get(failed.id) is failed
+
+
+def test_only_kept_jobs_are_retained(render_queue):
+    """Jobs not submitted with keep are not looked up once finished."""
+    release = block(render_queue)
+    kept = render_queue.submit(pow, 2, 3, keep=True)
+    waited = render_queue.submit(pow, 2, 4)
+    assert render_queue.get(kept.id) is kept
+    assert render_queue.get(waited.id) is None
+
+    release.set()
+    assert kept.wait(10) and waited.wait(10)
+    assert render_queue.get(kept.id) is kept
+    assert render_queue.get(waited.id) is None
+    assert render_queue.stats()["kept"] == 1
+
+
+def test_retained_jobs_are_capped_and_expire():
+    """The oldest kept jobs go beyond max_kept or after keep_seconds."""
+    render_queue = RenderQueue(workers=1, max_kept=2, keep_seconds=0.2)
+    try:
+        jobs = [render_queue.submit(pow, 2, n, keep=True)
+                for n in range(4)]
+        assert all(job.wait(10) for job in jobs)
+        assert [render_queue.get(job.id) for job in jobs] == \
+            [None, None] + jobs[2:]
+        time.sleep(0.3)
+        assert render_queue.get(jobs[3].id) is None
+        assert render_queue.stats()["kept"] == 0
+    finally:
+        render_queue.shutdown()
+
+
+def test_process_jobs_past_their_deadline_fail():
+    """A job still running in a process at its deadline fails."""
+    render_queue = RenderQueue(workers=1, processes=1)
+    try:
+        job = render_queue.submit(time.sleep, 1, timeout=0.1)
+        assert job.wait(10)
+        assert isinstance(job.error, DeadlineExceeded)
+        assert render_queue.stats()["running"] == 0
+    finally:
+        render_queue.shutdown()
+
+
+def test_full_queue_rejects_jobs(render_queue):
+    """Jobs beyond max_pending are refused instead of queued."""
+    release = block(render_queue)
+    queued = [render_queue.submit(pow, 2, n) for n in range(4)]
+    with pytest.raises(QueueFull):
+        render_queue.submit(pow, 2, 4)
+    assert render_queue.stats()["rejected"] == 1
+
+    release.set()
+    assert all(job.wait(10) for job in queued)
+    assert render_queue.submit(pow, 2, 4).wait(10)
+
+
+def test_higher_priority_jobs_run_first(render_queue):
+    """Queued jobs run by priority, then in submission order."""
+    order = []
+    release = block(render_queue)
+    jobs = [render_queue.submit(order.append, name, priority=priority)
+            for name, priority in [("low", PRIORITY_LOW),
+                                   ("normal 1", 5), ("high", PRIORITY_HIGH),
+                                   ("normal 2", 5)]]
+    release.set()
+    assert all(job.wait(10) for job in jobs)
+    assert order == ["high", "normal 1", "normal 2", "low"]
+
+
+def test_expired_jobs_are_cancelled_without_running(render_queue):
+    """A job still queued at its deadline fails and never runs."""
+    ran = []
+    release = block(render_queue)
+    job = render_queue.submit(ran.append, "ran", timeout=0.05)
+    assert not job.wait(0.2)
+    release.set()
+    assert job.wait(10)
+    assert job.status == "failed"
+    assert isinstance(job.error, DeadlineExceeded)
+    assert ran == []
+    assert render_queue.stats()["expired"] == 1
+
+
+def test_shutdown_runs_queued_jobs_first():
+    """shutdown stops the workers only after the queued jobs ran."""
+    render_queue = RenderQueue(workers=1)
+    release = block(render_queue)
+    job = render_queue.submit(pow, 3, 2)
+    release.set()
+    render_queue.shutdown()
+    assert job.done and job.result == 9
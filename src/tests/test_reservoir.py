@@ -0,0 +1,128 @@
+"""Tests of the background-filled meme reservoir."""
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from memeengine.reservoir import MemeReservoir
+
+
+def wait_for(condition, timeout=10):
+    """Wait until condition() is true, failing after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def reservoirs():
+    """Collect reservoirs to stop after the test."""
+    started = []
+    yield started
+    for reservoir in started:
+        reservoir.stop()
+
+
+def test_reservoir_fills_and_refills(reservoirs):
+    """It fills to size, and every take makes room for one more meme."""
+    counter = itertools.count()
+    reservoir = MemeReservoir(lambda: next(counter), size=3, workers=2)
+    reservoirs.append(reservoir)
+    assert reservoir.take() is None
+    reservoir.start()
+    wait_for(lambda: len(reservoir) == 3)
+    time.sleep(0.05)
+    assert reservoir.stats()["produced"] == 3
+
+    taken = [reservoir.take(), reservoir.take()]
+    assert None not in taken
+    wait_for(lambda: len(reservoir) == 3)
+    stats = reservoir.stats()
+    assert (stats["hits"], stats["misses"], stats["produced"]) == (2, 1, 5)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_takes_never_wait(reservoirs):
+    """An empty reservoir answers None at once instead of rendering."""
+    release = threading.Event()
+    reservoir = MemeReservoir(lambda: release.wait(10), size=1)
+    reservoirs.append(reservoir)
+    reservoir.start()
+    started = time.monotonic()
+    assert reservoir.take() is None
+    assert time.monotonic() - started < 0.5
+    release.set()
+
+
+def test_clear_drops_stored_and_in_flight_memes(reservoirs):
+    """After clear, memes rendered for the old corpus are never taken."""
+    generation = ["old"]
+    rendering = threading.Event()
+    release = threading.Event()
+
+    def produce():
+        meme = generation[0]
+        if meme == "old":
+            rendering.set()
+            release.wait(10)
+        return meme
+
+    reservoir = MemeReservoir(produce, size=2)
+    reservoirs.append(reservoir)
+    reservoir.start()
+    assert rendering.wait(10)
+    # One render of the old corpus is in flight while it is cleared
+    generation[0] = "new"
+    reservoir.clear()
+    release.set()
+    wait_for(lambda: len(reservoir) == 2)
+    assert [reservoir.take(), reservoir.take()] == ["new", "new"]
+
+
+def test_clear_refills_the_reservoir(reservoirs):
+    """clear empties the stock and the threads render it again."""
+    counter = itertools.count()
+    reservoir = MemeReservoir(lambda: next(counter), size=2)
+    reservoirs.append(reservoir)
+    reservoir.start()
+    wait_for(lambda: len(reservoir) == 2)
+    reservoir.clear()
+    wait_for(lambda: len(reservoir) == 2)
+    assert reservoir.take() >= 2
+
+
+def test_failed_renders_are_counted_and_retried(reservoirs):
+    """A failing render is recorded, and rendering resumes afterwards."""
+    calls = itertools.count()
+
+    def produce():
+        if next(calls) < 2:
+            raise RuntimeError("no photos yet")
+        return "meme"
+
+    reservoir = MemeReservoir(produce, size=1)
+    reservoir.retry_seconds = 0.01
+    reservoirs.append(reservoir)
+    reservoir.start()
+    wait_for(lambda: len(reservoir) == 1)
+    assert reservoir.stats()["errors"] == 2
+    assert isinstance(reservoir.last_error, RuntimeError)
+    assert reservoir.take() == "meme"
+
+
+def test_stop_ends_the_threads():
+    """stop joins the rendering threads, also while they wait for room."""
+    reservoir = MemeReservoir(lambda: "meme", size=1, workers=2,
+                              name="test-reservoir")
+    reservoir.start()
+    wait_for(lambda: len(reservoir) == 1)
+    reservoir.stop()
+    assert not any(thread.name.startswith("test-reservoir")
+                   for thread in threading.enumerate())
+    produced = reservoir.stats()["produced"]
+    reservoir.take()
+    time.sleep(0.05)
+    assert reservoir.stats()["produced"] == produced
@@ -0,0 +1,99 @@
+"""Tests of the cache of rasterized text layers."""
+
+import threading
+
+import pytest
+
+from memeengine.text_layer import TextLayerCache, render_layer
+
+
+def layer_bytes(text, size=20, style="plain"):
+    """Return the bytes a cached layer of a text accounts for."""
+    image = render_layer(text, size=size, style=style).image
+    return image.width * image.height * 4
+
+
+def test_repeated_text_is_served_from_the_cache():
+    """The same text, font, size and style returns the same layer."""
+    cache = TextLayerCache()
+    layer = cache.get("Sit")
+    assert cache.get("Sit") is layer
+    assert cache.get("Sit", size=30) is not layer
+    assert cache.get("Sit", style="outline") is not layer
+    assert cache.get("Stay") is not layer
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["layers"]) == (1, 4, 4)
+
+
+def test_layers_match_a_fresh_render():
+    """A cached layer has the pixels and offset of a direct render."""
+    cache = TextLayerCache()
+    for style in ("plain", "outline", "shadow"):
+        cached = cache.get("Bark less\nwag more", style=style)
+        fresh = render_layer("Bark less\nwag more", style=style)
+        assert cached.offset == fresh.offset
+        assert cached.image.tobytes() == fresh.image.tobytes()
+
+
+def test_least_recently_used_layers_are_evicted():
+    """Past max_bytes the least recently used layer is dropped."""
+    texts = ["Sit", "Stay", "Roll"]
+    sizes = [layer_bytes(text) for text in texts]
+    cache = TextLayerCache(max_bytes=sizes[0] + max(sizes[1:]))
+    first = cache.get("Sit")
+    cache.get("Stay")
+    assert cache.get("Sit") is first
+    cache.get("Roll")
+
+    assert cache.stats()["layers"] == 2
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.get("Sit") is first
+    misses = cache.stats()["misses"]
+    cache.get("Stay")
+    assert cache.stats()["misses"] == misses + 1
+
+
+def test_oversized_layers_are_still_returned():
+    """A layer larger than the cap is kept alone rather than refused."""
+    cache = TextLayerCache(max_bytes=1)
+    layer = cache.get("A long quote that is bigger than one byte")
+    assert cache.get("A long quote that is bigger than one byte") is layer
+    cache.get("Sit")
+    assert cache.stats()["layers"] == 1
+
+
+def test_unknown_styles_are_rejected():
+    """An unsupported style raises and caches nothing."""
+    cache = TextLayerCache()
+    with pytest.raises(ValueError):
+        cache.get("Sit", style="sparkly")
+    assert cache.stats()["layers"] == 0
+
+
+def test_clear_drops_every_layer():
+    """clear empties the cache and its byte count."""
+    cache = TextLayerCache()
+    layer = cache.get("Sit")
+    cache.clear()
+    assert (cache.stats()["layers"], cache.stats()["bytes"]) == (0, 0)
+    assert cache.get("Sit") is not layer
+
+
+def test_concurrent_lookups_are_all_counted():
+    """Every lookup from any thread counts as exactly one hit or miss."""
+    cache = TextLayerCache()
+    texts = [f"Quote {n}" for n in range(8)]
+
+    def lookups():
+        for _ in range(50):
+            for text in texts:
+                cache.get(text)
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 4 * 50 * len(texts)
+    assert stats["layers"] == len(texts)